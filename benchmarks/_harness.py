@@ -0,0 +1,130 @@
+"""Result collection and baseline comparison shared by the benchmark suites.
+
+Each suite produces a mapping of scenario name to `Result`, prints it as
+a table and can save it as a JSON baseline or compare it against one:
+
+    python -m benchmarks.bench_fleet --save-baseline benchmarks/baselines/fleet.json
+    python -m benchmarks.bench_fleet --compare benchmarks/baselines/fleet.json
+
+Baselines record the Python version and platform they were measured on;
+compare against baselines from the same machine.
+"""
+
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+
+
+class Result:
+    """Measurements of one benchmark scenario.
+
+    Args:
+        name: The scenario name.
+        latencies: Seconds taken by each operation.
+        elapsed: Wall-clock seconds for all operations (defaults to their
+                 sum, for operations that did not overlap).
+        peak_bytes: Peak memory allocated while the scenario ran, if
+                    measured.
+    """
+
+    # Metrics compared against baselines, and whether higher is better
+    METRICS = {
+        'ops_per_s': True,
+        'p50_ms': False,
+        'p95_ms': False,
+        'p99_ms': False,
+        'peak_mib': False,
+    }
+
+    def __init__(self, name, latencies, elapsed=None, peak_bytes=None):
+        self.name = name
+        self.count = len(latencies)
+        elapsed = sum(latencies) if elapsed is None else elapsed
+        self.ops_per_s = self.count / elapsed if elapsed else float('inf')
+        self.p50_ms, self.p95_ms, self.p99_ms = (
+            value * 1000 for value in percentiles(latencies, (50, 95, 99)))
+        self.peak_mib = peak_bytes / 2**20 if peak_bytes is not None else None
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'ops_per_s': self.ops_per_s,
+            'p50_ms': self.p50_ms,
+            'p95_ms': self.p95_ms,
+            'p99_ms': self.p99_ms,
+            'peak_mib': self.peak_mib,
+        }
+
+
+def percentiles(values, points):
+    """Get the given percentiles (0-100) of `values` by linear interpolation."""
+    if len(values) == 1:
+        return [values[0]] * len(points)
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return [cuts[point - 1] if point < 100 else max(values) for point in points]
+
+
+def print_results(results, unit='ms'):
+    """Print results as a table, with latencies in `unit` ('ms' or 'us')."""
+    scale = {'ms': 1, 'us': 1000}[unit]
+    print(f'{"scenario":<44} {"count":>7} {"ops/s":>11} {"p50 " + unit:>9} '
+          f'{"p95 " + unit:>9} {"p99 " + unit:>9} {"peak MiB":>9}')
+    for result in results.values():
+        peak = f'{result.peak_mib:9.1f}' if result.peak_mib is not None else f'{"-":>9}'
+        p50, p95, p99 = (value * scale for value in (result.p50_ms, result.p95_ms, result.p99_ms))
+        print(f'{result.name:<44} {result.count:7d} {result.ops_per_s:11.1f} '
+              f'{p50:9.3f} {p95:9.3f} {p99:9.3f} {peak}')
+
+
+def save_baseline(path, results, parameters):
+    """Write results to a JSON baseline file."""
+    baseline = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'parameters': parameters,
+        'results': {name: result.to_dict() for name, result in results.items()},
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def compare_to_baseline(path, results, tolerance):
+    """Print the change of each metric against a baseline file.
+
+    Args:
+        path: The baseline file.
+        results: The current results.
+        tolerance: Relative change (e.g. 0.1 for 10%) beyond which a
+                   metric that got worse counts as a regression.
+
+    Returns:
+        The number of regressions.
+    """
+    with open(path) as f:
+        baseline = json.load(f)
+    print(f'\nCompared to {path} (Python {baseline["python"]}, {baseline["created"]}):')
+
+    regressions = 0
+    for name, result in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f'  {name}: not in baseline')
+            continue
+        changes = []
+        for metric, higher_is_better in Result.METRICS.items():
+            before, after = previous.get(metric), getattr(result, metric)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            worse = -change if higher_is_better else change
+            flag = ''
+            if worse > tolerance:
+                flag = ' REGRESSION'
+                regressions += 1
+            changes.append(f'{metric} {change:+.1%}{flag}')
+        print(f'  {name}: {", ".join(changes)}')
+    return regressions
@@ -0,0 +1,80 @@
+"""Benchmark device model resolution and device construction.
+
+Compares the previous linear `startswith` scan over `DEVICE_MODEL_MAP`
+with `TPLinkDeviceRegistry`, then times full construction of devices
+(device info + class resolution + device instance) for a large fleet.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_device_registry --count 100000
+"""
+
+import argparse
+import time
+
+from tplinkcloud.device import TPLinkDevice
+from tplinkcloud.device_info import TPLinkDeviceInfo
+from tplinkcloud.device_manager import DEVICE_MODEL_MAP, DEVICE_REGISTRY
+
+# A mix of the models seen in the wiremock fixtures, including Tapo
+# models that fall through to the generic device class
+MODELS = [
+    'HS103(US)', 'HS105(US)', 'HS110(US)', 'HS200(US)', 'HS300(US)',
+    'KL420L5(US)', 'KL430(US)', 'KP115(US)', 'KP125(US)', 'KP200(US)',
+    'KP303(US)', 'KP400(US)', 'EP40(US)', 'P100', 'P110', 'L530',
+]
+
+
+def _linear_resolve(model):
+    return next(
+        (cls for prefix, cls in DEVICE_MODEL_MAP.items() if model.startswith(prefix)),
+        TPLinkDevice,
+    )
+
+
+def _device_infos(count):
+    return [
+        {
+            'deviceId': f'{index:040X}',
+            'alias': f'Device {index}',
+            'deviceModel': MODELS[index % len(MODELS)],
+            'appServerUrl': 'http://127.0.0.1:8080',
+        }
+        for index in range(count)
+    ]
+
+
+def _timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<32} {elapsed * 1000:10.1f} ms  {count / elapsed:14,.0f} /s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args()
+
+    models = [MODELS[index % len(MODELS)] for index in range(args.count)]
+    device_infos = _device_infos(args.count)
+
+    _timed('linear scan resolve', args.count,
+           lambda: [_linear_resolve(model) for model in models])
+    _timed('registry resolve', args.count,
+           lambda: [DEVICE_REGISTRY.resolve(model) for model in models])
+
+    def construct(resolve):
+        for device_info in device_infos:
+            info = TPLinkDeviceInfo(device_info)
+            device_cls = resolve(info.device_model)
+            device_cls(None, info.device_id, info)
+
+    _timed('construct (linear scan)', args.count,
+           lambda: construct(_linear_resolve))
+    _timed('construct (registry)', args.count,
+           lambda: construct(DEVICE_REGISTRY.resolve))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""Macro benchmarks of fleet enumeration, polling and bulk commands.
+
+Runs against a `FakeCloud` (in-process, or over HTTP with `--http`) with
+optional injected latency, for each combination of fleet size and strip
+ratio (the fraction of devices that are six-outlet HS300 strips; the
+rest are HS110 and HS103 plugs). Scenarios:
+
+    startup      constructing a TPLinkDeviceManager: login to both clouds
+                 and the prefetched device list
+    get_devices  listing the devices, including the strips' outlets
+    find_devices substring lookups in the cached device list
+    realtime     the power tools' realtime fan-out over all emeter outlets
+    day, month   the power tools' daily and monthly fan-outs
+    power        switching every plug and outlet on and off
+
+Latencies are per operation: per manager for startup, per call for
+get_devices and find_devices, and per cloud request for the fan-outs and
+power commands, whose throughput is requests per second. Peak memory is
+measured with tracemalloc in a separate run of each scenario, so tracing
+does not slow down the timed run; it includes what the in-process fake
+cloud allocates while answering, but not the fleet built beforehand.
+
+Results can be saved as a baseline and later runs compared against it
+(see benchmarks/_harness.py). Run from the repository root:
+
+    python -m benchmarks.bench_fleet --sizes 100,1000,10000 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from tplinkcloud.device_manager import TPLinkDeviceManager
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.simulator import (
+    FakeCloud,
+    FakeCloudServer,
+    constant_latency,
+    lognormal_latency,
+    make_fleet,
+    uniform_latency,
+)
+from tplinkcloud.transport import TPLinkHTTPTransport, TPLinkTransport
+
+from ._harness import Result, compare_to_baseline, print_results, save_baseline
+
+_LATENCY_DISTRIBUTIONS = {
+    'constant': constant_latency,
+    'uniform': lambda median: uniform_latency(0, 2 * median),
+    'lognormal': lognormal_latency,
+}
+
+
+class _TimingTransport(TPLinkTransport):
+    """Records the latency of every awaited request of another transport."""
+
+    def __init__(self, transport):
+        self._transport = transport
+        self.latencies = []
+
+    def post(self, url, data, params, headers, timeout):
+        return self._transport.post(url, data, params, headers, timeout)
+
+    async def post_async(self, url, data, params, headers, timeout):
+        start = time.perf_counter()
+        response = await self._transport.post_async(url, data, params, headers, timeout)
+        self.latencies.append(time.perf_counter() - start)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _fleet(size, strip_ratio):
+    strips = round(size * strip_ratio)
+    return (make_fleet(strips, models=['HS300(US)'], seed=1)
+            + make_fleet(size - strips, models=['HS110(US)', 'HS103(US)'], seed=2))
+
+
+class _Fleet:
+    """A fake cloud and how to reach it."""
+
+    def __init__(self, cloud, transport_factory, host):
+        self.cloud = cloud
+        self.transport_factory = transport_factory
+        self.host = host
+
+    async def open(self, timing=False, **kwargs):
+        """Log in a device manager with a new transport.
+
+        Returns:
+            The device manager and its transport, which the caller closes.
+        """
+        transport = self.transport_factory()
+        if timing:
+            transport = _TimingTransport(transport)
+        device_manager = await TPLinkDeviceManager(
+            self.cloud.username, self.cloud.password, tplink_cloud_api_host=self.host,
+            transport=transport, **kwargs)
+        return device_manager, transport
+
+
+async def _startup(fleet, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, transport = await fleet.open()
+        latencies.append(time.perf_counter() - start)
+        await transport.aclose()
+    return latencies, None
+
+
+async def _get_devices(fleet, repeat):
+    device_manager, transport = await fleet.open(prefetch=False, cache_devices=False)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await device_manager.get_devices()
+        latencies.append(time.perf_counter() - start)
+    await transport.aclose()
+    return latencies, None
+
+
+async def _find_devices(fleet, repeat):
+    device_manager, transport = await fleet.open()
+    devices = await device_manager.get_devices()
+    names = [device.get_alias() for device in devices[::max(1, len(devices) // 100)]]
+    latencies = []
+    for _ in range(repeat):
+        for name in names:
+            start = time.perf_counter()
+            await device_manager.find_devices(name)
+            latencies.append(time.perf_counter() - start)
+    await transport.aclose()
+    return latencies, None
+
+
+def _fan_out(method):
+    async def scenario(fleet, repeat):
+        device_manager, transport = await fleet.open(timing=True)
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager)
+        devices = await power_tools.get_emeter_devices()
+        transport.latencies.clear()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await getattr(power_tools, method)(devices)
+        elapsed = time.perf_counter() - start
+        await transport.aclose()
+        return transport.latencies, elapsed
+    return scenario
+
+
+async def _power(fleet, repeat):
+    device_manager, transport = await fleet.open(timing=True)
+    devices = [device for device in await device_manager.get_devices()
+               if not device.has_children()]
+    transport.latencies.clear()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await asyncio.gather(*(device.power_on() for device in devices))
+        await asyncio.gather(*(device.power_off() for device in devices))
+    elapsed = time.perf_counter() - start
+    await transport.aclose()
+    return transport.latencies, elapsed
+
+
+SCENARIOS = {
+    'startup': _startup,
+    'get_devices': _get_devices,
+    'find_devices': _find_devices,
+    'realtime': _fan_out('_get_power_usage_realtime'),
+    'day': _fan_out('_get_power_usage_day'),
+    'month': _fan_out('_get_power_usage_month'),
+    'power': _power,
+}
+
+
+def _run(scenario, fleet, repeat, memory):
+    latencies, elapsed = asyncio.run(scenario(fleet, repeat))
+    peak = None
+    if memory:
+        tracemalloc.start()
+        asyncio.run(scenario(fleet, 1))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return latencies, elapsed, peak
+
+
+def run(args):
+    latency = None
+    if args.latency_ms:
+        latency = _LATENCY_DISTRIBUTIONS[args.latency_distribution](args.latency_ms / 1000)
+
+    results = {}
+    for size in args.sizes:
+        for strip_ratio in args.strip_ratios:
+            cloud = FakeCloud(_fleet(size, strip_ratio), latency=latency, seed=1)
+            server = None
+            if args.http:
+                server = FakeCloudServer(cloud)
+                fleet = _Fleet(cloud, lambda: TPLinkHTTPTransport(pool_connections=True), server.__enter__())
+            else:
+                fleet = _Fleet(cloud, cloud.transport, None)
+            try:
+                for name in args.scenarios:
+                    key = f'{name}[n={size},strips={strip_ratio:g}]'
+                    latencies, elapsed, peak = _run(
+                        SCENARIOS[name], fleet, args.repeat, args.memory)
+                    results[key] = Result(key, latencies, elapsed, peak)
+                    if args.verbose:
+                        print_results({key: results[key]})
+            finally:
+                if server is not None:
+                    server.__exit__(None, None, None)
+    return results
+
+
+def _floats(value):
+    return [float(item) for item in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=lambda value: [int(item) for item in value.split(',')],
+                        default=[100, 1000], help='comma-separated fleet sizes')
+    parser.add_argument('--strip-ratios', type=_floats, default=[0.0, 0.5],
+                        help='comma-separated fractions of devices that are strips')
+    parser.add_argument('--scenarios', type=lambda value: value.split(','),
+                        default=list(SCENARIOS), help=f'any of {",".join(SCENARIOS)}')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help='median injected latency per cloud request')
+    parser.add_argument('--latency-distribution', choices=_LATENCY_DISTRIBUTIONS,
+                        default='lognormal')
+    parser.add_argument('--http', action='store_true',
+                        help='serve the fake cloud over HTTP instead of in-process')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='skip the peak memory runs')
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--compare', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative change counted as a regression')
+    parser.add_argument('--verbose', action='store_true', help='print each result as it is measured')
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+
+    results = run(args)
+    print_results(results)
+    if args.save_baseline:
+        parameters = {key: value for key, value in vars(args).items()
+                      if key not in ('save_baseline', 'compare', 'verbose')}
+        save_baseline(args.save_baseline, results, parameters)
+    if args.compare and compare_to_baseline(args.compare, results, args.tolerance):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
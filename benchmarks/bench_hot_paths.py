@@ -0,0 +1,209 @@
+"""Microbenchmarks of the library's per-request hot paths.
+
+Each benchmark times one step that every request (or every device in a
+device list) goes through, in isolation:
+
+    signing           signing.get_signing_headers for a passthrough body
+    api_response      TPLinkApiResponse construction and field access
+    pass_through      TPLinkDevice._pass_through_request shaping the
+                      request and picking the response apart, with a
+                      client that answers immediately (plug and outlet)
+    device_info       TPLinkDeviceInfo from a getDeviceList entry
+    sys_info          HS103, HS300 and KL430 sys info objects and views
+    schedule_rules    DeviceScheduleRules from a get_rules response
+    model_resolution  resolving device models to classes, from the
+                      registry's cache and uncached
+
+Responses are generated by the simulator's virtual devices, so they have
+the shape of real ones. Every sample times a batch of calls; latencies
+are per call.
+
+Results can be saved as a baseline and later runs compared against it
+(see benchmarks/_harness.py). Run from the repository root:
+
+    python -m benchmarks.bench_hot_paths --samples 200 --batch 500
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from tplinkcloud.api_response import TPLinkApiResponse
+from tplinkcloud.device import TPLinkDevice
+from tplinkcloud.device_info import TPLinkDeviceInfo
+from tplinkcloud.device_manager import DEVICE_REGISTRY
+from tplinkcloud.device_schedule_rules import DeviceScheduleRules
+from tplinkcloud.hs103 import HS103SysInfo, HS103SysInfoView
+from tplinkcloud.hs300 import HS300SysInfo, HS300SysInfoView
+from tplinkcloud.kl430 import KL430SysInfo, KL430SysInfoView
+from tplinkcloud.signing import get_signing_headers
+from tplinkcloud.simulator import MODELS, VirtualDevice
+
+from ._harness import Result, compare_to_baseline, print_results, save_baseline
+
+_PLUG = VirtualDevice('HS103(US)', alias='Plug')
+_STRIP = VirtualDevice('HS300(US)', alias='Strip')
+_LIGHT = VirtualDevice('KL430(US)', alias='Light')
+
+
+def _sys_info(device):
+    return device.handle({'system': {'get_sysinfo': None}})['system']['get_sysinfo']
+
+
+def _schedule_rules():
+    for minute in range(0, 1440, 180):
+        _PLUG.handle({'schedule': {'add_rule': {
+            'name': 'Schedule Rule', 'enable': 1, 'stime_opt': 0, 'smin': minute,
+            'sact': minute // 180 % 2, 'etime_opt': -1, 'emin': 0, 'eact': -1,
+            'wday': [1, 1, 1, 1, 1, 1, 1], 'repeat': 1, 'year': 0, 'month': 0, 'day': 0,
+        }}})
+    return _PLUG.handle({'schedule': {'get_rules': {}}})['schedule']['get_rules']
+
+
+class _ImmediateClient:
+    """Answers every passthrough with the same decoded response."""
+
+    def __init__(self, response):
+        self._response = response
+
+    async def pass_through_request(self, device_id, request_data, template_key=None):
+        return self._response
+
+
+def _bench_signing():
+    body = json.dumps({'method': 'passthrough', 'params': {
+        'deviceId': _PLUG.device_id,
+        'requestData': json.dumps({'system': {'get_sysinfo': None}}),
+    }}).encode()
+    return lambda: get_signing_headers(body, '/')
+
+
+def _bench_api_response():
+    response = {'error_code': 0, 'result': {
+        'responseData': json.dumps({'system': {'get_sysinfo': _sys_info(_PLUG)}})}}
+
+    def run():
+        api_response = TPLinkApiResponse(response)
+        if api_response.successful:
+            return api_response.result.get('responseData')
+        return api_response.error_code, api_response.msg
+    return run
+
+
+def _bench_pass_through(virtual_device, child_id):
+    response = virtual_device.handle({'system': {'get_sysinfo': None}})
+    device = TPLinkDevice(_ImmediateClient(response), virtual_device.device_id,
+                          None, child_id=child_id)
+
+    async def run():
+        await device._pass_through_request('system', 'get_sysinfo', None)
+    return run
+
+
+def _bench_device_info():
+    entry = _PLUG.device_list_entry('https://use1-wap.tplinkcloud.com')
+    return lambda: TPLinkDeviceInfo(entry)
+
+
+def _bench_sys_info(sys_info_cls, device):
+    sys_info = _sys_info(device)
+    return lambda: sys_info_cls(sys_info)
+
+
+def _bench_schedule_rules():
+    rules = _schedule_rules()
+    return lambda: DeviceScheduleRules(rules)
+
+
+def _bench_model_resolution(cached):
+    models = list(MODELS)
+    resolve = DEVICE_REGISTRY.resolve if cached else DEVICE_REGISTRY._resolve
+    DEVICE_REGISTRY.load_all()
+
+    def run():
+        for model in models:
+            resolve(model)
+    return run, len(models)
+
+
+BENCHMARKS = {
+    'signing': lambda: _bench_signing(),
+    'api_response': lambda: _bench_api_response(),
+    'pass_through[plug]': lambda: _bench_pass_through(_PLUG, None),
+    'pass_through[outlet]': lambda: _bench_pass_through(_STRIP, _STRIP.child_ids[2]),
+    'device_info': lambda: _bench_device_info(),
+    'sys_info[HS103]': lambda: _bench_sys_info(HS103SysInfo, _PLUG),
+    'sys_info_view[HS103]': lambda: _bench_sys_info(HS103SysInfoView, _PLUG),
+    'sys_info[HS300]': lambda: _bench_sys_info(HS300SysInfo, _STRIP),
+    'sys_info_view[HS300]': lambda: _bench_sys_info(HS300SysInfoView, _STRIP),
+    'sys_info[KL430]': lambda: _bench_sys_info(KL430SysInfo, _LIGHT),
+    'sys_info_view[KL430]': lambda: _bench_sys_info(KL430SysInfoView, _LIGHT),
+    'schedule_rules': lambda: _bench_schedule_rules(),
+    'model_resolution[cached]': lambda: _bench_model_resolution(cached=True),
+    'model_resolution[uncached]': lambda: _bench_model_resolution(cached=False),
+}
+
+
+def _measure(name, samples, batch):
+    bench = BENCHMARKS[name]()
+    calls_per_run = 1
+    if isinstance(bench, tuple):
+        bench, calls_per_run = bench
+
+    if asyncio.iscoroutinefunction(bench):
+        loop = asyncio.new_event_loop()
+
+        async def run_batch():
+            for _ in range(batch):
+                await bench()
+
+        def timed_batch():
+            start = time.perf_counter()
+            loop.run_until_complete(run_batch())
+            return time.perf_counter() - start
+    else:
+        loop = None
+
+        def timed_batch():
+            start = time.perf_counter()
+            for _ in range(batch):
+                bench()
+            return time.perf_counter() - start
+
+    timed_batch()  # warm up caches
+    calls = batch * calls_per_run
+    latencies = [timed_batch() / calls for _ in range(samples)]
+    if loop is not None:
+        loop.close()
+    return Result(name, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=100,
+                        help='timed batches per benchmark')
+    parser.add_argument('--batch', type=int, default=200, help='calls per batch')
+    parser.add_argument('--benchmarks', type=lambda value: value.split(','),
+                        default=list(BENCHMARKS), help=f'any of {",".join(BENCHMARKS)}')
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--compare', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative change counted as a regression')
+    args = parser.parse_args()
+
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    results = {name: _measure(name, args.samples, args.batch) for name in args.benchmarks}
+    print_results(results, unit='us')
+    if args.save_baseline:
+        parameters = {'samples': args.samples, 'batch': args.batch}
+        save_baseline(args.save_baseline, results, parameters)
+    if args.compare and compare_to_baseline(args.compare, results, args.tolerance):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark the cost of importing the library.
+
+Each sample imports the given statement in a fresh interpreter with
+`-X importtime` and records the cumulative time of the top-level import,
+along with which heavy dependencies ended up loaded.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --statement "from tplinkcloud import TPLinkDeviceManager"
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Modules that should only be loaded once a transport or model is used
+HEAVY_MODULES = ['aiohttp', 'requests', 'tplinkcloud.hs300', 'tplinkcloud.kl430']
+
+_REPORT_LOADED = (
+    'import sys; '
+    f'print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+)
+
+
+def _sample(statement):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'{statement}; {_REPORT_LOADED}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Top-level imports are not indented
+        if not name.startswith('  ') and cumulative.strip().isdigit():
+            total_us += int(cumulative)
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return total_us / 1000, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--statement', default='import tplinkcloud')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    samples = []
+    loaded = []
+    for _ in range(args.runs):
+        elapsed_ms, loaded = _sample(args.statement)
+        samples.append(elapsed_ms)
+
+    print(f'statement: {args.statement}')
+    print(f'median:    {statistics.median(samples):8.1f} ms')
+    print(f'min:       {min(samples):8.1f} ms')
+    print(f'max:       {max(samples):8.1f} ms')
+    print(f'loaded:    {", ".join(loaded) or "none of " + ", ".join(HEAVY_MODULES)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark the encode/sign/decode path of a passthrough request per JSON codec.
+
+Each iteration does the client-side work of one `pass_through_request`
+without the network: encode `requestData`, encode the outer body, sign
+it, decode the HTTP response body and decode the inner `responseData`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_json_codec --count 20000
+"""
+
+import argparse
+import json
+import time
+
+from tplinkcloud.json_codec import JSON_CODECS, get_json_codec
+from tplinkcloud.signing import get_signing_headers
+
+REQUEST_DATA = {'system': {'get_sysinfo': {}}}
+
+SYS_INFO = {
+    'err_code': 0, 'sw_ver': '1.0.19', 'hw_ver': '1.0', 'model': 'HS300(US)',
+    'deviceId': '0' * 40, 'oemId': 'C20341B1E3455640F77F93C8286CD3E3',
+    'hwId': 'F0209F82A6A831CA4AD1CEE3FE574BA2', 'rssi': -38, 'alias': 'Strip',
+    'mic_type': 'IOT.SMARTPLUGSWITCH', 'feature': 'TIM:ENE', 'mac': '28:A6:9C:74:BA:90',
+    'children': [
+        {'id': f'{"0" * 40}{child:02d}', 'state': 1, 'alias': f'Outlet {child}',
+         'on_time': 100, 'next_action': {'type': -1}}
+        for child in range(6)
+    ],
+    'child_num': 6,
+}
+
+# The HTTP response body wraps the device response as a JSON string
+RESPONSE_BODY = json.dumps({
+    'error_code': 0,
+    'result': {'responseData': json.dumps({'system': {'get_sysinfo': SYS_INFO}})},
+}).encode()
+
+
+def _pass_through(codec):
+    body = {
+        'method': 'passthrough',
+        'params': {
+            'deviceId': '0' * 40,
+            'requestData': codec.dumps(REQUEST_DATA),
+        },
+    }
+    body_json = codec.dumps(body)
+    get_signing_headers(body_json, '/')
+    response_json = codec.loads(RESPONSE_BODY)
+    return codec.loads(response_json['result']['responseData'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=20_000)
+    args = parser.parse_args()
+
+    for name in JSON_CODECS:
+        try:
+            codec = get_json_codec(name)
+        except ImportError:
+            print(f'{name:<10} not installed')
+            continue
+        start = time.perf_counter()
+        for _ in range(args.count):
+            _pass_through(codec)
+        elapsed = time.perf_counter() - start
+        print(f'{name:<10} {elapsed * 1e6 / args.count:8.2f} us/request')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark the library's own overhead per request, without a network.
+
+Uses a `TPLinkInMemoryTransport` that answers `getDeviceList` with a
+fleet of HS100 plugs and every passthrough with a canned `get_sysinfo`
+response, then times listing the devices and polling `is_on` for all
+of them. Everything measured is client-side work: building, encoding
+and signing requests, decoding responses and constructing objects.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_library_overhead --devices 1000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from tplinkcloud.device_manager import TPLinkDeviceManager
+from tplinkcloud.transport import TPLinkInMemoryTransport
+
+SYS_INFO_RESPONSE = {
+    'error_code': 0,
+    'result': {'responseData': json.dumps({'system': {'get_sysinfo': {
+        'err_code': 0, 'sw_ver': '1.2.6', 'hw_ver': '1.0', 'model': 'HS100(US)',
+        'deviceId': '0' * 40, 'alias': 'Plug', 'relay_state': 1, 'on_time': 100,
+        'feature': 'TIM', 'rssi': -50, 'led_off': 0,
+    }}})},
+}
+
+
+def _handler(devices):
+    device_list = {
+        'error_code': 0,
+        'result': {'deviceList': [
+            {'deviceId': f'{index:040X}', 'deviceModel': 'HS100(US)', 'alias': f'Plug {index}',
+             'appServerUrl': 'https://use1-wap.tplinkcloud.com', 'status': 1}
+            for index in range(devices)
+        ]},
+    }
+
+    def handle(request):
+        if request.body.startswith(b'{"method": "getDeviceList"'):
+            return device_list
+        return SYS_INFO_RESPONSE
+
+    return handle
+
+
+async def main_async(args):
+    device_manager = TPLinkDeviceManager(
+        cache_devices=False, include_tapo=False,
+        transport=TPLinkInMemoryTransport(_handler(args.devices)),
+    )
+    device_manager.set_auth_token('token')
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        devices = await device_manager.get_devices()
+    elapsed = time.perf_counter() - start
+    print(f'get_devices      {elapsed * 1e6 / (args.rounds * args.devices):8.2f} us/device')
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        await asyncio.gather(*(device.is_on() for device in devices))
+    elapsed = time.perf_counter() - start
+    print(f'is_on            {elapsed * 1e6 / (args.rounds * args.devices):8.2f} us/request')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--devices', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
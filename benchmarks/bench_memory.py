@@ -0,0 +1,126 @@
+"""Benchmark the memory held by device info, sys info and emeter summaries.
+
+Builds a fleet's worth of `TPLinkDeviceInfo` and sys info objects plus a
+year of daily emeter rows per outlet, and reports the bytes allocated
+per object with tracemalloc (the raw response dicts are built before
+measurement starts and are not counted).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory --devices 3000 --days 365
+"""
+
+import argparse
+import tracemalloc
+
+from tplinkcloud.device_info import TPLinkDeviceInfo
+from tplinkcloud.device_schedule_rules import DeviceScheduleRule
+from tplinkcloud.emeter_device import CurrentPower, DayPowerSummary, MonthPowerSummary
+from tplinkcloud.hs100 import HS100SysInfo
+from tplinkcloud.hs300 import HS300SysInfo
+
+
+def _device_info(index):
+    return {
+        'deviceType': 'IOT.SMARTPLUGSWITCH',
+        'role': 0,
+        'fwVer': '1.0.19 Build 200224 Rel.090814',
+        'appServerUrl': 'https://use1-wap.tplinkcloud.com',
+        'deviceRegion': 'us-east-1',
+        'deviceId': f'{index:040X}',
+        'deviceName': 'Wi-Fi Smart Power Strip',
+        'deviceHwVer': '1.0',
+        'alias': f'Device {index}',
+        'deviceMac': f'{index:012X}',
+        'oemId': 'C20341B1E3455640F77F93C8286CD3E3',
+        'deviceModel': 'HS300(US)',
+        'hwId': 'F0209F82A6A831CA4AD1CEE3FE574BA2',
+        'fwId': '00000000000000000000000000000000',
+        'isSameRegion': True,
+        'status': 1,
+    }
+
+
+def _hs100_sys_info(index):
+    return {
+        'err_code': 0, 'sw_ver': '1.2.6', 'hw_ver': '1.0', 'type': 'IOT.SMARTPLUGSWITCH',
+        'model': 'HS100(US)', 'mac': f'{index:012X}', 'deviceId': f'{index:040X}',
+        'hwId': 'E0CF474A985A06B8A9EE75C1FEBE03C7', 'fwId': '0' * 32,
+        'oemId': '3580D70F8387F7B530A5020A325EE8CC', 'alias': f'Plug {index}',
+        'dev_name': 'Wi-Fi Smart Plug', 'icon_hash': '', 'relay_state': 1,
+        'on_time': 100, 'active_mode': 'schedule', 'feature': 'TIM', 'updating': 0,
+        'rssi': -50, 'led_off': 0, 'latitude': 0, 'longitude': 0,
+    }
+
+
+def _hs300_sys_info(index):
+    return {
+        'sw_ver': '1.0.19', 'hw_ver': '1.0', 'model': 'HS300(US)',
+        'deviceId': f'{index:040X}', 'oemId': 'C20341B1E3455640F77F93C8286CD3E3',
+        'hwId': 'F0209F82A6A831CA4AD1CEE3FE574BA2', 'rssi': -38,
+        'longitude_i': 1140579, 'latitude_i': 225431, 'alias': f'Strip {index}',
+        'status': 'new', 'mic_type': 'IOT.SMARTPLUGSWITCH', 'feature': 'TIM:ENE',
+        'mac': f'{index:012X}', 'updating': 0, 'led_off': 0,
+        'children': [
+            {'id': f'{index:040X}{child:02d}', 'state': 1, 'alias': f'Outlet {child}',
+             'on_time': 100, 'next_action': {'type': -1}}
+            for child in range(6)
+        ],
+        'child_num': 6, 'err_code': 0,
+    }
+
+
+def _measure(label, items, factory):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = [factory(item) for item in items]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Exclude the list holding the objects themselves
+    total = after - before - objects.__sizeof__()
+    print(f'{label:<28} {len(objects):>10,} objects  '
+          f'{total / len(objects):8.1f} B/object  {total / 2**20:8.1f} MiB total')
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--devices', type=int, default=3000)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+
+    device_infos = [_device_info(index) for index in range(args.devices)]
+    hs100_sys_infos = [_hs100_sys_info(index) for index in range(args.devices)]
+    hs300_sys_infos = [_hs300_sys_info(index) for index in range(args.devices // 6 or 1)]
+    realtime = [
+        {'voltage_mv': 120000 + index, 'current_ma': 100, 'power_mw': 12000, 'total_wh': index,
+         'err_code': 0}
+        for index in range(args.devices)
+    ]
+    day_rows = [
+        {'year': 2021, 'month': 1 + (index // 31) % 12, 'day': 1 + index % 28, 'energy_wh': index % 500}
+        for index in range(args.devices * args.days)
+    ]
+    month_rows = [
+        {'year': 2021, 'month': 1 + index % 12, 'energy_wh': index % 5000}
+        for index in range(args.devices * 12)
+    ]
+    rules = [
+        {'id': f'{index:032X}', 'name': 'Schedule Rule', 'enable': 1, 'wday': [1, 1, 1, 1, 1, 1, 1],
+         'stime_opt': 0, 'soffset': 0, 'smin': 420, 'sact': 1, 'etime_opt': -1, 'eoffset': 0,
+         'emin': 0, 'eact': -1, 'repeat': 1, 'year': 0, 'month': 0, 'day': 0}
+        for index in range(args.devices)
+    ]
+
+    _measure('TPLinkDeviceInfo', device_infos, TPLinkDeviceInfo)
+    _measure('HS100SysInfo', hs100_sys_infos, HS100SysInfo)
+    _measure('HS300SysInfo (6 children)', hs300_sys_infos, HS300SysInfo)
+    _measure('CurrentPower', realtime, CurrentPower)
+    _measure('DeviceScheduleRule', rules, DeviceScheduleRule)
+    _measure('MonthPowerSummary', month_rows, MonthPowerSummary)
+    _measure('DayPowerSummary', day_rows, DayPowerSummary)
+
+
+if __name__ == '__main__':
+    main()
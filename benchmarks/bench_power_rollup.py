@@ -0,0 +1,68 @@
+"""Benchmark rolling realtime power readings up into energy buckets.
+
+Fills a `RealtimePowerHistory` with a day of readings every 5 seconds for
+each outlet and times `rollup_energy` into one minute, 15 minute and one
+hour buckets, and the group totals of the hourly rollup.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_power_rollup --outlets 3000
+"""
+
+import argparse
+import random
+import time
+from array import array
+
+from tplinkcloud.power_rollup import HOUR, MINUTE, QUARTER_HOUR, rollup_energy
+from tplinkcloud.realtime_power_buffer import RealtimePowerBuffer, RealtimePowerHistory
+
+START = 1_700_000_000
+
+
+def _history(outlets, readings, interval):
+    history = RealtimePowerHistory(readings)
+    timestamps = array('d', (START + index * interval for index in range(readings)))
+    rng = random.Random(1)
+    power = array('f', (rng.uniform(0, 100_000) for _ in range(readings)))
+    for outlet in range(outlets):
+        buffer = RealtimePowerBuffer(readings)
+        # Appending readings one by one would dominate the setup time
+        buffer._timestamp[:] = timestamps
+        buffer._fields['power_mw'][:] = power
+        buffer._size = readings
+        history._buffers[(f'{outlet:040X}', None)] = buffer
+    return history
+
+
+def _timed(label, repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f'{label:<24} {best * 1000:8.1f} ms')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--outlets', type=int, default=3000)
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--interval', type=float, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    readings = int(args.hours * 3600 / args.interval)
+    history = _history(args.outlets, readings, args.interval)
+    print(f'{args.outlets} outlets, {readings} readings each')
+
+    _timed('1 minute buckets', args.repeat, lambda: rollup_energy(history, bucket=MINUTE))
+    _timed('15 minute buckets', args.repeat, lambda: rollup_energy(history, bucket=QUARTER_HOUR))
+    rollup = _timed('1 hour buckets', args.repeat, lambda: rollup_energy(history, bucket=HOUR))
+    groups = {group: rollup.keys[group::10] for group in range(10)}
+    _timed('10 group totals', args.repeat, lambda: rollup.group_energy_wh(groups))
+
+
+if __name__ == '__main__':
+    main()
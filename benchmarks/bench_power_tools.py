@@ -0,0 +1,83 @@
+"""Benchmark TPLinkDeviceManagerPowerTools against a simulated fleet of outlets.
+
+Builds a `FakeCloud` with enough HS300 strips for the requested number
+of energy-monitored outlets and times listing the devices and the
+realtime, daily and monthly power usage fan-outs over all of them. The
+cloud runs in-process, so without `--latency-ms` the times are the
+library's and the simulator's own work.
+
+With `--soak-hours` the simulated clock is advanced between rounds and
+a random tenth of the outlets is switched, so the devices accrue energy
+as they would over that many hours.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_power_tools --outlets 10000 --rounds 3
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from tplinkcloud.device_manager import TPLinkDeviceManager
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.simulator import FakeCloud, SimulatedClock, lognormal_latency
+
+
+async def _timed(label, coro, count):
+    start = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - start
+    print(f'{label:<16} {elapsed:8.3f} s  {count / elapsed:10.0f} outlets/s')
+    return result
+
+
+async def main_async(args):
+    clock = SimulatedClock()
+    strips = -(-args.outlets // 6)
+    cloud = FakeCloud(
+        fleet_size=strips,
+        models=['HS300(US)'],
+        latency=lognormal_latency(args.latency_ms / 1000) if args.latency_ms else None,
+        seed=1,
+        clock=clock,
+    )
+    device_manager = TPLinkDeviceManager(
+        cloud.username, cloud.password, cache_devices=False, include_tapo=False,
+        transport=cloud.transport(),
+    )
+    power_tools = TPLinkDeviceManagerPowerTools(device_manager)
+    rng = random.Random(1)
+    outlets = strips * 6
+    print(f'{strips} strips, {outlets} outlets')
+
+    for round_number in range(args.rounds):
+        devices = await _timed('get_devices', device_manager.get_devices(), outlets)
+        children = [device for device in devices if device.child_id]
+        await _timed('realtime', power_tools._get_power_usage_realtime(children), outlets)
+        await _timed('day', power_tools._get_power_usage_day(children), outlets)
+        await _timed('month', power_tools._get_power_usage_month(children), outlets)
+
+        if args.soak_hours:
+            switched = rng.sample(children, len(children) // 10)
+            await asyncio.gather(*(device.toggle() for device in switched))
+            clock.advance(args.soak_hours * 3600 / args.rounds)
+        print()
+
+    print('requests:', dict(cloud.request_counts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--outlets', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help='median simulated cloud latency per request')
+    parser.add_argument('--soak-hours', type=float, default=0,
+                        help='simulated hours to spread over the rounds')
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
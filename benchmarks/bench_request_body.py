@@ -0,0 +1,99 @@
+"""Benchmark the allocations made to encode and sign a passthrough body.
+
+Compares encoding the body to a `str` (which is then encoded again for
+the Content-MD5 and again by the HTTP library) with encoding it to
+`bytes` once and reusing the buffer, for each installed JSON codec. The
+body is a schedule `edit_rule` request with a batch of rules, which is
+among the largest bodies the client sends. Reports the time per request
+and the peak memory allocated while encoding and signing one body,
+measured with tracemalloc.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_request_body --rules 32
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from tplinkcloud.json_codec import JSON_CODECS, get_json_codec
+from tplinkcloud.signing import get_signer
+
+DEVICE_ID = '8006' + '0' * 36
+
+
+def _request_data(rules):
+    return {
+        'schedule': {
+            'edit_rule': [
+                {
+                    'id': f'{index:032X}', 'name': f'Rule {index}', 'enable': 1,
+                    'wday': [1, 1, 1, 1, 1, 0, 0], 'stime_opt': 0, 'smin': 420 + index,
+                    'sact': 1, 'etime_opt': -1, 'emin': 0, 'eact': -1, 'repeat': 1,
+                    'year': 0, 'month': 0, 'day': 0, 'force': 0, 'latitude': 0,
+                    'longitude': 0,
+                }
+                for index in range(rules)
+            ]
+        }
+    }
+
+
+def _str_body(codec, signer, body):
+    body_json = codec.dumps(body)
+    signer.get_headers(body_json, '/')
+    # aiohttp and requests encode str payloads before sending
+    return body_json.encode()
+
+
+def _bytes_body(codec, signer, body):
+    body_bytes = codec.dumps_bytes(body)
+    signer.get_headers(body_bytes, '/')
+    return body_bytes
+
+
+def _peak(func, *args):
+    func(*args)  # warm up caches so only per-request allocations are counted
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - before
+
+
+def _time(count, func, *args):
+    start = time.perf_counter()
+    for _ in range(count):
+        func(*args)
+    return (time.perf_counter() - start) * 1e6 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rules', type=int, default=32)
+    parser.add_argument('--count', type=int, default=2_000)
+    args = parser.parse_args()
+
+    signer = get_signer()
+    for name in JSON_CODECS:
+        try:
+            codec = get_json_codec(name)
+        except ImportError:
+            print(f'{name:<10} not installed')
+            continue
+        body = {
+            'method': 'passthrough',
+            'params': {'deviceId': DEVICE_ID, 'requestData': codec.dumps(_request_data(args.rules))},
+        }
+        size = len(codec.dumps_bytes(body))
+        for label, func in (('str', _str_body), ('bytes', _bytes_body)):
+            peak = _peak(func, codec, signer, body)
+            elapsed = _time(args.count, func, codec, signer, body)
+            print(f'{name:<10} {label:<6} body {size:6d} B  peak {peak:6d} B  {elapsed:7.2f} us/request')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark passthrough request preparation with and without templates.
+
+Sends `system.get_sysinfo` through a `TPLinkDeviceClient` whose HTTP
+post is replaced by a stub that only builds the signed headers, so the
+timings cover the client-side work per request: building and encoding
+the body, Content-MD5, signing and decoding the response.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_request_templates --count 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+from tplinkcloud.api_response import TPLinkApiResponse
+from tplinkcloud.device_client import TPLinkDeviceClient
+
+DEVICE_ID = '8006' + '0' * 36
+REQUEST_DATA = {'system': {'get_sysinfo': None}, 'context': {'child_ids': [DEVICE_ID + '00']}}
+TEMPLATE_KEY = (DEVICE_ID + '00', 'system', 'get_sysinfo', None)
+RESPONSE = TPLinkApiResponse({
+    'error_code': 0,
+    'result': {'responseData': '{"system": {"get_sysinfo": {"relay_state": 1}}}'},
+})
+
+
+def _client():
+    client = TPLinkDeviceClient('https://example.com', 'token')
+
+    async def post(body_json, content_md5, url_path='/'):
+        client._signer.authorization(content_md5, url_path)
+        return RESPONSE
+
+    client._post = post
+    return client
+
+
+async def _run(count, template_key):
+    client = _client()
+    start = time.perf_counter()
+    for _ in range(count):
+        await client.pass_through_request(DEVICE_ID, REQUEST_DATA, template_key=template_key)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=20_000)
+    args = parser.parse_args()
+
+    for label, template_key in (('no template', None), ('template', TEMPLATE_KEY)):
+        elapsed = asyncio.run(_run(args.count, template_key))
+        print(f'{label:<12} {elapsed * 1e6 / args.count:8.2f} us/request')
+
+
+if __name__ == '__main__':
+    main()
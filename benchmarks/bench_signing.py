@@ -0,0 +1,67 @@
+"""Benchmark request signing against the previous per-call implementation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_signing --count 100000
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import time
+import uuid
+
+from tplinkcloud.signing import (
+    ACCESS_KEY,
+    SECRET_KEY,
+    SIGNING_TIMESTAMP,
+    get_signer,
+    get_signing_headers,
+)
+
+BODY = (
+    '{"method": "passthrough", "params": {"deviceId": "800612345678901234567890123456789012345678", '
+    '"requestData": "{\\"system\\": {\\"get_sysinfo\\": {}}}"}}'
+)
+
+
+def _legacy_signing_headers(body_json, url_path):
+    # The implementation before Signer: re-keys the HMAC and draws a
+    # uuid4 nonce on every call
+    content_md5 = base64.b64encode(hashlib.md5(body_json.encode()).digest()).decode()
+    nonce = str(uuid.uuid4())
+    sig_string = f"{content_md5}\n{SIGNING_TIMESTAMP}\n{nonce}\n{url_path}"
+    signature = hmac.new(SECRET_KEY.encode(), sig_string.encode(), hashlib.sha1).hexdigest()
+    authorization = (
+        f"Timestamp={SIGNING_TIMESTAMP}, "
+        f"Nonce={nonce}, "
+        f"AccessKey={ACCESS_KEY}, "
+        f"Signature={signature}"
+    )
+    return {"Content-MD5": content_md5, "X-Authorization": authorization}
+
+
+def _timed(label, count, func, *args):
+    start = time.perf_counter()
+    for _ in range(count):
+        func(*args)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28} {elapsed * 1e9 / count:8.0f} ns/request')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args()
+
+    signer = get_signer()
+    body_bytes = BODY.encode()
+    _timed('legacy', args.count, _legacy_signing_headers, BODY, '/')
+    _timed('get_signing_headers', args.count, get_signing_headers, BODY, '/')
+    _timed('Signer.get_headers (str)', args.count, signer.get_headers, BODY, '/')
+    _timed('Signer.get_headers (bytes)', args.count, signer.get_headers, body_bytes, '/')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark sys info objects against sys info views on a polling path.
+
+Times building a sys info object from a `get_sysinfo` response and
+reading `relay_state` (or the first child's `state` for strips), which
+is what `is_on` does on every poll.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sys_info_view --count 100000
+"""
+
+import argparse
+import time
+
+from tplinkcloud.hs100 import HS100SysInfo, HS100SysInfoView
+from tplinkcloud.hs300 import HS300SysInfo, HS300SysInfoView
+
+HS100_SYS_INFO = {
+    'err_code': 0, 'sw_ver': '1.2.6', 'hw_ver': '1.0', 'type': 'IOT.SMARTPLUGSWITCH',
+    'model': 'HS100(US)', 'mac': '50:C7:BF:00:00:00', 'deviceId': '0' * 40,
+    'hwId': 'E0CF474A985A06B8A9EE75C1FEBE03C7', 'fwId': '0' * 32,
+    'oemId': '3580D70F8387F7B530A5020A325EE8CC', 'alias': 'Plug',
+    'dev_name': 'Wi-Fi Smart Plug', 'icon_hash': '', 'relay_state': 1,
+    'on_time': 100, 'active_mode': 'schedule', 'feature': 'TIM', 'updating': 0,
+    'rssi': -50, 'led_off': 0, 'latitude': 0, 'longitude': 0,
+}
+
+HS300_SYS_INFO = {
+    'sw_ver': '1.0.19', 'hw_ver': '1.0', 'model': 'HS300(US)', 'deviceId': '0' * 40,
+    'oemId': 'C20341B1E3455640F77F93C8286CD3E3', 'hwId': 'F0209F82A6A831CA4AD1CEE3FE574BA2',
+    'rssi': -38, 'longitude_i': 1140579, 'latitude_i': 225431, 'alias': 'Strip',
+    'status': 'new', 'mic_type': 'IOT.SMARTPLUGSWITCH', 'feature': 'TIM:ENE',
+    'mac': '28:A6:9C:74:BA:90', 'updating': 0, 'led_off': 0,
+    'children': [
+        {'id': f'{"0" * 40}{child:02d}', 'state': 1, 'alias': f'Outlet {child}',
+         'on_time': 100, 'next_action': {'type': -1}}
+        for child in range(6)
+    ],
+    'child_num': 6, 'err_code': 0,
+}
+
+
+def _timed(label, count, func):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<32} {elapsed * 1e9 / count:8.0f} ns/poll')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args()
+
+    _timed('HS100SysInfo.relay_state', args.count,
+           lambda: HS100SysInfo(HS100_SYS_INFO).relay_state)
+    _timed('HS100SysInfoView.relay_state', args.count,
+           lambda: HS100SysInfoView(HS100_SYS_INFO).relay_state)
+    _timed('HS300SysInfo.alias', args.count,
+           lambda: HS300SysInfo(HS300_SYS_INFO).alias)
+    _timed('HS300SysInfoView.alias', args.count,
+           lambda: HS300SysInfoView(HS300_SYS_INFO).alias)
+    _timed('HS300SysInfo child state', args.count,
+           lambda: HS300SysInfo(HS300_SYS_INFO).children[0].state)
+    _timed('HS300SysInfoView child state', args.count,
+           lambda: HS300SysInfoView(HS300_SYS_INFO).children[0].state)
+
+
+if __name__ == '__main__':
+    main()
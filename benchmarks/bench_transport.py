@@ -0,0 +1,80 @@
+"""Benchmark passthrough throughput with and without pooled connections.
+
+Starts a local aiohttp server that answers passthrough requests and
+sends `get_sysinfo` through a `TPLinkDeviceClient`, first with a new
+aiohttp session per request (the default outside of `async with`) and
+then with a pooled `TPLinkHTTPTransport` that keeps connections alive
+between requests.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_transport --count 2000 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+from tplinkcloud.device_client import TPLinkDeviceClient
+from tplinkcloud.transport import TPLinkHTTPTransport
+
+RESPONSE = {
+    'error_code': 0,
+    'result': {'responseData': '{"system": {"get_sysinfo": {"relay_state": 1}}}'},
+}
+
+
+async def _serve():
+    async def handle(request):
+        await request.read()
+        return web.json_response(RESPONSE)
+
+    app = web.Application()
+    app.router.add_post('/', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, f'http://127.0.0.1:{runner.addresses[0][1]}'
+
+
+async def _run(host, transport, count, concurrency):
+    client = TPLinkDeviceClient(host, 'token', transport=transport)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(index):
+        async with semaphore:
+            await client.pass_through_request(
+                f'{index % 100:040X}', {'system': {'get_sysinfo': None}})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(index) for index in range(count)))
+    elapsed = time.perf_counter() - start
+    await transport.aclose()
+    return elapsed
+
+
+async def main_async(args):
+    runner, host = await _serve()
+    try:
+        for label, transport in (
+            ('session per request', TPLinkHTTPTransport()),
+            ('shared transport', TPLinkHTTPTransport(pool_connections=True)),
+        ):
+            elapsed = await _run(host, transport, args.count, args.concurrency)
+            print(f'{label:<20} {args.count / elapsed:8.0f} requests/s')
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=10)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -19,3 +19,25 @@ def tests_setup_and_teardown():
     # Will be executed after the last test
     os.environ.clear()
     os.environ.update(original_environ)
+
+
+@pytest.fixture
+def fleet_cloud():
+    """The simulated cloud of the `fleet` fixture.
+
+    Modules that need other devices, latency or a clock override this.
+    """
+    from tplinkcloud.simulator import FakeCloud, make_fleet
+
+    return FakeCloud(make_fleet(3, models=['HS110(US)', 'HS300(US)']))
+
+
+@pytest.fixture
+async def fleet(fleet_cloud):
+    """A `FakeCloud` and a device manager logged in to it."""
+    from tplinkcloud.device_manager import TPLinkDeviceManager
+
+    device_manager = await TPLinkDeviceManager(
+        fleet_cloud.username, fleet_cloud.password,
+        transport=fleet_cloud.transport(), include_tapo=False)
+    return fleet_cloud, device_manager
@@ -0,0 +1,154 @@
+import json
+import time
+
+import pytest
+
+from tplinkcloud.cassette import (
+    TPLinkCassetteError,
+    TPLinkRecordingTransport,
+    TPLinkReplayTransport,
+)
+from tplinkcloud.device_manager import TPLinkDeviceManager
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.simulator import FakeCloud, constant_latency, make_fleet
+
+
+def _usage(readings):
+    return [(reading.name, reading.data.power_mw) for reading in readings]
+
+
+async def _poll(transport, username='user@example.com', password='password'):
+    device_manager = await TPLinkDeviceManager(username, password, transport=transport)
+    power_tools = TPLinkDeviceManagerPowerTools(device_manager)
+    readings = await power_tools.get_devices_power_usage_realtime('HS')
+    plug = await device_manager.find_device('HS103 3')
+    await plug.power_on()
+    return _usage(readings), await plug.is_on()
+
+
+@pytest.fixture
+async def cassette(tmp_path):
+    """A recording of a manager polling a small fleet."""
+    path = tmp_path / 'fleet.ndjson'
+    cloud = FakeCloud(make_fleet(4, models=['HS110(US)', 'HS300(US)', 'HS103(US)']))
+    transport = TPLinkRecordingTransport(cloud.transport(), path)
+    result = await _poll(transport)
+    await transport.aclose()
+    return path, result
+
+
+class TestRecording:
+
+    @pytest.mark.asyncio
+    async def test_cassette_lines(self, cassette):
+        path, _ = cassette
+        entries = [json.loads(line) for line in path.read_text().splitlines()]
+
+        paths = [entry['path'] for entry in entries]
+        assert paths[:2] == ['/api/v2/account/getAccountStatusAndUrl', '/api/v2/account/login']
+        assert all(entry['status'] == 200 and entry['elapsed'] >= 0 for entry in entries)
+        assert [entry['t'] for entry in entries] == sorted(entry['t'] for entry in entries)
+
+        login = entries[1]
+        assert 'cloudPassword' not in login['request']
+        assert 'terminalUUID' not in login['request']
+        assert login['data']['result']['token'] == 'redacted'
+
+        passthrough = next(entry for entry in entries if entry['request'].get('method') == 'passthrough')
+        assert isinstance(passthrough['request']['params']['requestData'], dict)
+
+    @pytest.mark.asyncio
+    async def test_sanitize(self, tmp_path):
+        path = tmp_path / 'fleet.ndjson'
+        cloud = FakeCloud(make_fleet(2, models=['HS103(US)']))
+
+        def sanitize(entry):
+            if entry['request'].get('method') == 'passthrough':
+                return None
+            entry['data'] = json.loads(json.dumps(entry['data']).replace('HS103', 'Plug'))
+            return entry
+
+        transport = TPLinkRecordingTransport(cloud.transport(), path, sanitize=sanitize)
+        device_manager = await TPLinkDeviceManager(
+            cloud.username, cloud.password, transport=transport)
+        await (await device_manager.find_device('HS103 1')).is_on()
+        await transport.aclose()
+
+        text = path.read_text()
+        assert 'passthrough' not in text
+        assert 'HS103' not in text
+
+
+class TestReplay:
+
+    @pytest.mark.asyncio
+    async def test_replay_matches_recording(self, cassette):
+        path, recorded = cassette
+        transport = TPLinkReplayTransport(path)
+        assert await _poll(transport) == recorded
+        assert transport.misses == []
+
+    @pytest.mark.asyncio
+    async def test_nonces_and_signatures_are_ignored(self, cassette):
+        path, _ = cassette
+        transport = TPLinkReplayTransport(path, repeat=False)
+        headers = {'X-Authorization': 'Timestamp=1, Nonce=other, AccessKey=x, Signature=y'}
+        entry = json.loads(path.read_text().splitlines()[-1])
+        request = entry['request']
+        if request.get('method') == 'passthrough':
+            request['params']['requestData'] = json.dumps(request['params']['requestData'])
+        body = json.dumps(request).encode()
+
+        response = await transport.post_async(
+            'https://elsewhere.example.com' + entry['path'], body,
+            {'appName': entry['app'], 'token': 'another-token'}, headers, timeout=1)
+        assert response.status == 200
+        assert response.data == entry['data']
+
+    @pytest.mark.asyncio
+    async def test_unrecorded_request(self, cassette):
+        path, _ = cassette
+        transport = TPLinkReplayTransport(path)
+        device_manager = await TPLinkDeviceManager(
+            'user@example.com', 'password', transport=transport)
+        plug = await device_manager.find_device('HS103 3')
+
+        with pytest.raises(TPLinkCassetteError):
+            await plug.power_off()
+        assert len(transport.misses) == 1
+
+    @pytest.mark.asyncio
+    async def test_repeat(self, cassette):
+        path, _ = cassette
+        repeating = TPLinkReplayTransport(path)
+        assert await _poll(repeating) == await _poll(repeating)
+
+        once = TPLinkReplayTransport(path, repeat=False)
+        await _poll(once)
+        with pytest.raises(TPLinkCassetteError):
+            await _poll(once)
+
+    @pytest.mark.asyncio
+    async def test_recorded_timing(self, tmp_path):
+        path = tmp_path / 'slow.ndjson'
+        cloud = FakeCloud(make_fleet(1, models=['HS103(US)']), latency=constant_latency(0.02))
+        transport = TPLinkRecordingTransport(cloud.transport(), path)
+        device_manager = await TPLinkDeviceManager(
+            cloud.username, cloud.password, transport=transport)
+        await transport.aclose()
+        requests = len(path.read_text().splitlines())
+
+        start = time.perf_counter()
+        await TPLinkDeviceManager(
+            cloud.username, cloud.password, transport=TPLinkReplayTransport(path))
+        fast = time.perf_counter() - start
+
+        start = time.perf_counter()
+        replay = TPLinkReplayTransport(path, timing=True, speed=2)
+        assert len(replay) == requests
+        await TPLinkDeviceManager(cloud.username, cloud.password, transport=replay)
+        timed = time.perf_counter() - start
+
+        assert device_manager is not None
+        assert fast < 0.01 * requests
+        assert timed >= 0.01 * requests
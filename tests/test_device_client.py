@@ -1,6 +1,9 @@
+import json
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from tplinkcloud.device import TPLinkDevice
 from tplinkcloud.device_client import TPLinkDeviceClient
 
 
@@ -76,3 +79,69 @@ class TestPassThroughRequest:
             )
 
         assert result is None
+
+
+class TestRequestTemplates:
+
+    def _client(self, cloud_type='kasa'):
+        return TPLinkDeviceClient(
+            host='http://test.example.com',
+            token='test_token',
+            cloud_type=cloud_type,
+        )
+
+    def _response(self):
+        mock_response = MagicMock()
+        mock_response.successful = True
+        mock_response.result = {'responseData': '{"system": {"get_sysinfo": {}}}'}
+        return mock_response
+
+    @pytest.mark.asyncio
+    async def test_body_is_serialized_once_per_key(self):
+        client = self._client()
+        request_data = {'system': {'get_sysinfo': None}}
+        key = (None, 'system', 'get_sysinfo', None)
+
+        with patch.object(client, '_post', new_callable=AsyncMock) as mock_post, \
+                patch.object(client._json_codec, 'dumps', wraps=client._json_codec.dumps) as dumps:
+            mock_post.return_value = self._response()
+            await client.pass_through_request('device123', request_data, template_key=key)
+            await client.pass_through_request('device123', request_data, template_key=key)
+
+        # requestData and the outer body on the first request only
+        assert dumps.call_count == 2
+        first, second = mock_post.call_args_list
+        assert first == second
+        body_json, content_md5, url_path = first.args
+        assert json.loads(body_json)['params']['deviceId'] == 'device123'
+        assert content_md5 == client._signer.content_md5(body_json)
+        assert url_path == '/'
+
+    @pytest.mark.asyncio
+    async def test_templates_are_per_device(self):
+        client = self._client(cloud_type='tapo')
+        key = (None, 'system', 'get_sysinfo', None)
+
+        with patch.object(client, '_post', new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = self._response()
+            await client.pass_through_request('device1', {}, template_key=key)
+            await client.pass_through_request('device2', {}, template_key=key)
+
+        first, second = mock_post.call_args_list
+        assert json.loads(first.args[0])['deviceId'] == 'device1'
+        assert json.loads(second.args[0])['deviceId'] == 'device2'
+        assert first.args[2] == '/api/v2/common/passthrough'
+
+    @pytest.mark.asyncio
+    async def test_device_uses_templates_for_polled_requests_only(self):
+        client = MagicMock()
+        client.pass_through_request = AsyncMock(return_value=None)
+        device = TPLinkDevice(client, 'device123', MagicMock(), child_id='device12300')
+
+        await device.power_on()
+        await device.get_schedule_rules()
+
+        templated, plain = client.pass_through_request.call_args_list
+        assert templated.kwargs['template_key'] == (
+            'device12300', 'system', 'set_relay_state', (('state', 1),))
+        assert 'template_key' not in plain.kwargs
@@ -0,0 +1,133 @@
+import pytest
+from unittest.mock import MagicMock
+
+from tplinkcloud.device import TPLinkDevice
+from tplinkcloud.device_manager import DEVICE_REGISTRY, TPLinkDeviceManager
+from tplinkcloud.device_registry import TPLinkDeviceRegistry
+from tplinkcloud.hs110 import HS110
+from tplinkcloud.hs300 import HS300
+from tplinkcloud.kp125 import KP125
+
+
+class CustomDevice(TPLinkDevice):
+    pass
+
+
+class TestTPLinkDeviceRegistry:
+
+    def test_resolves_by_prefix(self):
+        registry = TPLinkDeviceRegistry({'HS300': HS300})
+        assert registry.resolve('HS300(US)') is HS300
+
+    def test_unknown_model_resolves_to_default(self):
+        registry = TPLinkDeviceRegistry({'HS300': HS300})
+        assert registry.resolve('P100') is TPLinkDevice
+        assert registry.resolve('HS30') is TPLinkDevice
+
+    def test_missing_model_resolves_to_default(self):
+        registry = TPLinkDeviceRegistry({'HS300': HS300})
+        assert registry.resolve(None) is TPLinkDevice
+        assert registry.resolve('') is TPLinkDevice
+
+    def test_longest_prefix_wins_regardless_of_order(self):
+        registry = TPLinkDeviceRegistry()
+        registry.register('KP125M', CustomDevice)
+        registry.register('KP125', KP125)
+        assert registry.resolve('KP125M(US)') is CustomDevice
+        assert registry.resolve('KP125(US)') is KP125
+
+        registry = TPLinkDeviceRegistry()
+        registry.register('KP125', KP125)
+        registry.register('KP125M', CustomDevice)
+        assert registry.resolve('KP125M(US)') is CustomDevice
+        assert registry.resolve('KP125(US)') is KP125
+
+    def test_register_invalidates_cached_models(self):
+        registry = TPLinkDeviceRegistry({'HS110': HS110})
+        assert registry.resolve('HS110(US)') is HS110
+        registry.register('HS110', CustomDevice)
+        assert registry.resolve('HS110(US)') is CustomDevice
+
+    def test_unregister(self):
+        registry = TPLinkDeviceRegistry({'HS110': HS110})
+        assert registry.resolve('HS110(US)') is HS110
+        registry.unregister('HS110')
+        assert 'HS110' not in registry
+        assert registry.resolve('HS110(US)') is TPLinkDevice
+        # Unknown prefixes are ignored
+        registry.unregister('XX100')
+
+    def test_register_requires_prefix(self):
+        registry = TPLinkDeviceRegistry()
+        with pytest.raises(ValueError):
+            registry.register('', CustomDevice)
+
+    def test_custom_default_class(self):
+        registry = TPLinkDeviceRegistry(default_cls=CustomDevice)
+        assert registry.resolve('P100') is CustomDevice
+
+    def test_lazy_class_is_imported_on_resolve(self):
+        registry = TPLinkDeviceRegistry({'HS300': '.hs300:HS300'})
+        assert registry.prefixes() == {'HS300': '.hs300:HS300'}
+        assert registry.resolve('HS300(US)') is HS300
+        assert registry.prefixes() == {'HS300': HS300}
+
+    def test_lazy_class_with_absolute_module(self):
+        registry = TPLinkDeviceRegistry({'HS110': 'tplinkcloud.hs110:HS110'})
+        assert registry.load_all() == {'HS110': HS110}
+
+    def test_lazy_class_requires_class_name(self):
+        registry = TPLinkDeviceRegistry({'HS110': 'tplinkcloud.hs110'})
+        with pytest.raises(ValueError):
+            registry.resolve('HS110(US)')
+
+    def test_prefixes(self):
+        registry = TPLinkDeviceRegistry({'HS300': HS300, 'HS110': HS110})
+        assert registry.prefixes() == {'HS300': HS300, 'HS110': HS110}
+        assert len(registry) == 2
+
+
+class TestDeviceManagerRegistry:
+
+    def _device_info(self, model):
+        return {
+            'deviceId': 'device_id',
+            'alias': 'Test Device',
+            'deviceModel': model,
+            'appServerUrl': 'http://127.0.0.1:8080',
+        }
+
+    def _api(self):
+        api = MagicMock()
+        api.access_key = 'access_key'
+        api.secret_key = 'secret_key'
+        api._app_name = 'Kasa_Android_Mix'
+        return api
+
+    def test_default_registry_covers_supported_models(self):
+        assert DEVICE_REGISTRY.resolve('HS300(US)') is HS300
+        assert DEVICE_REGISTRY.resolve('KP125(US)') is KP125
+
+    def test_constructs_registered_third_party_class(self):
+        registry = TPLinkDeviceRegistry(DEVICE_REGISTRY.prefixes())
+        registry.register('P110', CustomDevice)
+        device_manager = TPLinkDeviceManager(
+            prefetch=False, include_tapo=False, device_registry=registry,
+        )
+        device = device_manager._construct_device(
+            self._device_info('P110'), self._api(), 'token', 'tapo')
+
+        assert isinstance(device, CustomDevice)
+        assert device.cloud_type == 'tapo'
+        # The shared registry is left untouched
+        assert DEVICE_REGISTRY.resolve('P110') is TPLinkDevice
+
+    def test_empty_registry_is_used(self):
+        registry = TPLinkDeviceRegistry()
+        device_manager = TPLinkDeviceManager(
+            prefetch=False, include_tapo=False, device_registry=registry,
+        )
+        device = device_manager._construct_device(
+            self._device_info('HS300(US)'), self._api(), 'token', 'kasa')
+
+        assert type(device) is TPLinkDevice
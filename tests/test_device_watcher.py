@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+
+from tplinkcloud.device_watcher import ALIAS, LIGHT_STATE, ONLINE, RELAY_STATE, RSSI
+from tplinkcloud.simulator import FakeCloud, make_fleet
+
+
+@pytest.fixture
+def fleet_cloud():
+    return FakeCloud(make_fleet(3, models=['HS103(US)', 'HS300(US)', 'KL430(US)']))
+
+
+async def _wait_for_rounds(watcher, rounds):
+    while watcher.rounds < rounds:
+        await asyncio.sleep(0.005)
+
+
+async def _events(watcher):
+    await watcher.stop()
+    return [(event.name, event.kind, event.old, event.new) async for event in watcher]
+
+
+class TestDeviceWatcher:
+
+    @pytest.mark.asyncio
+    async def test_emits_only_changes(self, fleet):
+        cloud, device_manager = fleet
+        plug, strip, light = cloud.devices.values()
+        outlet_id = strip.child_ids[1]
+
+        for device in await device_manager.get_devices():
+            await device.power_on()
+
+        watcher = device_manager.watch(interval=0.01)
+        async with watcher:
+            await _wait_for_rounds(watcher, 2)
+            plug.handle({'system': {'set_relay_state': {'state': 0}}})
+            strip.handle({'context': {'child_ids': [outlet_id]},
+                          'system': {'set_relay_state': {'state': 0},
+                                     'set_dev_alias': {'alias': 'Heater'}}})
+            light.handle({'smartlife.iot.lightStrip': {'set_light_state': {'on_off': 0}}})
+            rounds = watcher.rounds
+            await _wait_for_rounds(watcher, rounds + 2)
+            events = await _events(watcher)
+
+        assert [event[:2] for event in events] == [
+            ('HS103 1', RELAY_STATE),
+            ('Heater', RELAY_STATE),
+            ('Heater', ALIAS),
+            ('KL430 3', RELAY_STATE),
+            ('KL430 3', LIGHT_STATE),
+        ]
+        assert events[0][2:] == (1, 0)
+        assert events[2][2:] == ('HS300 2 Plug 2', 'Heater')
+        assert events[4][2]['on_off'] == 1 and events[4][3]['on_off'] == 0
+        assert await device_manager.find_device('Heater') is not None
+
+    @pytest.mark.asyncio
+    async def test_one_request_per_physical_device(self, fleet):
+        cloud, device_manager = fleet
+        devices = await device_manager.get_devices()
+        requests = cloud.request_counts['passthrough']
+
+        watcher = device_manager.watch(interval=0.01)
+        async with watcher:
+            await _wait_for_rounds(watcher, 3)
+
+        assert len(devices) == 9
+        # Stopping may cancel a round in progress
+        assert watcher.requests in (3 * watcher.rounds, 3 * (watcher.rounds + 1))
+        assert cloud.request_counts['passthrough'] - requests == watcher.requests
+
+    @pytest.mark.asyncio
+    async def test_offline_and_online(self, fleet):
+        cloud, device_manager = fleet
+        plug, strip, _ = cloud.devices.values()
+        strip.online = False
+        callback_events = []
+
+        watcher = device_manager.watch(interval=0.01, callback=callback_events.append)
+        async with watcher:
+            await _wait_for_rounds(watcher, 1)
+            strip.online = True
+            plug.online = False
+            rounds = watcher.rounds
+            await _wait_for_rounds(watcher, rounds + 2)
+            events = await _events(watcher)
+
+        online_events = [(name, old, new) for name, kind, old, new in events if kind == ONLINE]
+        outlets = [f'HS300 2 Plug {index}' for index in range(1, 7)]
+        assert online_events == (
+            [('HS300 2', None, False)] + [(name, None, False) for name in outlets]
+            + [('HS103 1', True, False)]
+            + [('HS300 2', False, True)] + [(name, False, True) for name in outlets]
+        )
+        assert len(callback_events) == len(events)
+
+    @pytest.mark.asyncio
+    async def test_rssi_thresholds(self, fleet):
+        cloud, device_manager = fleet
+        plug = next(iter(cloud.devices.values()))
+        plug._rssi = lambda: -50
+        watched = [device for device in await device_manager.get_devices()
+                   if device.device_id == plug.device_id]
+
+        watcher = device_manager.watch(watched, interval=0.01, rssi_thresholds=(-70,))
+        async with watcher:
+            await _wait_for_rounds(watcher, 1)
+            plug._rssi = lambda: -60
+            await _wait_for_rounds(watcher, watcher.rounds + 2)
+            plug._rssi = lambda: -80
+            await _wait_for_rounds(watcher, watcher.rounds + 2)
+            events = await _events(watcher)
+
+        assert events == [('HS103 1', RSSI, -50, -80)]
+
+    @pytest.mark.asyncio
+    async def test_emit_initial(self, fleet):
+        _, device_manager = fleet
+
+        watcher = device_manager.watch(interval=0.01, emit_initial=True)
+        async with watcher:
+            await _wait_for_rounds(watcher, 2)
+            events = await _events(watcher)
+
+        assert all(old is None for _, _, old, _ in events)
+        assert {(name, kind) for name, kind, _, _ in events} >= {
+            ('HS103 1', ONLINE), ('HS103 1', RELAY_STATE), ('HS103 1', ALIAS),
+            ('HS103 1', RSSI), ('KL430 3', LIGHT_STATE), ('HS300 2 Plug 1', RELAY_STATE),
+        }
+        assert len(events) == len(set((name, kind) for name, kind, _, _ in events))
+
+    @pytest.mark.asyncio
+    async def test_callback_errors_are_logged(self, fleet, caplog):
+        cloud, device_manager = fleet
+        plug = next(iter(cloud.devices.values()))
+
+        def failing_callback(event):
+            raise RuntimeError('callback failed')
+
+        watcher = device_manager.watch(interval=0.01, callback=failing_callback)
+        async with watcher:
+            await _wait_for_rounds(watcher, 1)
+            for state in (0, 1):
+                plug.handle({'system': {'set_relay_state': {'state': state}}})
+                rounds = watcher.rounds
+                await _wait_for_rounds(watcher, rounds + 2)
+            events = await _events(watcher)
+
+        assert [(kind, new) for _, kind, _, new in events] == [(RELAY_STATE, 0), (RELAY_STATE, 1)]
+        assert watcher.callback_errors == 2
+        errors = [record for record in caplog.records if record.name == 'tplinkcloud.device_watcher']
+        assert 'callback failed' in errors[0].exc_text
+
+    @pytest.mark.asyncio
+    async def test_failed_requests_are_not_offline(self, fleet, caplog):
+        cloud, device_manager = fleet
+
+        watcher = device_manager.watch(interval=0.01)
+        async with watcher:
+            await _wait_for_rounds(watcher, 1)
+            cloud.http_error_rate = 1
+            await _wait_for_rounds(watcher, 3)
+            events = await _events(watcher)
+
+        assert events == []
+        assert watcher.request_errors >= 3
+        warnings = [record for record in caplog.records if record.name == 'tplinkcloud.device_watcher']
+        assert warnings[0].levelname == 'WARNING'
+
+    @pytest.mark.asyncio
+    async def test_iteration_ends_with_the_error_that_stopped_watching(self, fleet, monkeypatch):
+        _, device_manager = fleet
+
+        async def get_devices():
+            raise RuntimeError('token expired')
+
+        monkeypatch.setattr(device_manager, 'get_devices', get_devices)
+        watcher = device_manager.watch(interval=0.01)
+        with pytest.raises(RuntimeError, match='token expired'):
+            async for _ in watcher:
+                pass
+        assert not watcher.running
@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import pytest
+
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.emeter_poller import PowerSample
+from tplinkcloud.realtime_power_buffer import RealtimePowerHistory
+from tplinkcloud.simulator import FakeCloud, make_fleet
+
+
+@pytest.fixture
+def fleet_cloud():
+    return FakeCloud(make_fleet(8, models=['HS110(US)', 'KP115(US)']))
+
+
+@pytest.fixture
+async def powered_fleet(fleet):
+    cloud, device_manager = fleet
+    power_tools = TPLinkDeviceManagerPowerTools(device_manager)
+    devices = await power_tools.get_emeter_devices()
+    for device in devices:
+        await device.power_on()
+    return cloud, power_tools, devices
+
+
+async def _collect(poller, count):
+    samples = []
+    async for sample in poller:
+        samples.append(sample)
+        if len(samples) == count:
+            await poller.stop()
+    return samples
+
+
+class TestEMeterPoller:
+
+    @pytest.mark.asyncio
+    async def test_first_polls_are_spread_over_the_interval(self, powered_fleet):
+        _, power_tools, devices = powered_fleet
+        poller = power_tools.poll(devices, interval=0.4, min_interval=0.1, jitter=0, seed=1)
+
+        samples = await _collect(poller, len(devices))
+
+        assert all(isinstance(sample, PowerSample) for sample in samples)
+        assert {sample.device.device_id for sample in samples} == {device.device_id for device in devices}
+        spread = samples[-1].timestamp - samples[0].timestamp
+        assert 0.3 <= spread < 0.4
+
+    @pytest.mark.asyncio
+    async def test_intervals_adapt_to_power_changes(self, powered_fleet):
+        cloud, power_tools, devices = powered_fleet
+        switching = devices[0]
+
+        async def switch_load(sample):
+            # Toggle the first device after every reading, like a cycling load
+            if sample.device is switching:
+                virtual_device = cloud.devices[switching.device_id]
+                state = 0 if virtual_device.is_on() else 1
+                virtual_device.handle({'system': {'set_relay_state': {'state': state}}})
+
+        poller = power_tools.poll(
+            devices, interval=0.08, min_interval=0.02, max_interval=0.3,
+            callback=switch_load, seed=1)
+        async with poller:
+            await asyncio.sleep(0.6)
+
+        intervals = {polled.device.device_id: polled.interval for polled in poller._devices}
+        assert intervals.pop(switching.device_id) == 0.02
+        # Steady loads back off towards max_interval
+        assert all(interval > 0.08 for interval in intervals.values())
+
+    @pytest.mark.asyncio
+    async def test_request_budget(self, powered_fleet):
+        _, power_tools, devices = powered_fleet
+        poller = power_tools.poll(
+            devices, interval=0.05, min_interval=0.05, max_requests_per_second=20, seed=1)
+
+        start = time.monotonic()
+        async with poller:
+            await asyncio.sleep(0.5)
+        elapsed = time.monotonic() - start
+
+        assert poller.requests <= 20 * elapsed + 1
+
+    @pytest.mark.asyncio
+    async def test_samples_are_recorded(self, fleet, powered_fleet):
+        _, device_manager = fleet
+        _, _, devices = powered_fleet
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager, realtime_history=RealtimePowerHistory(10))
+        received = []
+
+        samples = await _collect(
+            power_tools.poll(devices, interval=0.1, min_interval=0.05, callback=received.append),
+            2 * len(devices))
+
+        assert received[:len(samples)] == samples
+        assert sum(len(buffer) for _, buffer in power_tools.realtime_history.items()) >= len(samples)
+
+    @pytest.mark.asyncio
+    async def test_failed_requests_are_missing_readings(self, powered_fleet, caplog):
+        cloud, power_tools, devices = powered_fleet
+        cloud.http_error_rate = 1
+        poller = power_tools.poll(devices[:1], interval=0.05, min_interval=0.05)
+
+        [sample] = await _collect(poller, 1)
+        assert sample.data is None
+        assert poller.request_errors >= 1
+        warnings = [record for record in caplog.records if record.name == 'tplinkcloud.emeter_poller']
+        assert warnings[0].levelname == 'WARNING' and warnings[0].exc_text
+
+    def test_interval_must_be_within_bounds(self, powered_fleet):
+        _, power_tools, devices = powered_fleet
+        with pytest.raises(ValueError):
+            power_tools.poll(devices, interval=1, min_interval=5)
+
+    @pytest.mark.asyncio
+    async def test_callback_errors_are_logged(self, powered_fleet, caplog):
+        _, power_tools, devices = powered_fleet
+        calls = []
+
+        async def failing_callback(sample):
+            calls.append(sample)
+            raise RuntimeError('callback failed')
+
+        poller = power_tools.poll(devices, interval=0.1, min_interval=0.05, callback=failing_callback)
+
+        samples = await _collect(poller, 2 * len(devices))
+
+        assert len(samples) == 2 * len(devices)
+        assert poller.callback_errors == len(calls) >= 2 * len(devices)
+        errors = [record for record in caplog.records if record.name == 'tplinkcloud.emeter_poller']
+        assert errors and 'callback failed' in errors[0].exc_text
+
+    @pytest.mark.asyncio
+    async def test_iteration_ends_with_the_error_that_stopped_polling(self, powered_fleet, monkeypatch):
+        _, power_tools, devices = powered_fleet
+        poller = power_tools.poll(devices, interval=0.05, min_interval=0.05)
+
+        async def failing_run():
+            poller._put('first')
+            raise RuntimeError('polling failed')
+
+        monkeypatch.setattr(poller, '_run', failing_run)
+        received = []
+        with pytest.raises(RuntimeError, match='polling failed'):
+            async for sample in poller:
+                received.append(sample)
+
+        assert received == ['first']
+        assert not poller.running
+        await poller.stop()
@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import pytest
+
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.emeter_stats_cache import EMeterStatsCache
+
+
+class TestEMeterStatsCache:
+
+    @pytest.mark.parametrize('now, year, month, closed', [
+        (datetime(2024, 3, 10), 2024, 2, True),
+        (datetime(2024, 3, 10), 2024, 3, False),
+        (datetime(2024, 3, 1, 12), 2024, 2, False),
+        (datetime(2024, 3, 2, 1), 2024, 2, True),
+        (datetime(2024, 3, 10), 2023, None, True),
+        (datetime(2024, 1, 1, 6), 2023, None, False),
+        (datetime(2024, 1, 1, 6), 2023, 12, False),
+    ])
+    def test_is_closed(self, now, year, month, closed):
+        assert EMeterStatsCache(clock=lambda: now).is_closed(year, month) == closed
+
+    @pytest.mark.asyncio
+    async def test_closed_periods_are_fetched_once(self, fleet):
+        cloud, device_manager = fleet
+        cache = EMeterStatsCache()
+        plug = await device_manager.find_device('HS110 1')
+        today = datetime.now()
+        last_year = today.year - 1
+
+        first = await cache.get_power_usage_day(plug, last_year, 5)
+        passthroughs = cloud.request_counts['passthrough']
+        second = await cache.get_power_usage_day(plug, last_year, 5)
+        assert cloud.request_counts['passthrough'] == passthroughs
+        assert [day.energy_wh for day in second] == [day.energy_wh for day in first]
+        assert second is not first
+
+        await cache.get_power_usage_month(plug, last_year)
+        await cache.get_power_usage_month(plug, last_year)
+        assert cloud.request_counts['passthrough'] == passthroughs + 1
+
+        await cache.get_power_usage_day(plug, today.year, today.month)
+        await cache.get_power_usage_day(plug, today.year, today.month)
+        assert cloud.request_counts['passthrough'] == passthroughs + 3
+        assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+
+    @pytest.mark.asyncio
+    async def test_outlets_are_cached_separately(self, fleet):
+        _, device_manager = fleet
+        cache = EMeterStatsCache()
+        outlets = [device for device in await device_manager.get_devices() if device.child_id]
+        last_year = datetime.now().year - 1
+
+        for outlet in outlets:
+            await cache.get_power_usage_month(outlet, last_year)
+        assert len(cache) == len(outlets)
+
+        cache.invalidate(outlets[0].device_id, outlets[0].child_id)
+        assert len(cache) == len(outlets) - 1
+        cache.invalidate(outlets[0].device_id)
+        assert len(cache) == len(outlets) - 6
+        cache.invalidate()
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_empty_stats_are_not_cached(self, fleet):
+        _, device_manager = fleet
+        cache = EMeterStatsCache()
+        plug = await device_manager.find_device('HS110 1')
+
+        assert await cache.get_power_usage_month(plug, 2000) == []
+        assert len(cache) == 0
+
+
+class TestPowerToolsStatsCache:
+
+    @pytest.mark.asyncio
+    async def test_day_usage_refetches_only_the_current_month(self, fleet):
+        cloud, device_manager = fleet
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager)
+        devices = await power_tools.get_emeter_devices()
+
+        start = cloud.request_counts['passthrough']
+        first = await power_tools._get_power_usage_day(devices)
+        assert cloud.request_counts['passthrough'] - start == 2 * len(devices)
+
+        start = cloud.request_counts['passthrough']
+        second = await power_tools._get_power_usage_day(devices)
+        assert cloud.request_counts['passthrough'] - start == len(devices)
+        assert [len(usage.data) for usage in second] == [len(usage.data) for usage in first]
+
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self, fleet):
+        cloud, device_manager = fleet
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager, cache_stats=False)
+        devices = await power_tools.get_emeter_devices()
+        assert power_tools.stats_cache is None
+
+        await power_tools._get_power_usage_month(devices)
+        start = cloud.request_counts['passthrough']
+        await power_tools._get_power_usage_month(devices)
+        assert cloud.request_counts['passthrough'] - start == 2 * len(devices)
+
+    @pytest.mark.asyncio
+    async def test_empty_cache_is_shared(self, fleet):
+        _, device_manager = fleet
+        cache = EMeterStatsCache()
+
+        first = TPLinkDeviceManagerPowerTools(device_manager, stats_cache=cache)
+        second = TPLinkDeviceManagerPowerTools(device_manager, stats_cache=cache)
+        assert first.stats_cache is cache and second.stats_cache is cache
@@ -0,0 +1,202 @@
+import math
+from datetime import date
+
+import pytest
+
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.emeter_device import DayPowerSummary
+from tplinkcloud.emeter_store import EMeterSeriesReader, EMeterSeriesWriter, EMeterStore
+from tplinkcloud.realtime_power_buffer import RealtimePowerHistory
+
+FIELDS = ('power_mw', 'total_wh')
+
+
+def _write(path, rows, block_rows=4):
+    writer = EMeterSeriesWriter(path, FIELDS, block_rows=block_rows)
+    for timestamp, values in rows:
+        writer.append(timestamp, values)
+    writer.flush()
+
+
+class TestEMeterSeries:
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / 'plug.tpes'
+        rows = [
+            (1000, (1500, 7)),
+            (1005, (12.345, 7.001)),
+            (1010.5, (None, 8)),
+            (1015, (float('nan'), None)),
+            (1020, (-3, 8)),
+        ]
+        _write(path, rows)
+
+        with EMeterSeriesReader(path) as reader:
+            assert reader.fields == FIELDS
+            assert len(reader) == 5
+            assert reader.time_range() == (1000, 1020)
+            readings = reader.read()
+
+        assert list(readings['timestamp']) == [1000, 1005, 1010.5, 1015, 1020]
+        assert readings['power_mw'][:2].tolist() == [1500, 12.345]
+        assert [math.isnan(value) for value in readings['power_mw']] == [False, False, True, True, False]
+        assert readings['power_mw'][4] == -3
+        assert readings['total_wh'].tolist()[:3] == [7, 7.001, 8]
+        assert math.isnan(readings['total_wh'][3])
+
+    def test_range_decodes_overlapping_blocks(self, tmp_path, monkeypatch):
+        path = tmp_path / 'plug.tpes'
+        _write(path, [(5 * n, (n, n)) for n in range(100)], block_rows=10)
+
+        reader = EMeterSeriesReader(path)
+        decoded = []
+        decode = reader._decode_block
+        monkeypatch.setattr(reader, '_decode_block', lambda block: decoded.append(block) or decode(block))
+        readings = reader.read(start=102, end=160)
+        reader.close()
+
+        assert list(readings['timestamp']) == list(range(105, 160, 5))
+        assert list(readings['power_mw']) == list(range(21, 32))
+        assert len(decoded) == 2
+
+    def test_later_rows_replace_earlier(self, tmp_path):
+        path = tmp_path / 'plug.tpes'
+        _write(path, [(10, (1, 1)), (20, (2, 2)), (30, (3, 3))])
+        # Appended out of order, in a later block
+        _write(path, [(20, (5, 5)), (0, (4, 4))])
+
+        with EMeterSeriesReader(path) as reader:
+            readings = reader.read()
+
+        assert list(readings['timestamp']) == [0, 10, 20, 30]
+        assert list(readings['power_mw']) == [4, 1, 5, 3]
+
+    def test_reader_picks_up_appended_blocks(self, tmp_path):
+        path = tmp_path / 'plug.tpes'
+        _write(path, [(0, (1, 1))])
+
+        with EMeterSeriesReader(path) as reader:
+            _write(path, [(5, (2, 2))])
+            assert len(reader.read()['timestamp']) == 1
+            reader.refresh()
+            assert list(reader.read()['power_mw']) == [1, 2]
+
+    def test_interrupted_block_is_dropped(self, tmp_path):
+        path = tmp_path / 'plug.tpes'
+        _write(path, [(0, (1, 1)), (5, (2, 2))], block_rows=1)
+        with open(path, 'r+b') as file:
+            file.truncate(path.stat().st_size - 3)
+
+        with EMeterSeriesReader(path) as reader:
+            assert list(reader.read()['timestamp']) == [0]
+        # The next writer cuts the partial block off before appending
+        _write(path, [(10, (3, 3))])
+        with EMeterSeriesReader(path) as reader:
+            assert list(reader.read()['power_mw']) == [1, 3]
+
+    def test_field_mismatch(self, tmp_path):
+        path = tmp_path / 'plug.tpes'
+        _write(path, [(0, (1, 1))])
+
+        writer = EMeterSeriesWriter(path, ('energy_wh',))
+        writer.append(5, (1,))
+        with pytest.raises(ValueError):
+            writer.flush()
+        with pytest.raises(ValueError):
+            writer.append(5, (1, 2))
+
+    def test_values_needing_more_decimals_are_kept_exactly(self, tmp_path):
+        path = tmp_path / 'plug.tpes'
+        rows = [(0, (120123.4567, 1 / 3)), (5, (120123.457, float('inf'))), (10, (None, 0.1))]
+        _write(path, rows)
+
+        with EMeterSeriesReader(path) as reader:
+            readings = reader.read()
+
+        assert readings['power_mw'].tolist()[:2] == [120123.4567, 120123.457]
+        assert readings['total_wh'].tolist() == [1 / 3, float('inf'), 0.1]
+
+    def test_regular_readings_are_compact(self, tmp_path):
+        path = tmp_path / 'plug.tpes'
+        _write(path, [(1_700_000_000 + 5 * n, (50_000 + n % 7, 1000 + n // 100)) for n in range(10_000)],
+               block_rows=4096)
+
+        # A byte per column and reading, and the headers
+        assert path.stat().st_size < 10_000 * 3 + 200
+
+
+PLUG = ('plug', None)
+
+
+class TestEMeterStore:
+
+    def test_realtime(self, tmp_path):
+        store = EMeterStore(tmp_path, block_rows=3)
+        for n in range(5):
+            store.record(PLUG, 100 + n, {'power': 1.5 * n, 'voltage_mv': 120000})
+        store.record(('strip', 'strip01'), 100, None)
+
+        readings = store.realtime(PLUG, start=101, end=104)
+        assert list(readings['power_mw']) == [1.5, 3, 4.5]
+        assert list(readings['voltage_mv']) == [120000] * 3
+        assert math.isnan(readings['current_ma'][0])
+        assert store.realtime(('other', None)) is None
+        assert store.keys() == [PLUG, ('strip', 'strip01')]
+
+        history = RealtimePowerHistory(10)
+        EMeterStore(tmp_path).load_history(history)
+        assert len(history[PLUG]) == 5
+        assert history[PLUG].latest()['power_mw'] == 6
+
+    def test_keys_round_trip(self, tmp_path):
+        keys = [('ab_cd', 'ab_cd00'), ('ab', 'cd_ab_cd00'), ('8006%2F', None), ('a/b', 'a/b.01')]
+        store = EMeterStore(tmp_path)
+        for index, key in enumerate(keys):
+            store.record(key, 100, {'power_mw': index})
+
+        assert sorted(store.keys()) == sorted(keys)
+        for index, key in enumerate(keys):
+            assert list(store.realtime(key)['power_mw']) == [index]
+
+    def test_stats_are_updated_in_place(self, tmp_path):
+        store = EMeterStore(tmp_path)
+        store.record_days(PLUG, [
+            {'year': 2024, 'month': 1, 'day': 30, 'energy_wh': 300},
+            {'year': 2024, 'month': 1, 'day': 31, 'energy_wh': 100},
+        ])
+        store.flush()
+        size = (tmp_path / 'plug.day.tpes').stat().st_size
+
+        # Fetched again later, from a new store
+        store = EMeterStore(tmp_path)
+        store.record_days(PLUG, [
+            DayPowerSummary({'year': 2024, 'month': 1, 'day': 30, 'energy_wh': 300}),
+            DayPowerSummary({'year': 2024, 'month': 1, 'day': 31, 'energy_wh': 100}),
+        ])
+        store.flush()
+        assert (tmp_path / 'plug.day.tpes').stat().st_size == size
+
+        store.record_days(PLUG, [{'year': 2024, 'month': 1, 'day': 31, 'energy': 250}])
+        store.record_months(PLUG, [{'year': 2024, 'month': 1, 'energy_wh': 550}])
+        days = store.days(PLUG, start=date(2024, 1, 31), end=date(2024, 1, 31))
+        assert [(day.day, day.energy_wh) for day in days] == [(31, 250)]
+        assert [day.energy_wh for day in store.days(PLUG)] == [300, 250]
+        months = store.months(PLUG, end=date(2024, 1, 15))
+        assert [(month.year, month.month, month.energy_wh) for month in months] == [(2024, 1, 550)]
+
+    @pytest.mark.asyncio
+    async def test_power_tools_sink(self, tmp_path, fleet):
+        _, device_manager = fleet
+        with EMeterStore(tmp_path) as store:
+            power_tools = TPLinkDeviceManagerPowerTools(device_manager, store=store)
+            usage = await power_tools.get_devices_power_usage_realtime(None)
+            day_usage = await power_tools.get_devices_power_usage_day(None)
+
+        device = (await power_tools.get_emeter_devices())[0]
+        assert len(store.keys()) == len(usage)
+        readings = store.realtime(device)
+        assert len(readings['timestamp']) == 1
+        assert readings['power_mw'][0] == usage[0].data.power_mw
+        stored_days = store.days(device)
+        assert [(day.day, day.energy_wh) for day in stored_days] == [
+            (day.day, day.energy_wh) for day in day_usage[0].data if day.energy_wh is not None]
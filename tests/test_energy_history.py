@@ -0,0 +1,110 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.emeter_device import DayPowerSummary
+from tplinkcloud.emeter_store import MONTH, EMeterStore
+from tplinkcloud.energy_history import EnergyHistory
+
+PLUG = ('plug', None)
+OUTLET = ('strip', 'strip01')
+
+
+def _day(value, energy_wh):
+    return {'year': value.year, 'month': value.month, 'day': value.day, 'energy_wh': energy_wh}
+
+
+class TestEnergyHistory:
+
+    def test_range_totals_match_sums(self):
+        rng = random.Random(3)
+        first = date(2022, 1, 1)
+        energy = {first + timedelta(days=n): rng.randint(0, 2000) for n in range(900)}
+        days = list(energy.items())
+        rng.shuffle(days)
+        history = EnergyHistory()
+        history.add_days(PLUG, [_day(day, energy_wh) for day, energy_wh in days])
+
+        for _ in range(50):
+            start = first + timedelta(days=rng.randint(-30, 900))
+            end = start + timedelta(days=rng.randint(0, 400))
+            expected = sum(energy_wh for day, energy_wh in energy.items() if start <= day <= end)
+            assert history.energy_wh(PLUG, start, end) == pytest.approx(expected)
+        assert history.date_range(PLUG) == (first, first + timedelta(days=899))
+
+    def test_days_are_set_incrementally(self):
+        history = EnergyHistory()
+        history.add_days(PLUG, [_day(date(2024, 1, 30), 100)])
+        # The current day accrues, then a later day follows after a gap
+        history.add_days(PLUG, [DayPowerSummary(_day(date(2024, 1, 30), 150))])
+        history.add_days(PLUG, [_day(date(2024, 2, 2), 40), {'year': 2024, 'month': 2, 'day': 3}])
+        # An earlier day
+        history.add_days(PLUG, [_day(date(2024, 1, 29), 10)])
+
+        assert history.energy_wh(PLUG, date(2024, 1, 1), date(2024, 12, 31)) == 200
+        assert history.energy_wh(PLUG, datetime(2024, 1, 30, 12), date(2024, 2, 1)) == 150
+        assert history.energy_wh(PLUG, date(2024, 1, 31), date(2024, 2, 1)) == 0
+        assert history.energy_wh(('other', None), date(2024, 1, 1), date(2024, 12, 31)) == 0
+        assert history.date_range(PLUG) == (date(2024, 1, 29), date(2024, 2, 2))
+
+    def test_months_and_groups(self):
+        history = EnergyHistory()
+        history.add_months(PLUG, [
+            {'year': 2023, 'month': 12, 'energy_wh': 1000},
+            {'year': 2024, 'month': 1, 'energy': 2000},
+        ])
+        history.add_months(OUTLET, [{'year': 2024, 'month': 1, 'energy_wh': 500}])
+
+        assert history.energy_wh(PLUG, date(2023, 12, 31), date(2024, 1, 1), period=MONTH) == 3000
+        totals = history.group_energy_wh(
+            {'all': [PLUG, OUTLET], 'outlet': [OUTLET]}, date(2024, 1, 1), date(2024, 6, 1), period=MONTH)
+        assert totals == {'all': 2500, 'outlet': 500}
+        assert history.date_range(PLUG, period=MONTH) == (date(2023, 12, 1), date(2024, 1, 1))
+        assert history.energy_wh(PLUG, date(2024, 1, 1), date(2024, 1, 31)) == 0
+        with pytest.raises(ValueError):
+            history.energy_wh(PLUG, date(2024, 1, 1), date(2024, 1, 31), period='year')
+
+    def test_realtime_meter(self):
+        history = EnergyHistory()
+        noon = datetime(2024, 1, 31, 12).timestamp()
+        history.add_realtime(PLUG, noon, {'total_wh': 1000})
+        history.add_realtime(PLUG, noon + 60, {'total_wh': 1010})
+        history.add_realtime(PLUG, noon + 120, None)
+        history.add_realtime(PLUG, noon + 180, {'total': 1025})
+        # Reset meter
+        history.add_realtime(PLUG, noon + 240, {'total_wh': 3})
+        history.add_realtime(PLUG, noon + 300, {'total_wh': 5})
+
+        day = date(2024, 1, 31)
+        assert history.energy_wh(PLUG, day, day) == 27
+        assert history.energy_wh(PLUG, day, day, period=MONTH) == 27
+        # Stats replace the metered energy
+        history.add_days(PLUG, [_day(day, 500)])
+        assert history.energy_wh(PLUG, day, day) == 500
+
+    def test_from_store(self, tmp_path):
+        store = EMeterStore(tmp_path)
+        store.record_days(OUTLET, [_day(date(2024, 1, 30), 100), _day(date(2024, 1, 31), 50)])
+        store.record_months(OUTLET, [{'year': 2024, 'month': 1, 'energy_wh': 3000}])
+
+        history = EnergyHistory.from_store(store)
+
+        assert list(history) == [OUTLET]
+        assert history.energy_wh(OUTLET, date(2024, 1, 1), date(2024, 1, 31)) == 150
+        assert history.energy_wh(OUTLET, date(2024, 1, 1), date(2024, 1, 31), period=MONTH) == 3000
+
+    @pytest.mark.asyncio
+    async def test_power_tools_sink(self, fleet):
+        _, device_manager = fleet
+        history = EnergyHistory()
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager, energy_history=history)
+
+        usage = await power_tools.get_devices_power_usage_day(None)
+
+        today = date.today()
+        start = today - timedelta(days=62)
+        for device_usage in usage:
+            expected = sum(day.energy_wh or 0 for day in device_usage.data)
+            assert history.energy_wh(device_usage, start, today) == pytest.approx(expected)
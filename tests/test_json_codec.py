@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from tplinkcloud.client import TPLinkApi
+from tplinkcloud.device_client import TPLinkDeviceClient
+from tplinkcloud.transport import TPLinkHTTPResponse
+from tplinkcloud.json_codec import (
+    DEFAULT_JSON_CODEC,
+    JSON_CODECS,
+    StdlibJSONCodec,
+    get_json_codec,
+)
+
+
+REQUEST_DATA = {'system': {'get_sysinfo': {}}}
+RESPONSE_DATA = {'system': {'get_sysinfo': {'relay_state': 1, 'alias': 'Plug é'}}}
+
+
+def _installed_codecs():
+    codecs = []
+    for name in JSON_CODECS:
+        try:
+            codecs.append(get_json_codec(name))
+        except ImportError:
+            pass
+    return codecs
+
+
+class TestGetJSONCodec:
+
+    def test_default_is_stdlib(self):
+        assert get_json_codec() is DEFAULT_JSON_CODEC
+        assert isinstance(get_json_codec('json'), StdlibJSONCodec)
+
+    def test_stdlib_output_is_unchanged(self):
+        assert get_json_codec().dumps(REQUEST_DATA) == json.dumps(REQUEST_DATA)
+
+    def test_codec_instance_is_returned_as_is(self):
+        codec = StdlibJSONCodec()
+        assert get_json_codec(codec) is codec
+
+    def test_duck_typed_codec_is_adapted(self):
+        codec = MagicMock(wraps=StdlibJSONCodec())
+        adapted = get_json_codec(codec)
+        assert adapted.dumps_bytes(REQUEST_DATA) == json.dumps(REQUEST_DATA).encode()
+        codec.dumps.assert_called_once_with(REQUEST_DATA)
+
+    def test_named_codecs_are_shared(self):
+        assert get_json_codec('json') is get_json_codec('json')
+
+    def test_auto_picks_an_installed_codec(self):
+        assert get_json_codec('auto') in _installed_codecs()
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            get_json_codec('yaml')
+
+    @pytest.mark.parametrize('codec', _installed_codecs(), ids=lambda codec: codec.name)
+    def test_round_trip(self, codec):
+        encoded = codec.dumps(RESPONSE_DATA)
+        assert isinstance(encoded, str)
+        assert codec.loads(encoded) == RESPONSE_DATA
+        assert codec.loads(encoded.encode()) == RESPONSE_DATA
+        assert json.loads(encoded) == RESPONSE_DATA
+        assert codec.dumps_bytes(RESPONSE_DATA) == encoded.encode()
+
+
+class TestClientsUseCodec:
+
+    def _codec(self):
+        return MagicMock(wraps=StdlibJSONCodec())
+
+    @pytest.mark.asyncio
+    async def test_pass_through_request(self):
+        codec = self._codec()
+        client = TPLinkDeviceClient('http://test.example.com', 'token', json_codec=codec)
+
+        mock_response = MagicMock()
+        mock_response.successful = True
+        mock_response.result = {'responseData': json.dumps(RESPONSE_DATA)}
+
+        with patch.object(client, '_request_post', new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = mock_response
+            result = await client.pass_through_request('device123', REQUEST_DATA)
+
+        assert result == RESPONSE_DATA
+        codec.dumps.assert_called_once_with(REQUEST_DATA)
+        codec.loads.assert_called_once_with(json.dumps(RESPONSE_DATA))
+
+    def test_api_request(self):
+        codec = self._codec()
+        api = TPLinkApi('http://test.example.com', json_codec=codec)
+        content = json.dumps({'error_code': 0, 'result': {}}).encode()
+
+        with patch.object(api._transport, 'post') as mock_post:
+            mock_post.return_value = TPLinkHTTPResponse(200, 'OK', content)
+            response = api._request_post_v1({'method': 'getDeviceList'}, 'token')
+
+        assert response.successful
+        assert mock_post.call_args.args[1] == json.dumps({'method': 'getDeviceList'}).encode()
+        codec.loads.assert_called_once_with(content)
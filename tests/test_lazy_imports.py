@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_modules(statement, modules):
+    script = (
+        f'{statement}\n'
+        'import sys\n'
+        f'print(",".join(m for m in {modules!r} if m in sys.modules))\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPO_ROOT,
+    )
+    return [name for name in result.stdout.strip().split(',') if name]
+
+
+class TestLazyImports:
+
+    @pytest.mark.parametrize('statement', [
+        'import tplinkcloud',
+        'from tplinkcloud import TPLinkDeviceManager',
+        'from tplinkcloud import TPLinkDeviceManagerPowerTools',
+        'from tplinkcloud import TPLinkInMemoryTransport',
+    ])
+    def test_import_does_not_load_transports(self, statement):
+        assert _loaded_modules(statement, ['aiohttp', 'requests']) == []
+
+    def test_import_does_not_load_model_modules(self):
+        loaded = _loaded_modules(
+            'from tplinkcloud import TPLinkDeviceManager',
+            ['tplinkcloud.hs100', 'tplinkcloud.hs300', 'tplinkcloud.kl430'],
+        )
+        assert loaded == []
+
+    def test_resolving_model_loads_only_its_module(self):
+        loaded = _loaded_modules(
+            'from tplinkcloud.device_manager import DEVICE_REGISTRY\n'
+            'DEVICE_REGISTRY.resolve("HS103(US)")',
+            ['tplinkcloud.hs103', 'tplinkcloud.hs300'],
+        )
+        assert loaded == ['tplinkcloud.hs103']
+
+    def test_public_attributes_resolve(self):
+        import tplinkcloud
+        from tplinkcloud.device_manager import TPLinkDeviceManager
+
+        assert tplinkcloud.TPLinkDeviceManager is TPLinkDeviceManager
+        assert 'TPLinkDeviceManager' in dir(tplinkcloud)
+        with pytest.raises(AttributeError):
+            tplinkcloud.NotAThing
+
+    def test_device_model_map_is_still_available(self):
+        from tplinkcloud.device_manager import DEVICE_MODEL_MAP
+        from tplinkcloud.hs300 import HS300
+
+        assert DEVICE_MODEL_MAP['HS300'] is HS300
+
+    def test_device_model_map_changes_are_registered(self):
+        from tplinkcloud import device_manager
+        from tplinkcloud.device import TPLinkDevice
+        from tplinkcloud.device_manager import DEVICE_REGISTRY
+
+        class CustomDevice(TPLinkDevice):
+            pass
+
+        assert device_manager.DEVICE_MODEL_MAP is device_manager.DEVICE_MODEL_MAP
+        device_manager.DEVICE_MODEL_MAP['P110'] = CustomDevice
+        try:
+            assert DEVICE_REGISTRY.resolve('P110(US)') is CustomDevice
+        finally:
+            del device_manager.DEVICE_MODEL_MAP['P110']
+        assert DEVICE_REGISTRY.resolve('P110(US)') is TPLinkDevice
+        assert 'P110' not in device_manager.DEVICE_MODEL_MAP
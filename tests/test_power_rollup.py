@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from tplinkcloud import realtime_power_buffer
+from tplinkcloud.power_rollup import MINUTE, QUARTER_HOUR, rollup_energy
+from tplinkcloud.realtime_power_buffer import RealtimePowerHistory
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def integration(request, monkeypatch):
+    """Run rollup tests with and without NumPy."""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(realtime_power_buffer, '_numpy', False)
+    return request.param
+
+
+def _history(readings, capacity=100):
+    history = RealtimePowerHistory(capacity)
+    for key, device_readings in readings.items():
+        for timestamp, power_mw in device_readings:
+            history.record(key, timestamp, {'power_mw': power_mw})
+    return history
+
+
+PLUG = ('plug', None)
+OUTLET = ('strip', 'strip01')
+
+
+class TestRollupEnergy:
+
+    def test_constant_power(self, integration):
+        # 3.6 W for two minutes, read every 20 s
+        history = _history({PLUG: [(60 + 20 * n, 3600) for n in range(7)]})
+
+        rollup = rollup_energy(history, bucket=MINUTE)
+
+        assert rollup.start == 60
+        assert rollup.bucket_starts() == [60, 120]
+        assert list(rollup.energy_wh(PLUG)) == pytest.approx([0.06, 0.06])
+        assert rollup.total_wh(PLUG) == pytest.approx(0.12)
+
+    def test_readings_are_split_at_bucket_edges(self, integration):
+        # Power ramps from 0 to 7.2 W between t=30 and t=90; the edge at
+        # t=60 splits the ramp into 0.5 * 30 s * 3.6 W and (3.6 + 7.2) W / 2 * 30 s
+        history = _history({PLUG: [(30, 0), (90, 7200)]})
+
+        rollup = rollup_energy(history, bucket=MINUTE)
+
+        assert rollup.bucket_starts() == [0, 60]
+        assert list(rollup.energy_wh(PLUG)) == pytest.approx([0.015, 0.045])
+
+    def test_matches_buffer_energy(self, integration):
+        rng = random.Random(7)
+        readings = {}
+        for key in (PLUG, OUTLET, ('other', None)):
+            timestamp = rng.uniform(0, 30)
+            readings[key] = []
+            for _ in range(80):
+                readings[key].append((timestamp, rng.uniform(0, 20000)))
+                timestamp += rng.choice((5, 5, 5, 17, 90))
+        history = _history(readings)
+
+        rollup = rollup_energy(history, bucket=QUARTER_HOUR)
+
+        assert len(rollup) == 3
+        for key in readings:
+            assert rollup.total_wh(key) == pytest.approx(history[key].energy_wh())
+
+    def test_window(self, integration):
+        history = _history({PLUG: [(20 * n, 3600) for n in range(30)]})
+
+        rollup = rollup_energy(history, bucket=MINUTE, start=90, end=250)
+
+        # Cut to the window, with the readings around it interpolated
+        assert rollup.bucket_starts() == [60, 120, 180, 240]
+        assert list(rollup.energy_wh(PLUG)) == pytest.approx([0.03, 0.06, 0.06, 0.01])
+
+    def test_missing_readings_and_gaps(self, integration):
+        history = _history({
+            PLUG: [(0, 3600), (30, float('nan')), (60, 3600), (600, 3600), (660, 3600)],
+        })
+
+        interpolated = rollup_energy(history, bucket=QUARTER_HOUR)
+        skipped = rollup_energy(history, bucket=QUARTER_HOUR, max_gap=120)
+
+        assert interpolated.total_wh(PLUG) == pytest.approx(0.66)
+        # The 540 s between t=60 and t=600 count as no energy
+        assert skipped.total_wh(PLUG) == pytest.approx(0.12)
+
+    def test_groups(self, integration):
+        history = _history({
+            PLUG: [(0, 3600), (60, 3600)],
+            OUTLET: [(0, 7200), (60, 7200)],
+            ('other', None): [(0, 1000), (60, 1000)],
+        })
+
+        rollup = rollup_energy(history, bucket=MINUTE, devices=[PLUG, OUTLET, ('unknown', None)])
+        totals = rollup.group_energy_wh({'all': [PLUG, OUTLET], 'plug': [PLUG], 'none': []})
+
+        assert rollup.keys == [PLUG, OUTLET]
+        assert list(totals['all']) == pytest.approx([0.18])
+        assert list(totals['plug']) == pytest.approx([0.06])
+        assert list(totals['none']) == [0]
+
+    def test_to_numpy(self):
+        pytest.importorskip('numpy')
+        history = _history({PLUG: [(0, 3600), (120, 3600)], OUTLET: [(60, 3600), (120, 3600)]})
+
+        array = rollup_energy(history, bucket=MINUTE).to_numpy()
+
+        assert array.shape == (2, 2)
+        assert array.ravel().tolist() == pytest.approx([0.06, 0.06, 0, 0.06])
+
+    def test_devices_without_enough_readings(self, integration):
+        history = _history({PLUG: [(0, 3600)], OUTLET: [(0, 3600), (60, 3600)]})
+
+        rollup = rollup_energy(history, bucket=MINUTE)
+
+        assert rollup.total_wh(PLUG) == 0
+        assert rollup.total_wh(OUTLET) == pytest.approx(0.06)
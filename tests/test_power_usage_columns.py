@@ -0,0 +1,100 @@
+import math
+from datetime import datetime, timezone
+
+import pytest
+
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.power_usage_columns import DayPowerColumns, RealtimePowerColumns
+from tplinkcloud.simulator import FakeCloud, SimulatedClock, make_fleet
+
+
+@pytest.fixture
+def fleet_cloud():
+    clock = SimulatedClock()
+    return FakeCloud(make_fleet(4, models=['HS110(US)', 'HS300(US)'], clock=clock), clock=clock)
+
+
+@pytest.fixture
+def power_tools(fleet):
+    _, device_manager = fleet
+    return TPLinkDeviceManagerPowerTools(device_manager)
+
+
+def _date(timestamp):
+    value = datetime.fromtimestamp(timestamp, timezone.utc)
+    assert (value.hour, value.minute, value.second) == (0, 0, 0)
+    return value.year, value.month, value.day
+
+
+class TestColumns:
+
+    @pytest.mark.asyncio
+    async def test_realtime_matches_objects(self, power_tools):
+        usage = await power_tools.get_devices_power_usage_realtime('HS')
+        columns = await power_tools.get_devices_power_usage_realtime('HS', columnar=True)
+
+        assert isinstance(columns, RealtimePowerColumns)
+        assert len(columns) == len(usage) == len(columns.device_ids)
+        assert list(columns.device_index) == list(range(len(usage)))
+        assert columns.names == [device_usage.name for device_usage in usage]
+        assert list(columns.power_mw) == [device_usage.data.power_mw for device_usage in usage]
+        assert list(columns.total_wh) == [device_usage.data.total_wh for device_usage in usage]
+
+    @pytest.mark.asyncio
+    async def test_day_matches_objects(self, power_tools):
+        usage = await power_tools.get_devices_power_usage_day(None)
+        columns = await power_tools.get_devices_power_usage_day(None, columnar=True)
+
+        assert isinstance(columns, DayPowerColumns)
+        expected = [
+            (index, (day.year, day.month, day.day), day.energy_wh)
+            for index, device_usage in enumerate(usage)
+            for day in device_usage.data
+        ]
+        rows = [
+            (index, _date(timestamp), energy_wh)
+            for index, timestamp, energy_wh
+            in zip(columns.device_index, columns.timestamp, columns.energy_wh)
+        ]
+        assert rows == expected
+        assert columns.child_ids == [getattr(device_usage, 'child_id', None) for device_usage in usage]
+
+    @pytest.mark.asyncio
+    async def test_month_matches_objects(self, power_tools):
+        usage = await power_tools.get_devices_power_usage_month('HS110')
+        columns = await power_tools.get_devices_power_usage_month('HS110', columnar=True)
+
+        expected = [(month.year, month.month, 1) for month in usage[0].data]
+        assert [_date(timestamp) for timestamp in columns.timestamp] == expected
+        assert list(columns.energy_wh) == [month.energy_wh for month in usage[0].data]
+
+    def test_missing_fields_are_nan(self):
+        columns = RealtimePowerColumns()
+        columns.append(0, 1700000000.5, {'power': 1500, 'voltage': 120100})
+        columns.append(0, 1700000005, None)
+
+        assert list(columns.timestamp) == [1700000000.5, 1700000005]
+        assert columns.power_mw[0] == 1500
+        assert math.isnan(columns.current_ma[0])
+        assert all(math.isnan(columns.columns()[field][1]) for field in RealtimePowerColumns.FIELDS)
+
+    def test_to_numpy(self):
+        numpy = pytest.importorskip('numpy')
+        columns = DayPowerColumns()
+        columns.extend(3, [{'year': 2024, 'month': 2, 'day': 29, 'energy_wh': 120}])
+
+        arrays = columns.to_numpy()
+        assert arrays['device_index'].tolist() == [3]
+        assert arrays['timestamp'][0] == numpy.datetime64('2024-02-29T00:00:00')
+        assert arrays['energy_wh'].dtype == numpy.float64
+        # The arrays share the columns' memory
+        columns.energy_wh[0] = 5
+        assert arrays['energy_wh'][0] == 5
+
+    def test_realtime_timestamps_to_numpy(self):
+        numpy = pytest.importorskip('numpy')
+        columns = RealtimePowerColumns()
+        columns.append(0, 1709164800.25, {'power_mw': 1500})
+
+        arrays = columns.to_numpy()
+        assert arrays['timestamp'][0] == numpy.datetime64('2024-02-29T00:00:00.250')
@@ -0,0 +1,167 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.emeter_stats_cache import EMeterStatsCache
+from tplinkcloud.simulator import FakeCloud, constant_latency, make_fleet
+
+
+class _InFlightCounter:
+    """Tracks the most passthroughs a fake cloud answered at once."""
+
+    def __init__(self, cloud):
+        self.current = self.peak = 0
+        handle_async = cloud.handle_async
+
+        async def counted(request):
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+            try:
+                return await handle_async(request)
+            finally:
+                self.current -= 1
+
+        cloud.handle_async = counted
+
+
+@pytest.fixture
+def fleet_cloud():
+    return FakeCloud(make_fleet(3, models=['HS110(US)', 'HS300(US)']),
+                     latency=constant_latency(0.001))
+
+
+def _dates(usage):
+    return [date(day.year, day.month, day.day) for day in usage]
+
+
+class TestDeviceRange:
+
+    @pytest.mark.asyncio
+    async def test_day_range(self, fleet):
+        cloud, device_manager = fleet
+        plug = await device_manager.find_device('HS110 1')
+        start, end = date.today() - timedelta(days=99), date.today() - timedelta(days=1)
+        counter = _InFlightCounter(cloud)
+
+        usage = await plug.get_power_usage_day_range(start, end, max_concurrency=2)
+
+        assert _dates(usage) == [start + timedelta(days=n) for n in range(99)]
+        assert counter.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_day_range_defaults_to_today(self, fleet):
+        _, device_manager = fleet
+        plug = await device_manager.find_device('HS110 1')
+        start = datetime.now() - timedelta(days=40)
+
+        usage = await plug.get_power_usage_day_range(start)
+
+        dates = _dates(usage)
+        assert dates[0] == start.date()
+        assert dates == sorted(set(dates))
+        assert dates[-1] >= date.today() - timedelta(days=1)
+
+    @pytest.mark.asyncio
+    async def test_month_range(self, fleet):
+        _, device_manager = fleet
+        plug = await device_manager.find_device('HS110 1')
+        last_year = date.today().year - 1
+
+        usage = await plug.get_power_usage_month_range(date(last_year, 3, 15), date(last_year, 11, 1))
+
+        assert [(month.year, month.month) for month in usage] == [
+            (last_year, month) for month in range(3, 12)]
+
+    @pytest.mark.asyncio
+    async def test_closed_months_come_from_the_stats_cache(self, fleet):
+        cloud, device_manager = fleet
+        plug = await device_manager.find_device('HS110 1')
+        cache = EMeterStatsCache(closed_after=timedelta(0))
+        start = date.today() - timedelta(days=100)
+
+        first = await plug.get_power_usage_day_range(start, stats_cache=cache)
+        passthroughs = cloud.request_counts['passthrough']
+        second = await plug.get_power_usage_day_range(start, stats_cache=cache)
+
+        assert _dates(second) == _dates(first)
+        # Only the current month is fetched again
+        assert cloud.request_counts['passthrough'] - passthroughs == 1
+
+        last_year = date.today().year - 1
+        await plug.get_power_usage_month_range(date(last_year, 1, 1), date(last_year, 12, 1), stats_cache=cache)
+        passthroughs = cloud.request_counts['passthrough']
+        await plug.get_power_usage_month_range(date(last_year, 1, 1), date(last_year, 12, 1), stats_cache=cache)
+        assert cloud.request_counts['passthrough'] == passthroughs
+
+
+class TestFleetRange:
+
+    @pytest.mark.asyncio
+    async def test_day_range(self, fleet):
+        cloud, device_manager = fleet
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager)
+        devices = await power_tools.get_emeter_devices()
+        start = date.today() - timedelta(days=399)
+        counter = _InFlightCounter(cloud)
+
+        usage = await power_tools.get_devices_power_usage_day_range(
+            None, start, max_concurrent_requests=5)
+
+        assert counter.peak == 5
+        assert len(usage) == len(devices)
+        for device_usage in usage:
+            dates = _dates(device_usage.data)
+            assert dates[0] == start
+            assert dates == sorted(set(dates))
+
+    @pytest.mark.asyncio
+    async def test_closed_months_are_fetched_once(self, fleet):
+        cloud, device_manager = fleet
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager)
+        devices = await power_tools.get_emeter_devices()
+        start = date.today() - timedelta(days=100)
+
+        await power_tools.get_devices_power_usage_day_range(None, start)
+        passthroughs = cloud.request_counts['passthrough']
+        await power_tools.get_devices_power_usage_day_range(None, start)
+
+        assert cloud.request_counts['passthrough'] - passthroughs <= 2 * len(devices)
+
+    @pytest.mark.asyncio
+    async def test_month_range(self, fleet):
+        _, device_manager = fleet
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager)
+        last_year = date.today().year - 1
+
+        usage = await power_tools.get_devices_power_usage_month_range(
+            'HS300', date(last_year, 6, 1))
+
+        assert len(usage) == 12
+        for device_usage in usage:
+            months = [(month.year, month.month) for month in device_usage.data]
+            assert months[0] == (last_year, 6)
+            assert months == sorted(set(months))
+
+
+
+class TestCurrentAndPreviousPeriods:
+
+    @pytest.mark.asyncio
+    async def test_periods_are_fetched_concurrently(self, fleet):
+        cloud, device_manager = fleet
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager, cache_stats=False)
+        plug = await device_manager.find_device('HS110 1')
+        counter = _InFlightCounter(cloud)
+
+        [day_usage] = await power_tools._get_power_usage_day([plug])
+        assert counter.peak == 2
+        [month_usage] = await power_tools._get_power_usage_month([plug])
+        assert counter.peak == 2
+
+        dates = _dates(day_usage.data)
+        assert dates == sorted(set(dates))
+        assert dates[0].day == 1
+        months = [(month.year, month.month) for month in month_usage.data]
+        assert months == sorted(set(months))
+        assert months[0] == (date.today().year - 1, 1)
@@ -0,0 +1,130 @@
+import math
+
+import pytest
+
+from tplinkcloud import realtime_power_buffer
+from tplinkcloud.device_manager_power_tools import TPLinkDeviceManagerPowerTools
+from tplinkcloud.emeter_device import CurrentPower
+from tplinkcloud.realtime_power_buffer import RealtimePowerBuffer, RealtimePowerHistory
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def aggregates(request, monkeypatch):
+    """Run aggregate tests with and without NumPy."""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(realtime_power_buffer, '_numpy', False)
+    return request.param
+
+
+def _filled(capacity, count, step=5):
+    buffer = RealtimePowerBuffer(capacity)
+    for n in range(count):
+        buffer.append(1000 + n * step, power_mw=n * 1000, voltage_mv=120000, current_ma=n)
+    return buffer
+
+
+class TestRealtimePowerBuffer:
+
+    def test_keeps_latest_readings(self):
+        buffer = _filled(4, 10)
+
+        assert len(buffer) == 4
+        window = buffer.window()
+        assert list(window['timestamp']) == [1030, 1035, 1040, 1045]
+        assert list(window['power_mw']) == [6000, 7000, 8000, 9000]
+        assert buffer.latest()['current_ma'] == 9
+
+    def test_window_bounds(self):
+        buffer = _filled(8, 11)
+
+        window = buffer.window(start=1032, end=1045)
+        assert list(window['timestamp']) == [1035, 1040]
+        assert list(buffer.window(start=1051)['timestamp']) == []
+        assert list(buffer.window(end=1000)['timestamp']) == []
+        assert len(buffer.window(start=0)['timestamp']) == 8
+
+    def test_covering(self):
+        buffer = _filled(8, 11)
+
+        timestamps, power = buffer.covering(start=1032, end=1045)
+        assert list(timestamps) == [1030, 1035, 1040, 1045]
+        assert list(power) == [6000, 7000, 8000, 9000]
+        # The readings wrap around the end of the arrays
+        timestamp_views, power_views = buffer.covering_views(start=1032, end=1045)
+        assert len(timestamp_views) == 2
+        assert [value for view in timestamp_views for value in view] == list(timestamps)
+        assert [value for view in power_views for value in view] == list(power)
+
+    def test_meter_keeps_full_precision(self):
+        buffer = RealtimePowerBuffer(2)
+        buffer.append(1000, power_mw=1500.25, total_wh=123_456_789.5)
+
+        assert buffer.latest()['total_wh'] == 123_456_789.5
+        assert buffer.latest()['power_mw'] == 1500.25
+
+    def test_append_reading(self):
+        buffer = RealtimePowerBuffer(3)
+        buffer.append_reading(1, CurrentPower({'power': 1500, 'voltage': 120000}))
+        buffer.append_reading(2, {'power_mw': 2500, 'total_wh': 7})
+        buffer.append_reading(3, None)
+
+        window = buffer.window()
+        assert list(window['power_mw'][:2]) == [1500, 2500]
+        assert math.isnan(window['current_ma'][0])
+        assert window['total_wh'][1] == 7
+        assert all(math.isnan(window[field][2]) for field in RealtimePowerBuffer.FIELDS)
+
+    def test_empty(self, aggregates):
+        buffer = RealtimePowerBuffer(3)
+        assert buffer.latest() is None
+        assert math.isnan(buffer.mean())
+        assert math.isnan(buffer.max())
+        assert buffer.energy_wh() == 0
+
+    def test_aggregates(self, aggregates):
+        buffer = _filled(5, 7)  # power 2000..6000 mW at 1010..1030
+
+        assert buffer.mean() == 4000
+        assert buffer.max() == 6000
+        assert buffer.mean('current_ma', start=1020) == 5
+        # 20 s averaging 4 W
+        assert buffer.energy_wh() == pytest.approx(4 * 20 / 3600)
+        assert buffer.energy_wh(start=1015, end=1025) == pytest.approx(3.5 * 5 / 3600)
+
+    def test_aggregates_skip_missing_readings(self, aggregates):
+        buffer = RealtimePowerBuffer(4)
+        buffer.append(0, power_mw=1000)
+        buffer.append(10, power_mw=float('nan'))
+        buffer.append(20, power_mw=3000)
+
+        assert buffer.mean() == 2000
+        assert buffer.energy_wh() == pytest.approx(2 * 20 / 3600)
+
+    def test_capacity_must_be_positive(self):
+        with pytest.raises(ValueError):
+            RealtimePowerBuffer(0)
+
+
+class TestRealtimePowerHistory:
+
+    @pytest.mark.asyncio
+    async def test_power_tools_record_readings(self, fleet):
+        _, device_manager = fleet
+        history = RealtimePowerHistory(capacity=2)
+        power_tools = TPLinkDeviceManagerPowerTools(device_manager, realtime_history=history)
+        devices = await power_tools.get_emeter_devices()
+
+        usage = await power_tools.get_devices_power_usage_realtime(None)
+        await power_tools.get_devices_power_usage_realtime(None, columnar=True)
+        await power_tools.get_devices_power_usage_realtime(None)
+
+        assert power_tools.realtime_history is history
+        assert len(history) == len(devices)
+        for device, device_usage in zip(devices, usage):
+            assert device in history
+            buffer = history[device]
+            assert len(buffer) == 2
+            assert buffer.latest()['power_mw'] == pytest.approx(device_usage.data.power_mw, rel=1e-6)
+        assert history[devices[-1].device_id, devices[-1].child_id] is history[devices[-1]]
@@ -1,15 +1,27 @@
+import base64
+import hashlib
+import hmac
 import json
+import uuid
 
 from tplinkcloud.signing import (
     ACCESS_KEY,
     SECRET_KEY,
     SIGNING_TIMESTAMP,
+    TAPO_ACCESS_KEY,
+    TAPO_SECRET_KEY,
+    Signer,
     compute_content_md5,
     compute_signature,
+    get_signer,
     get_signing_headers,
 )
 
 
+def _parse_authorization(auth):
+    return dict(part.split('=', 1) for part in auth.split(', '))
+
+
 class TestComputeContentMD5:
 
     def test_returns_base64_md5(self):
@@ -83,6 +95,43 @@ class TestGetSigningHeaders:
         assert parts[3].startswith('Signature=')
 
 
+class TestSigner:
+
+    def test_signature_matches_protocol(self):
+        body = '{"method": "getDeviceList"}'
+        content_md5, auth = Signer(TAPO_ACCESS_KEY, TAPO_SECRET_KEY).sign(body, '/')
+        fields = _parse_authorization(auth)
+
+        expected_md5 = base64.b64encode(hashlib.md5(body.encode()).digest()).decode()
+        sig_string = f"{expected_md5}\n{SIGNING_TIMESTAMP}\n{fields['Nonce']}\n/"
+        expected_signature = hmac.new(
+            TAPO_SECRET_KEY.encode(), sig_string.encode(), hashlib.sha1
+        ).hexdigest()
+
+        assert content_md5 == expected_md5
+        assert fields['AccessKey'] == TAPO_ACCESS_KEY
+        assert fields['Signature'] == expected_signature
+
+    def test_accepts_bytes(self):
+        signer = Signer()
+        assert signer.content_md5(b'{"a": 1}') == signer.content_md5('{"a": 1}')
+
+    def test_nonces_are_unique_uuids(self):
+        signer = Signer()
+        nonces = {
+            _parse_authorization(signer.authorization('md5', '/'))['Nonce']
+            for _ in range(1000)
+        }
+        assert len(nonces) == 1000
+        for nonce in nonces:
+            assert str(uuid.UUID(nonce)) == nonce
+
+    def test_get_signer_is_shared_per_key_pair(self):
+        assert get_signer() is get_signer()
+        assert get_signer().access_key == ACCESS_KEY
+        assert get_signer(TAPO_ACCESS_KEY, TAPO_SECRET_KEY) is not get_signer()
+
+
 class TestConstants:
 
     def test_access_key_format(self):
@@ -0,0 +1,267 @@
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from tplinkcloud.device_client import TPLinkDeviceClient
+from tplinkcloud.device_manager import TPLinkDeviceManager
+from tplinkcloud.exceptions import TPLinkAuthError, TPLinkCloudError
+from tplinkcloud.signing import KASA_ACCESS_KEY, TAPO_SECRET_KEY
+from tplinkcloud.simulator import (
+    MODELS,
+    FakeCloud,
+    FakeCloudServer,
+    SimulatedClock,
+    VirtualDevice,
+    make_fleet,
+)
+from tplinkcloud.transport import TPLinkRequest
+
+
+async def _device_manager(cloud, **kwargs):
+    return await TPLinkDeviceManager(
+        cloud.username, cloud.password, transport=cloud.transport(), **kwargs)
+
+
+class TestFakeCloud:
+
+    @pytest.mark.asyncio
+    async def test_every_model_is_listed(self):
+        cloud = FakeCloud()
+        device_manager = await _device_manager(cloud)
+        devices = await device_manager.get_devices()
+
+        models = {device.device_info.device_model for device in devices if not device.child_id}
+        assert models == set(MODELS)
+        outlets = sum(spec.children for spec in MODELS.values())
+        assert len(devices) == len(MODELS) + outlets
+
+    @pytest.mark.asyncio
+    async def test_device_requests(self):
+        cloud = FakeCloud()
+        device_manager = await _device_manager(cloud)
+
+        plug = await device_manager.find_device('HS110 4')
+        assert await plug.is_on() in (True, False)
+        assert await plug.power_on() == {'err_code': 0}
+        realtime = await plug.get_power_usage_realtime()
+        assert realtime.power_mw > 0
+        last_year = datetime.now().year - 1
+        assert len(await plug.get_power_usage_day(last_year, 2)) in (28, 29)
+
+        outlet = await device_manager.find_device('HS300 6 Plug 3')
+        assert outlet.child_id.endswith('02')
+        assert (await outlet.get_power_usage_realtime()).power_mw > 0
+
+        light = await device_manager.find_device('KL430 8')
+        assert (await light.set_brightness(20))['brightness'] == 20
+
+        tapo = await device_manager.find_device('P100 15')
+        assert tapo.cloud_type == 'tapo'
+        assert (await tapo.get_sys_info())['model'] == 'P100'
+
+    def test_unsupported_requests(self):
+        device = VirtualDevice('HS103')
+        response = device.handle({
+            'emeter': {'get_realtime': {}},
+            'system': {'reboot': {}},
+        })
+        assert response == {
+            'emeter': {'err_code': -1, 'err_msg': 'module not support'},
+            'system': {'reboot': {'err_code': -2, 'err_msg': 'member not support'}},
+        }
+
+    def test_fleet_is_reproducible(self):
+        first = make_fleet(100, seed=3)
+        second = make_fleet(100, seed=3)
+        assert [device.device_id for device in first] == [device.device_id for device in second]
+        assert len({device.device_id for device in first}) == 100
+
+    @pytest.mark.asyncio
+    async def test_wrong_password(self):
+        cloud = FakeCloud(password='secret')
+        with pytest.raises(TPLinkAuthError):
+            await TPLinkDeviceManager(cloud.username, 'wrong', transport=cloud.transport())
+
+    @pytest.mark.asyncio
+    async def test_expired_token_is_refreshed(self):
+        cloud = FakeCloud(fleet_size=3)
+        device_manager = await _device_manager(cloud, cache_devices=False, include_tapo=False)
+        token = device_manager.get_token()
+
+        cloud.expire_tokens()
+        assert len(await device_manager.get_devices()) == 3
+        assert device_manager.get_token() != token
+        assert cloud.request_counts['refreshToken'] == 1
+
+
+class TestDeviceState:
+
+    @pytest.mark.asyncio
+    async def test_relay_state(self):
+        cloud = FakeCloud(models=['HS103', 'HS300'], fleet_size=2)
+        device_manager = await _device_manager(cloud, include_tapo=False)
+        plug = await device_manager.find_device('HS103 1')
+        strip = await device_manager.find_device('HS300 2')
+        outlet = await device_manager.find_device('HS300 2 Plug 2')
+        virtual_strip = cloud.devices[strip.device_id]
+
+        await plug.power_off()
+        assert await plug.is_off()
+        await plug.toggle()
+        assert await plug.is_on()
+
+        await strip.power_on()
+        assert all(virtual_strip.is_on(child_id) for child_id in virtual_strip.child_ids)
+        await outlet.power_off()
+        assert await outlet.is_off()
+        assert [virtual_strip.is_on(child_id) for child_id in virtual_strip.child_ids].count(False) == 1
+
+    @pytest.mark.asyncio
+    async def test_energy_accrues_while_on(self):
+        clock = SimulatedClock(datetime(2026, 3, 10, 12).timestamp())
+        cloud = FakeCloud(models=['HS110'], fleet_size=1, clock=clock)
+        device_manager = await _device_manager(cloud, include_tapo=False)
+        plug, = await device_manager.get_devices()
+
+        await plug.power_on()
+        before = await plug.get_power_usage_realtime()
+        clock.advance(3600)
+        after = await plug.get_power_usage_realtime()
+        assert after.total_wh - before.total_wh == pytest.approx(before.power_mw / 1000, abs=1)
+
+        await plug.power_off()
+        clock.advance(3600)
+        assert (await plug.get_power_usage_realtime()).total_wh == after.total_wh
+        assert (await plug.get_power_usage_realtime()).power_mw == 0
+
+        days = await plug.get_power_usage_day(2026, 3)
+        # Days before the device was created are generated history
+        assert [day.day for day in days] == list(range(1, 11))
+        assert days[-1].energy_wh == int(before.power_mw / 1000)
+        previous_year = await plug.get_power_usage_month(2025)
+        assert len(previous_year) == 12
+
+    @pytest.mark.asyncio
+    async def test_schedule_rules_persist(self):
+        cloud = FakeCloud(models=['HS103'], fleet_size=1)
+        device_manager = await _device_manager(cloud, include_tapo=False)
+        plug, = await device_manager.get_devices()
+
+        rule = {'name': 'Morning', 'enable': 1, 'sact': 1, 'stime_opt': 0, 'smin': 420}
+        rule_id = (await plug.add_schedule_rule(rule))['id']
+        await plug.add_schedule_rule({**rule, 'name': 'Evening'})
+        await plug.edit_schedule_rule({**rule, 'id': rule_id, 'smin': 480})
+        assert (await plug.get_schedule_rule(rule_id)).smin == 480
+
+        await plug.delete_schedule_rule(rule_id)
+        assert [rule.name for rule in (await plug.get_schedule_rules()).rules] == ['Evening']
+        assert (await plug.delete_schedule_rule(rule_id))['err_code'] == -14
+
+        await plug.delete_all_scheduled_rules()
+        assert (await plug.get_schedule_rules()).rules == []
+
+    @pytest.mark.asyncio
+    async def test_light_state(self):
+        cloud = FakeCloud(models=['KL430'], fleet_size=1)
+        device_manager = await _device_manager(cloud, include_tapo=False)
+        light, = await device_manager.get_devices()
+
+        await light.set_color(120, 80, brightness=30)
+        await light.power_off()
+        sys_info = await light.get_sys_info()
+        assert sys_info.relay_state == 0
+        assert (sys_info.light_state.hue, sys_info.light_state.brightness) == (120, 30)
+
+
+class TestSignatures:
+
+    def _request(self, body, headers, app_name='Kasa_Android_Mix'):
+        return TPLinkRequest(
+            'https://fake.test/', {'appName': app_name, 'token': 'token'}, headers, body)
+
+    def test_unsigned_request_is_rejected(self):
+        cloud = FakeCloud()
+        response = cloud.handle(self._request(b'{"method": "getDeviceList"}', {}))
+        assert response.status == 403
+
+    def test_tampered_body_is_rejected(self):
+        cloud = FakeCloud()
+        client = TPLinkDeviceClient('https://fake.test', 'token')
+        body = b'{"method": "getDeviceList"}'
+        headers = client._signer.get_headers(body, '/')
+
+        response = cloud.handle(self._request(b'{"method": "passthrough"}', headers))
+        assert response.status == 403
+        assert response.content == b'Content-MD5 does not match the body'
+
+    def test_keys_must_match_the_app(self):
+        cloud = FakeCloud()
+        client = TPLinkDeviceClient('https://fake.test', 'token', access_key=KASA_ACCESS_KEY,
+                                    secret_key=TAPO_SECRET_KEY)
+        body = b'{"method": "getDeviceList"}'
+        response = cloud.handle(self._request(body, client._signer.get_headers(body, '/')))
+        assert response.content == b'Signature does not match'
+
+        response = cloud.handle(self._request(
+            body, client._signer.get_headers(body, '/'), app_name='TP-Link_Tapo_Android'))
+        assert response.content == b'Unknown AccessKey'
+
+
+class TestErrorInjection:
+
+    @pytest.mark.asyncio
+    async def test_offline_devices(self):
+        cloud = FakeCloud(fleet_size=1)
+        device_manager = await _device_manager(cloud)
+        device, = await device_manager.get_devices()
+
+        cloud.offline_rate = 1.0
+        assert await device.get_sys_info() is None
+        assert cloud.request_counts['offline'] == 1
+
+    @pytest.mark.asyncio
+    async def test_http_errors(self):
+        cloud = FakeCloud(fleet_size=1)
+        device_manager = await _device_manager(cloud)
+        device, = await device_manager.get_devices()
+
+        cloud.http_error_rate = 1.0
+        with pytest.raises(Exception, match='503'):
+            await device.get_sys_info()
+        with pytest.raises(TPLinkCloudError, match='503'):
+            device_manager.login(cloud.username, cloud.password)
+
+    @pytest.mark.asyncio
+    async def test_latency(self):
+        cloud = FakeCloud(fleet_size=1, latency=0.05)
+        device_manager = await _device_manager(cloud, prefetch=False)
+        device, = await device_manager.get_devices()
+
+        start = time.perf_counter()
+        await device.get_sys_info()
+        assert time.perf_counter() - start >= 0.05
+
+
+class TestFakeCloudServer:
+
+    @pytest.mark.asyncio
+    async def test_manager_over_http(self):
+        cloud = FakeCloud(fleet_size=3)
+        with FakeCloudServer(cloud) as url:
+            async with TPLinkDeviceManager(cloud.username, cloud.password, include_tapo=False,
+                                           tplink_cloud_api_host=url) as device_manager:
+                devices = await device_manager.get_devices()
+                assert devices[0].device_info.app_server_url == url
+                assert (await devices[0].get_sys_info()).alias == 'HS100 1'
+
+    @pytest.mark.asyncio
+    async def test_rejections_over_http(self):
+        import aiohttp
+
+        cloud = FakeCloud()
+        async with FakeCloudServer(cloud) as url:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, data=json.dumps({'method': 'getDeviceList'})) as response:
+                    assert response.status == 403
@@ -0,0 +1,84 @@
+import pickle
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from tplinkcloud.device_info import TPLinkDeviceInfo
+from tplinkcloud.device_schedule_rule_builder import TPLinkDeviceScheduleRuleBuilder
+from tplinkcloud.device_schedule_rules import DeviceScheduleRule
+from tplinkcloud.emeter_device import CurrentPower, DayPowerSummary
+from tplinkcloud.hs100 import HS100, HS100SysInfo
+from tplinkcloud.hs105 import HS105SysInfo
+from tplinkcloud.hs300 import HS300SysInfo
+from tplinkcloud.kp115 import KP115SysInfo
+
+
+HS300_SYS_INFO = {
+    'deviceId': 'parent_id',
+    'alias': 'Power Strip',
+    'children': [
+        {'id': 'parent_id00', 'state': 1, 'alias': 'Outlet 1',
+         'on_time': 100, 'next_action': {'type': -1}},
+    ],
+    'child_num': 1,
+    'err_code': 0,
+}
+
+
+class TestSlottedObjects:
+
+    @pytest.mark.parametrize('obj', [
+        TPLinkDeviceInfo({'deviceId': 'id', 'alias': 'Plug'}),
+        HS100SysInfo({'relay_state': 1}),
+        KP115SysInfo({'relay_state': 1}),
+        HS300SysInfo(HS300_SYS_INFO),
+        CurrentPower({'power_mw': 1000}),
+        DayPowerSummary({'year': 2021, 'month': 4, 'day': 9, 'energy_wh': 10}),
+        DeviceScheduleRule({'id': 'rule', 'enable': 1}),
+    ])
+    def test_has_no_instance_dict(self, obj):
+        with pytest.raises(AttributeError):
+            obj.not_an_attribute = 1
+
+    def test_attribute_api_is_unchanged(self):
+        sys_info = HS300SysInfo(HS300_SYS_INFO)
+        assert sys_info.device_id == 'parent_id'
+        assert sys_info.children[0].id == 'parent_id00'
+        assert sys_info.children[0].next_action.type == -1
+        assert sys_info.mac is None
+
+    def test_vars_returns_snapshot_of_set_attributes(self):
+        summary = DayPowerSummary({'year': 2021, 'month': 4, 'day': 9, 'energy': 10})
+        assert vars(summary) == {'year': 2021, 'month': 4, 'day': 9, 'energy_wh': 10}
+
+    def test_vars_omits_attributes_that_were_never_set(self):
+        sys_info = HS105SysInfo({'relay_state': 0})
+        assert 'next_action' not in vars(sys_info)
+        with pytest.raises(AttributeError):
+            sys_info.next_action
+
+    def test_pickle_round_trip(self):
+        info = TPLinkDeviceInfo({'deviceId': 'id', 'alias': 'Plug'}, cloud_type='tapo')
+        restored = pickle.loads(pickle.dumps(info))
+        assert vars(restored) == vars(info)
+
+    def test_rule_builder_modifies_slotted_rule(self):
+        rule = DeviceScheduleRule({'id': 'rule', 'name': 'Rule', 'enable': 1})
+        builder = TPLinkDeviceScheduleRuleBuilder(rule).with_enable_status(False)
+        assert builder.to_json()['enable'] == 0
+
+
+class TestRelayStateWithSlottedSysInfo:
+
+    def _device(self):
+        client = MagicMock()
+        client.pass_through_request = AsyncMock()
+        return HS100(client, 'id', MagicMock())
+
+    @pytest.mark.asyncio
+    async def test_is_on(self):
+        device = self._device()
+        with patch.object(device, '_get_sys_info', new_callable=AsyncMock) as mock:
+            mock.return_value = {'relay_state': 1, 'err_code': 0}
+            assert await device.is_on() is True
+            assert await device.is_off() is False
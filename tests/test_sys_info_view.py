@@ -0,0 +1,132 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from tplinkcloud.hs100 import HS100, HS100SysInfo, HS100SysInfoView
+from tplinkcloud.hs105 import HS105SysInfoView
+from tplinkcloud.hs300 import HS300, HS300SysInfo, HS300SysInfoView
+from tplinkcloud.hs300_child import HS300ChildSysInfoView
+from tplinkcloud.kl430 import KL430, KL430SysInfoView
+
+
+HS100_SYS_INFO = {
+    'err_code': 0,
+    'model': 'HS100(US)',
+    'deviceId': 'device_id',
+    'oemId': 'oem_id',
+    'hwId': 'hw_id',
+    'fwId': 'fw_id',
+    'alias': 'Desk Lamp',
+    'relay_state': 1,
+}
+
+HS300_SYS_INFO = {
+    'deviceId': 'parent_id',
+    'alias': 'Power Strip',
+    'children': [
+        {'id': 'parent_id00', 'state': 1, 'alias': 'Outlet 1',
+         'on_time': 100, 'next_action': {'type': -1}},
+        {'id': 'parent_id01', 'state': 0, 'alias': 'Outlet 2',
+         'on_time': 0, 'next_action': {'type': 1, 'schd_sec': 3600, 'action': 1}},
+    ],
+    'child_num': 2,
+    'err_code': 0,
+}
+
+
+def _mock_client():
+    client = MagicMock()
+    client.pass_through_request = AsyncMock()
+    return client
+
+
+class TestSysInfoView:
+
+    def test_reads_fields_from_response(self):
+        view = HS100SysInfoView(HS100_SYS_INFO)
+        assert view.relay_state == 1
+        assert view.alias == 'Desk Lamp'
+        assert view.device_id == 'device_id'
+        assert view.oem_id == 'oem_id'
+        assert view.hw_id == 'hw_id'
+        assert view.fw_id == 'fw_id'
+        assert view.latitude is None
+
+    def test_reflects_the_underlying_response(self):
+        sys_info = dict(HS100_SYS_INFO)
+        view = HS100SysInfoView(sys_info)
+        sys_info['relay_state'] = 0
+        assert view.relay_state == 0
+
+    def test_matches_materialized_sys_info(self):
+        view = HS100SysInfoView(HS100_SYS_INFO)
+        sys_info = view.materialize()
+        assert isinstance(sys_info, HS100SysInfo)
+        assert vars(view) == vars(sys_info)
+
+    def test_unknown_attribute(self):
+        view = HS100SysInfoView(HS100_SYS_INFO)
+        with pytest.raises(AttributeError):
+            view.not_an_attribute
+
+    def test_is_read_only(self):
+        view = HS100SysInfoView(HS100_SYS_INFO)
+        with pytest.raises(AttributeError):
+            view.relay_state = 0
+
+    def test_children_are_views(self):
+        view = HS300SysInfoView(HS300_SYS_INFO)
+        assert view.child_num == 2
+        assert all(isinstance(child, HS300ChildSysInfoView) for child in view.children)
+        assert view.children[1].state == 0
+        assert view.children[1].next_action.schd_sec == 3600
+        assert view.children[0].alias == HS300SysInfo(HS300_SYS_INFO).children[0].alias
+
+    def test_optional_nested_field(self):
+        assert not hasattr(HS105SysInfoView({'relay_state': 1}), 'next_action')
+        view = HS105SysInfoView({'relay_state': 1, 'next_action': {'action': 1}})
+        assert view.next_action.action == 1
+
+    def test_derived_field(self):
+        view = KL430SysInfoView({'light_state': {'on_off': 1, 'brightness': 50}})
+        assert view.relay_state == 1
+        assert view.light_state.brightness == 50
+        assert KL430SysInfoView({}).relay_state == 0
+
+
+class TestGetSysInfoView:
+
+    @pytest.mark.asyncio
+    async def test_get_sys_info_view(self):
+        device = HS100(_mock_client(), 'device_id', MagicMock())
+        with patch.object(device, '_get_sys_info', new_callable=AsyncMock) as mock:
+            mock.return_value = HS100_SYS_INFO
+            assert isinstance(await device.get_sys_info(), HS100SysInfo)
+            assert isinstance(await device.get_sys_info(view=True), HS100SysInfoView)
+
+    @pytest.mark.asyncio
+    async def test_get_sys_info_view_failure(self):
+        device = HS300(_mock_client(), 'parent_id', MagicMock())
+        with patch.object(device, '_get_sys_info', new_callable=AsyncMock) as mock:
+            mock.return_value = None
+            assert await device.get_sys_info(view=True) is None
+
+    @pytest.mark.asyncio
+    async def test_is_on_uses_view(self):
+        device = KL430(_mock_client(), 'device_id', MagicMock())
+        with patch.object(device, '_get_sys_info', new_callable=AsyncMock) as mock:
+            mock.return_value = {'light_state': {'on_off': 0}, 'err_code': 0}
+            assert await device.is_on() is False
+            assert await device.is_off() is True
+
+    @pytest.mark.asyncio
+    async def test_is_on_without_view_support(self):
+        class ThirdPartyPlug(HS100):
+
+            async def get_sys_info(self):
+                return HS100SysInfo(await self._get_sys_info())
+
+        device = ThirdPartyPlug(_mock_client(), 'device_id', MagicMock())
+        with patch.object(device, '_get_sys_info', new_callable=AsyncMock) as mock:
+            mock.return_value = HS100_SYS_INFO
+            assert await device.is_on() is True
+            assert await device.is_off() is False
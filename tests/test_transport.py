@@ -0,0 +1,265 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from tplinkcloud.client import TPLinkApi
+from tplinkcloud.device_client import TPLinkDeviceClient
+from tplinkcloud.device_manager import TPLinkDeviceManager
+from tplinkcloud.exceptions import TPLinkCloudError
+from tplinkcloud.transport import (
+    TPLinkHTTPResponse,
+    TPLinkHTTPTransport,
+    TPLinkInMemoryTransport,
+)
+
+
+DEVICE_LIST_RESPONSE = {
+    'error_code': 0,
+    'result': {'deviceList': [{'deviceId': 'device123', 'deviceModel': 'HS100(US)'}]},
+}
+
+PASSTHROUGH_RESPONSE = {
+    'error_code': 0,
+    'result': {'responseData': '{"system": {"get_sysinfo": {"relay_state": 1}}}'},
+}
+
+
+@pytest.fixture
+async def cloud():
+    """A local cloud endpoint that records the client port of each request."""
+    peers = []
+
+    async def handle(request):
+        peers.append(request.transport.get_extra_info('peername')[1])
+        body = await request.json()
+        if body.get('method') == 'getDeviceList':
+            return web.json_response(DEVICE_LIST_RESPONSE)
+        return web.json_response(PASSTHROUGH_RESPONSE)
+
+    app = web.Application()
+    app.router.add_post('/', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    yield f'http://127.0.0.1:{port}', peers
+    await runner.cleanup()
+
+
+class TestSharedTransport:
+
+    @pytest.mark.asyncio
+    async def test_device_list_connection_is_reused_for_passthroughs(self, cloud):
+        host, peers = cloud
+        async with TPLinkHTTPTransport() as transport:
+            api = TPLinkApi(host, transport=transport)
+            client = TPLinkDeviceClient(host, 'token', transport=transport)
+
+            device_list = await api.get_device_info_list_async('token')
+            for _ in range(3):
+                response = await client.pass_through_request(
+                    device_list[0]['deviceId'], {'system': {'get_sysinfo': None}})
+                assert response == json.loads(PASSTHROUGH_RESPONSE['result']['responseData'])
+
+        assert len(peers) == 4
+        assert len(set(peers)) == 1
+        assert transport._async_session is None
+
+    @pytest.mark.asyncio
+    async def test_unpooled_requests_leave_no_session_open(self, cloud):
+        host, peers = cloud
+        transport = TPLinkHTTPTransport()
+        client = TPLinkDeviceClient(host, 'token', transport=transport)
+
+        for _ in range(2):
+            await client.pass_through_request('device123', {'system': {'get_sysinfo': None}})
+
+        assert len(set(peers)) == 2
+        assert transport._async_session is None
+
+    @pytest.mark.asyncio
+    async def test_unclosed_pool_is_reported(self, cloud):
+        host, _ = cloud
+        transport = TPLinkHTTPTransport(pool_connections=True)
+        client = TPLinkDeviceClient(host, 'token', transport=transport)
+        await client.pass_through_request('device123', {'system': {'get_sysinfo': None}})
+        session = transport._async_session
+
+        with pytest.warns(ResourceWarning, match='Unclosed TPLinkHTTPTransport'):
+            transport.__del__()
+        await session.close()
+
+    def test_manager_shares_its_transport(self):
+        device_manager = TPLinkDeviceManager(include_tapo=True)
+        device = device_manager._construct_device(
+            {'deviceId': 'device123', 'deviceModel': 'HS100(US)',
+             'appServerUrl': 'http://127.0.0.1'},
+            device_manager._kasa_api, 'token', 'kasa',
+        )
+
+        transport = device_manager._transport
+        assert device_manager._kasa_api._transport is transport
+        assert device_manager._tapo_api._transport is transport
+        assert device._client._transport is transport
+
+    @pytest.mark.asyncio
+    async def test_manager_closes_only_its_own_transport(self, cloud):
+        host, _ = cloud
+        transport = TPLinkHTTPTransport(pool_connections=True)
+        async with TPLinkDeviceManager(tplink_cloud_api_host=host, include_tapo=False,
+                                       transport=transport) as device_manager:
+            device_manager.set_auth_token('token')
+            assert len(await device_manager.get_devices()) == 1
+        assert transport._async_session is not None
+
+        async with TPLinkDeviceManager(tplink_cloud_api_host=host, include_tapo=False) as device_manager:
+            device_manager.set_auth_token('token')
+            await device_manager.get_devices()
+            assert device_manager._transport._async_session is not None
+        assert device_manager._transport._async_session is None
+        await transport.aclose()
+
+
+class TestCertificates:
+
+    def test_ca_bundle_is_not_overridden_by_the_environment(self, monkeypatch, tmp_path):
+        import requests
+
+        verified = []
+
+        def send(adapter, request, **kwargs):
+            verified.append(kwargs['verify'])
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{}'
+            return response
+
+        monkeypatch.setattr(requests.adapters.HTTPAdapter, 'send', send)
+        monkeypatch.setenv('REQUESTS_CA_BUNDLE', str(tmp_path / 'other.pem'))
+        monkeypatch.setenv('CURL_CA_BUNDLE', str(tmp_path / 'other.pem'))
+        transport = TPLinkHTTPTransport(ca_cert_path='tplink-ca.pem')
+
+        transport.post('https://cloud.test/', b'{}', {}, {}, 5)
+
+        assert verified == ['tplink-ca.pem']
+        transport.close()
+
+
+class TestEventLoops:
+
+    def test_new_session_per_event_loop(self):
+        transport = TPLinkHTTPTransport(pool_connections=True)
+
+        async def get_session():
+            session = transport._get_async_session()
+            # Lets the close of the previous loop's session run
+            await asyncio.sleep(0)
+            return session
+
+        first = asyncio.run(get_session())
+        second = asyncio.run(get_session())
+
+        assert first is not second
+        assert first.closed
+        transport.close()
+        assert second.closed
+
+    def test_session_of_an_open_loop_is_closed_on_it(self):
+        transport = TPLinkHTTPTransport(pool_connections=True)
+        first_loop = asyncio.new_event_loop()
+
+        async def get_session():
+            return transport._get_async_session()
+
+        try:
+            first = first_loop.run_until_complete(get_session())
+            second = asyncio.run(get_session())
+            first_loop.run_until_complete(asyncio.sleep(0))
+            assert first.closed
+        finally:
+            first_loop.close()
+        assert not second.closed
+        transport.close()
+        assert second.closed
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused_within_a_loop(self):
+        transport = TPLinkHTTPTransport(pool_connections=True)
+        assert transport._get_async_session() is transport._get_async_session()
+        await transport.aclose()
+
+
+def _cloud_handler(request):
+    body = request.json()
+    if request.path == '/api/v2/account/getAccountStatusAndUrl':
+        return {'error_code': 0, 'result': {'appServerUrl': 'https://cloud.test'}}
+    if request.path == '/api/v2/account/login':
+        return {'error_code': 0, 'result': {'token': 'token', 'refreshToken': 'refresh'}}
+    if body.get('method') == 'getDeviceList':
+        return {
+            'error_code': 0,
+            'result': {'deviceList': [{
+                'deviceId': 'device123', 'deviceModel': 'HS100(US)', 'alias': 'Plug',
+                'appServerUrl': 'https://device.cloud.test',
+            }]},
+        }
+    request_data = json.loads(body['params']['requestData'])
+    if 'set_relay_state' in request_data.get('system', {}):
+        response_data = {'system': {'set_relay_state': {'err_code': 0}}}
+    else:
+        response_data = {'system': {'get_sysinfo': {'relay_state': 1, 'err_code': 0}}}
+    return {'error_code': 0, 'result': {'responseData': json.dumps(response_data)}}
+
+
+class TestInMemoryTransport:
+
+    @pytest.mark.asyncio
+    async def test_manager_without_network(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return _cloud_handler(request)
+
+        device_manager = await TPLinkDeviceManager(
+            'user@example.com', 'password', include_tapo=False,
+            transport=TPLinkInMemoryTransport(handler),
+        )
+        device = await device_manager.find_device('Plug')
+
+        assert await device.is_on() is True
+        assert await device.power_off() == {'err_code': 0}
+        assert [request.path for request in requests[:2]] == [
+            '/api/v2/account/getAccountStatusAndUrl', '/api/v2/account/login']
+        assert requests[-1].url == 'https://device.cloud.test'
+        assert requests[-1].params['token'] == 'token'
+        assert 'X-Authorization' in requests[-1].headers
+
+    @pytest.mark.asyncio
+    async def test_async_handler(self):
+        async def handler(request):
+            return _cloud_handler(request)
+
+        client = TPLinkDeviceClient('https://device.cloud.test', 'token',
+                                    transport=TPLinkInMemoryTransport(handler))
+        response = await client.pass_through_request('device123', {'system': {'get_sysinfo': None}})
+        assert response == {'system': {'get_sysinfo': {'relay_state': 1, 'err_code': 0}}}
+
+    def test_async_handler_cannot_answer_synchronous_requests(self):
+        async def handler(request):
+            return _cloud_handler(request)
+
+        api = TPLinkApi('https://cloud.test', transport=TPLinkInMemoryTransport(handler))
+        with pytest.raises(TypeError):
+            api.get_device_info_list('token')
+
+    def test_error_response(self):
+        def handler(request):
+            return TPLinkHTTPResponse(503, 'Service Unavailable', b'')
+
+        api = TPLinkApi('https://cloud.test', transport=TPLinkInMemoryTransport(handler))
+        with pytest.raises(TPLinkCloudError, match='503'):
+            api.get_device_info_list('token')
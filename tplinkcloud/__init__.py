@@ -1,6 +1,6 @@
-from .device_manager import TPLinkDeviceManager
-from .device_manager_power_tools import TPLinkDeviceManagerPowerTools
-from .device_schedule_rule_builder import TPLinkDeviceScheduleRuleBuilder
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from .exceptions import (
     TPLinkAuthError,
     TPLinkCloudError,
@@ -12,10 +12,51 @@ from .exceptions import (
 __all__ = [
     'TPLinkDeviceManager',
     'TPLinkDeviceManagerPowerTools',
+    'TPLinkDeviceRegistry',
     'TPLinkDeviceScheduleRuleBuilder',
+    'TPLinkHTTPTransport',
+    'TPLinkInMemoryTransport',
+    'TPLinkRecordingTransport',
+    'TPLinkReplayTransport',
+    'TPLinkTransport',
     'TPLinkAuthError',
     'TPLinkCloudError',
     'TPLinkDeviceOfflineError',
     'TPLinkMFARequiredError',
     'TPLinkTokenExpiredError',
-]
\ No newline at end of file
+]
+
+# The public classes are imported on first access so that
+# `import tplinkcloud` stays cheap for tools that only need part of it
+_LAZY_ATTRIBUTES = {
+    'TPLinkDeviceManager': '.device_manager',
+    'TPLinkDeviceManagerPowerTools': '.device_manager_power_tools',
+    'TPLinkDeviceRegistry': '.device_registry',
+    'TPLinkDeviceScheduleRuleBuilder': '.device_schedule_rule_builder',
+    'TPLinkHTTPTransport': '.transport',
+    'TPLinkInMemoryTransport': '.transport',
+    'TPLinkRecordingTransport': '.cassette',
+    'TPLinkReplayTransport': '.cassette',
+    'TPLinkTransport': '.transport',
+}
+
+if TYPE_CHECKING:
+    from .cassette import TPLinkRecordingTransport, TPLinkReplayTransport
+    from .device_manager import TPLinkDeviceManager
+    from .device_manager_power_tools import TPLinkDeviceManagerPowerTools
+    from .device_registry import TPLinkDeviceRegistry
+    from .device_schedule_rule_builder import TPLinkDeviceScheduleRuleBuilder
+    from .transport import TPLinkHTTPTransport, TPLinkInMemoryTransport, TPLinkTransport
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
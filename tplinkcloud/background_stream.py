@@ -0,0 +1,95 @@
+"""Base class for the pollers that run in a background task.
+
+`BackgroundStream` runs a subclass's `_run` coroutine in a task and
+hands the items it produces to async iteration through a bounded queue.
+It is shared by `TPLinkEMeterPoller` and `TPLinkDeviceWatcher`.
+"""
+
+import asyncio
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Queued after the last item when the stream stops
+_STOPPED = object()
+
+
+class BackgroundStream:
+    """Runs `_run` in a task and iterates over the items it `_put`s.
+
+    If `_run` fails, the error is logged, iteration ends after the items
+    already delivered, and the error is raised from `__anext__`.
+
+    Args:
+        queue_size: Items kept for async iteration. When the consumer
+                    falls behind, the oldest are dropped.
+    """
+
+    def __init__(self, queue_size):
+        self._queue = asyncio.Queue(queue_size)
+        self._task = None
+        self._error = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start in a task on the running event loop."""
+        if not self.running:
+            self._error = None
+            self._task = asyncio.get_running_loop().create_task(self._run_until_stopped())
+        return self
+
+    async def stop(self):
+        """Stop, cancelling requests in flight.
+
+        Async iteration ends after the items already delivered.
+        """
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            self._put(_STOPPED)
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def __aiter__(self):
+        self.start()
+        return self
+
+    async def __anext__(self):
+        item = await self._queue.get()
+        if item is _STOPPED:
+            error, self._error = self._error, None
+            if error is not None:
+                raise error
+            raise StopAsyncIteration
+        return item
+
+    def _put(self, item):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(item)
+
+    async def _run(self):
+        raise NotImplementedError
+
+    async def _run_until_stopped(self):
+        try:
+            await self._run()
+        except Exception as error:
+            # Nobody awaits the task, so the error is kept for `__anext__`
+            # instead of leaving iteration waiting forever
+            _logger.exception('%s failed', type(self).__name__)
+            self._error = error
+            self._put(_STOPPED)
+        else:
+            self._put(_STOPPED)
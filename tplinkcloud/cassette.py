@@ -0,0 +1,253 @@
+"""Record cloud traffic to a cassette file and replay it without a network.
+
+`TPLinkRecordingTransport` wraps another transport and appends every
+request and its response, with the time it took, to a cassette: an
+NDJSON file with one compact JSON object per line. `TPLinkReplayTransport`
+answers requests from a cassette, so `TPLinkDeviceManager` and the power
+tools can be run against recorded traffic at full speed or with the
+recorded latencies.
+
+Requests are matched on what they ask for, not on how they were signed:
+the cloud (the `appName` query parameter), the URL path and the decoded
+body. The host, the other query parameters (including the token) and all
+headers (including nonces and signatures) are ignored, as are the body
+fields listed in `VOLATILE_FIELDS`, which are also left out of the
+cassette. Passthroughs are matched on the device id and the decoded
+`requestData`, so the order of its keys does not matter. When a request
+was recorded more than once, its responses are replayed in the recorded
+order.
+
+Each cassette line has the keys:
+
+    t        seconds from the start of the recording to the request
+    elapsed  seconds the request took
+    app      the appName query parameter
+    path     the URL path
+    request  the decoded request body, without volatile fields
+    status   the HTTP status
+    reason   the HTTP reason phrase
+    data     the decoded response body, for JSON responses
+    content  the response body as text, for other responses
+
+Recordings contain whatever the account's devices returned (aliases, MAC
+addresses, locations); pass a `sanitize` function to the recording
+transport to scrub entries before they are written. Tokens in responses
+are always replaced with "redacted".
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+
+from .transport import TPLinkHTTPResponse, TPLinkRequest, TPLinkTransport
+
+# Request body fields that differ between sessions or are secret
+VOLATILE_FIELDS = frozenset({
+    'cloudPassword',
+    'code',
+    'refreshToken',
+    'terminalUUID',
+})
+
+# Response result fields that are replaced before recording
+_SECRET_RESULT_FIELDS = ('token', 'refreshToken')
+
+_PASSTHROUGH_PATH = '/api/v2/common/passthrough'
+
+
+class TPLinkCassetteError(LookupError):
+    """A replayed request is not in the cassette."""
+
+
+def _decode_passthrough(params):
+    request_data = params.get('requestData')
+    if isinstance(request_data, str):
+        try:
+            request_data = json.loads(request_data)
+        except ValueError:
+            pass
+    return {**params, 'requestData': request_data}
+
+
+def _request_body(request):
+    """Decode a request body for the cassette, without volatile fields."""
+    try:
+        body = request.json()
+    except ValueError:
+        return request.body.decode(errors='replace')
+    if not isinstance(body, dict):
+        return body
+
+    body = {key: value for key, value in body.items() if key not in VOLATILE_FIELDS}
+    if request.path == _PASSTHROUGH_PATH:
+        body = _decode_passthrough(body)
+    elif body.get('method') == 'passthrough' and isinstance(body.get('params'), dict):
+        body['params'] = _decode_passthrough(body['params'])
+    return body
+
+
+def _match_key(app, path, body):
+    return app, path, json.dumps(body, sort_keys=True, separators=(',', ':'))
+
+
+def _redact(data):
+    result = data.get('result') if isinstance(data, dict) else None
+    if isinstance(result, dict) and any(field in result for field in _SECRET_RESULT_FIELDS):
+        result = {
+            key: 'redacted' if key in _SECRET_RESULT_FIELDS else value
+            for key, value in result.items()
+        }
+        data = {**data, 'result': result}
+    return data
+
+
+class TPLinkRecordingTransport(TPLinkTransport):
+    """Transport that records the traffic of another transport.
+
+    The cassette is written as requests complete and is complete once
+    the transport is closed.
+
+    Args:
+        transport: The transport that sends the requests.
+        path: The cassette file to write. An existing file is replaced.
+        sanitize: Optional function taking a cassette entry (a dict with
+                  the keys described in the module docstring) and
+                  returning it with private details scrubbed, or None to
+                  leave the entry out.
+    """
+
+    def __init__(self, transport, path, sanitize=None):
+        self._transport = transport
+        self._sanitize = sanitize
+        self._file = open(path, 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def post(self, url, data, params, headers, timeout):
+        start = time.perf_counter()
+        response = self._transport.post(url, data, params, headers, timeout)
+        self._record(start, url, data, params, headers, response)
+        return response
+
+    async def post_async(self, url, data, params, headers, timeout):
+        start = time.perf_counter()
+        response = await self._transport.post_async(url, data, params, headers, timeout)
+        self._record(start, url, data, params, headers, response)
+        return response
+
+    def _record(self, start, url, data, params, headers, response):
+        elapsed = time.perf_counter() - start
+        request = TPLinkRequest(url, params, headers, data)
+        entry = {
+            't': round(start - self._start, 6),
+            'elapsed': round(elapsed, 6),
+            'app': params.get('appName'),
+            'path': request.path,
+            'request': _request_body(request),
+            'status': response.status,
+            'reason': response.reason,
+        }
+        response_data = response.data
+        if response_data is None and response.status == 200 and response.content:
+            try:
+                response_data = json.loads(response.content)
+            except ValueError:
+                pass
+        if response_data is not None:
+            entry['data'] = _redact(response_data)
+        elif response.content:
+            entry['content'] = response.content.decode(errors='replace')
+
+        if self._sanitize is not None:
+            entry = self._sanitize(entry)
+            if entry is None:
+                return
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        """Finish the cassette and close the wrapped transport."""
+        with self._lock:
+            self._file.close()
+        self._transport.close()
+
+    async def aclose(self):
+        with self._lock:
+            self._file.close()
+        await self._transport.aclose()
+
+
+class TPLinkReplayTransport(TPLinkTransport):
+    """Transport that answers requests from a recorded cassette.
+
+    Args:
+        path: The cassette file.
+        timing: Whether to wait the recorded time before each response.
+                Without it responses are returned immediately.
+        speed: Factor the recorded times are divided by when `timing` is
+               set (e.g. 2 to replay twice as fast).
+        repeat: Whether to start again from the first recorded response
+                of a request once all of them have been replayed, for
+                polling more often than was recorded. Otherwise further
+                requests raise `TPLinkCassetteError`.
+
+    Attributes:
+        misses: Requests that were not in the cassette, as
+                `TPLinkRequest` objects.
+    """
+
+    def __init__(self, path, timing=False, speed=1.0, repeat=True):
+        self._timing = timing
+        self._speed = speed
+        self._repeat = repeat
+        self._entries = defaultdict(list)
+        self._positions = defaultdict(int)
+        self.misses = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = _match_key(entry['app'], entry['path'], entry['request'])
+                self._entries[key].append(entry)
+
+    def __len__(self):
+        """The number of recorded requests."""
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _next_entry(self, url, data, params, headers):
+        request = TPLinkRequest(url, params, headers, data)
+        key = _match_key(params.get('appName'), request.path, _request_body(request))
+        entries = self._entries.get(key)
+        position = self._positions[key]
+        if entries and position >= len(entries) and self._repeat:
+            position = 0
+        if not entries or position >= len(entries):
+            self.misses.append(request)
+            raise TPLinkCassetteError(
+                f'No recorded response for {request.path} with body {key[2]}'
+            )
+        self._positions[key] = position + 1
+        return entries[position]
+
+    @staticmethod
+    def _to_response(entry):
+        if 'data' in entry:
+            return TPLinkHTTPResponse(entry['status'], entry['reason'], None, data=entry['data'])
+        content = entry.get('content', '').encode()
+        return TPLinkHTTPResponse(entry['status'], entry['reason'], content)
+
+    def post(self, url, data, params, headers, timeout):
+        entry = self._next_entry(url, data, params, headers)
+        if self._timing:
+            time.sleep(entry['elapsed'] / self._speed)
+        return self._to_response(entry)
+
+    async def post_async(self, url, data, params, headers, timeout):
+        entry = self._next_entry(url, data, params, headers)
+        if self._timing:
+            await asyncio.sleep(entry['elapsed'] / self._speed)
+        return self._to_response(entry)
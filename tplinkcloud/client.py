@@ -11,23 +11,22 @@ Both use the same signing algorithm (HMAC-SHA1) but with different key pairs.
 import json
 import uuid
 
-import requests
-
 from .api_response import TPLinkApiResponse
-from .certs import get_ca_cert_path
 from .exceptions import (
     TPLinkAuthError,
     TPLinkCloudError,
     TPLinkMFARequiredError,
     TPLinkTokenExpiredError,
 )
+from .json_codec import get_json_codec
 from .signing import (
     KASA_ACCESS_KEY,
     KASA_SECRET_KEY,
     TAPO_ACCESS_KEY,
     TAPO_SECRET_KEY,
-    get_signing_headers,
+    get_signer,
 )
+from .transport import TPLinkHTTPTransport
 
 # V2 API error codes
 _ERR_MFA_REQUIRED = -20677
@@ -57,10 +56,11 @@ _PATH_MFA_LOGIN = "/api/v2/account/checkMFACodeAndLogin"
 
 class TPLinkApi:
     def __init__(self, host=None, verbose=False, term_id=None,
-                 cloud_type="kasa"):
+                 cloud_type="kasa", json_codec=None, transport=None):
         self._verbose = verbose
+        self._json_codec = get_json_codec(json_codec)
+        self._transport = transport or TPLinkHTTPTransport()
         self._term_id = term_id or str(uuid.uuid4())
-        self._ca_cert_path = get_ca_cert_path()
         self._cloud_type = cloud_type
 
         if cloud_type == "tapo":
@@ -79,6 +79,7 @@ class TPLinkApi:
             default_host = KASA_HOST
 
         self.host = host or default_host
+        self._signer = get_signer(self._access_key, self._secret_key)
 
         # V2 query parameters (sent on all requests)
         self._query_params = {
@@ -111,56 +112,50 @@ class TPLinkApi:
     def secret_key(self):
         return self._secret_key
 
-    def _request_post_v2(self, base_url, url_path, body, token=None):
-        """Make a signed V2 API request.
-
-        Args:
-            base_url: The base URL (e.g. "https://n-use1-wap.tplinkcloud.com").
-            url_path: The API path (e.g. "/api/v2/account/login").
-            body: The request body dict (flat format, no method/params wrapper).
-            token: Optional auth token to include in query params.
-
-        Returns:
-            TPLinkApiResponse
-        """
-        url = f"{base_url}{url_path}"
-        body_json = json.dumps(body)
+    def _prepare_request(self, url, url_path, body, token=None):
+        body_bytes = self._json_codec.dumps_bytes(body)
 
         params = self._query_params.copy()
         if token:
             params["token"] = token
 
-        signing_headers = get_signing_headers(
-            body_json, url_path,
-            access_key=self._access_key,
-            secret_key=self._secret_key,
-        )
-        headers = {**self._headers, **signing_headers}
+        headers = {**self._headers, **self._signer.get_headers(body_bytes, url_path)}
 
         if self._verbose:
             print(f"POST {url}")
-            print(f"Body: {body_json}")
-
-        response = requests.post(
-            url,
-            data=body_json,
-            params=params,
-            headers=headers,
-            verify=self._ca_cert_path,
-            timeout=15,
-        )
+            print(f"Body: {body_bytes.decode()}")
+
+        return url, body_bytes, params, headers
 
-        if response.status_code == 200:
-            response_json = response.json()
+    def _parse_response(self, response):
+        if response.status == 200:
+            response_json = response.json(self._json_codec.loads)
             if self._verbose:
                 print(json.dumps(response_json, indent=2))
             return TPLinkApiResponse(response_json)
 
         if response.content:
             raise TPLinkCloudError(
-                f"{response.status_code}: {response.reason}: {response.content!r}"
+                f"{response.status}: {response.reason}: {response.content!r}"
             )
-        raise TPLinkCloudError(f"{response.status_code}: {response.reason}")
+        raise TPLinkCloudError(f"{response.status}: {response.reason}")
+
+    def _request_post_v2(self, base_url, url_path, body, token=None):
+        """Make a signed V2 API request.
+
+        Args:
+            base_url: The base URL (e.g. "https://n-use1-wap.tplinkcloud.com").
+            url_path: The API path (e.g. "/api/v2/account/login").
+            body: The request body dict (flat format, no method/params wrapper).
+            token: Optional auth token to include in query params.
+
+        Returns:
+            TPLinkApiResponse
+        """
+        request = self._prepare_request(
+            f"{base_url}{url_path}", url_path, body, token
+        )
+        return self._parse_response(self._transport.post(*request, timeout=15))
 
     def _request_post_v1(self, body, token=None):
         """Make a V1-style request (method/params wrapper) with V2 signing.
@@ -168,44 +163,14 @@ class TPLinkApi:
         Kasa device operations use the V1 JSON format on the root path,
         but with V2 signing headers and query parameters.
         """
-        url_path = "/"
-        body_json = json.dumps(body)
-
-        params = self._query_params.copy()
-        if token:
-            params["token"] = token
-
-        signing_headers = get_signing_headers(
-            body_json, url_path,
-            access_key=self._access_key,
-            secret_key=self._secret_key,
-        )
-        headers = {**self._headers, **signing_headers}
-
-        if self._verbose:
-            print(f"POST {self.host}/")
-            print(f"Body: {body_json}")
-
-        response = requests.post(
-            self.host,
-            data=body_json,
-            params=params,
-            headers=headers,
-            verify=self._ca_cert_path,
-            timeout=15,
-        )
-
-        if response.status_code == 200:
-            response_json = response.json()
-            if self._verbose:
-                print(json.dumps(response_json, indent=2))
-            return TPLinkApiResponse(response_json)
+        request = self._prepare_request(self.host, "/", body, token)
+        return self._parse_response(self._transport.post(*request, timeout=15))
 
-        if response.content:
-            raise TPLinkCloudError(
-                f"{response.status_code}: {response.reason}: {response.content!r}"
-            )
-        raise TPLinkCloudError(f"{response.status_code}: {response.reason}")
+    async def _request_post_v1_async(self, body, token=None):
+        """Awaitable version of `_request_post_v1`."""
+        request = self._prepare_request(self.host, "/", body, token)
+        response = await self._transport.post_async(*request, timeout=15)
+        return self._parse_response(response)
 
     def _get_regional_url(self, username):
         """Discover the regional API server URL for the given account.
@@ -370,6 +335,22 @@ class TPLinkApi:
             "method": "getDeviceList",
         }
         response = self._request_post_v1(body, token)
+        return self._get_device_list(response)
+
+    async def get_device_info_list_async(self, token):
+        """Awaitable version of `get_device_info_list`.
+
+        The request goes through the transport's async connection pool,
+        so the connection can be reused by device passthroughs to the
+        same host.
+        """
+        body = {
+            "method": "getDeviceList",
+        }
+        response = await self._request_post_v1_async(body, token)
+        return self._get_device_list(response)
+
+    def _get_device_list(self, response):
         if response.successful:
             return response.result.get("deviceList", [])
 
@@ -1,12 +1,34 @@
 import asyncio
+import inspect
+from functools import lru_cache
 
 from .device_type import TPLinkDeviceType
 from .device_net_info import DeviceNetInfo
 from .device_time import DeviceTime
 from .device_timezone import DeviceTimezone
 from .device_schedule_rules import DeviceScheduleRules
+from .slotted import Slotted
 
-class DayRuntimeSummary:
+# Requests polled often enough that the client caches their serialized
+# bodies (see `TPLinkDeviceClient.pass_through_request`)
+_TEMPLATED_REQUESTS = frozenset({
+    ('system', 'get_sysinfo'),
+    ('system', 'set_relay_state'),
+    ('emeter', 'get_realtime'),
+})
+
+
+@lru_cache(maxsize=None)
+def _accepts_view(get_sys_info):
+    # Device classes registered by other packages may override
+    # `get_sys_info` without the `view` keyword
+    parameters = inspect.signature(get_sys_info).parameters
+    return 'view' in parameters or any(
+        parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters.values())
+
+class DayRuntimeSummary(Slotted):
+
+    __slots__ = ('year', 'month', 'day', 'time')
 
     def __init__(self, day_data):
         self.year = day_data.get('year')
@@ -15,7 +37,9 @@ class DayRuntimeSummary:
         # Time is in minutes
         self.time = day_data.get('time')
 
-class MonthRuntimeSummary:
+class MonthRuntimeSummary(Slotted):
+
+    __slots__ = ('year', 'month', 'minutes')
 
     def __init__(self, day_data):
         self.year = day_data.get('year')
@@ -59,8 +83,16 @@ class TPLinkDevice:
             request_data['context'] = {
                 'child_ids': [self.child_id] if self.child_id else None
             }
-        response = await self._client.pass_through_request(
-            self.device_id, request_data)
+        if (request_type, sub_request_type) in _TEMPLATED_REQUESTS:
+            # The parameters of these requests are flat, so they make a
+            # hashable key together with the child being addressed
+            params = tuple(request.items()) if isinstance(request, dict) else request
+            template_key = (self.child_id, request_type, sub_request_type, params)
+            response = await self._client.pass_through_request(
+                self.device_id, request_data, template_key=template_key)
+        else:
+            response = await self._client.pass_through_request(
+                self.device_id, request_data)
         if not response:
             return None
 
@@ -94,39 +126,47 @@ class TPLinkDevice:
         return await self._pass_through_request('system', 'get_sysinfo', None)
 
     # This is intended to be overriden by actual device
-    # implementations where sys info is well-defined
-    async def get_sys_info(self):
+    # implementations where sys info is well-defined. Passing `view=True`
+    # returns a read-only view that reads fields from the response on
+    # access instead of copying them (the raw dict is already returned
+    # here, so it makes no difference for generic devices)
+    async def get_sys_info(self, view=False):
         return await self._get_sys_info()
 
+    async def _get_state_sys_info(self):
+        # The sys info `is_on` and `is_off` read, as a view where the
+        # device class supports one
+        if _accepts_view(type(self).get_sys_info):
+            return await self.get_sys_info(view=True)
+        return await self.get_sys_info()
+
+    def _get_relay_state(self, device_sys_info):
+        # Sys info is a raw dict for devices without a model-specific
+        # sys info class
+        state_key = 'state' if self.child_id else 'relay_state'
+        if isinstance(device_sys_info, dict):
+            return device_sys_info[state_key]
+        return getattr(device_sys_info, state_key)
+
     async def is_on(self):
-        device_sys_info = await self.get_sys_info()
+        device_sys_info = await self._get_state_sys_info()
 
         # get_sys_info can return `None` if something went wrong with the
         # request -- in this case we pass `None` to caller
         if device_sys_info is None:
             return None
 
-        sys_info = device_sys_info.__dict__ if hasattr(
-            device_sys_info, '__dict__') else device_sys_info
-        if self.child_id:
-            return sys_info['state'] == 1
-
-        return sys_info['relay_state'] == 1
+        return self._get_relay_state(device_sys_info) == 1
 
     async def is_off(self):
-        device_sys_info = await self.get_sys_info()
+        device_sys_info = await self._get_state_sys_info()
 
         # get_sys_info can return `None` if something went wrong with the
         # request -- in this case we pass `None` to caller
         if device_sys_info is None:
             return None
 
-        sys_info = device_sys_info.__dict__ if hasattr(
-            device_sys_info, '__dict__') else device_sys_info
-        if self.child_id:
-            return sys_info['state'] == 0
-
-        return sys_info['relay_state'] == 0
+        return self._get_relay_state(device_sys_info) == 0
 
     async def set_led_state(self, on):
         # This is intentional - follows the API contract
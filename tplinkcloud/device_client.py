@@ -1,23 +1,25 @@
-import aiohttp
 import json
 import uuid
 
 from .api_response import TPLinkApiResponse
-from .certs import get_ca_cert_path
-from .signing import KASA_ACCESS_KEY, KASA_SECRET_KEY, get_signing_headers
-import ssl
+from .json_codec import get_json_codec
+from .signing import KASA_ACCESS_KEY, KASA_SECRET_KEY, get_signer
+from .transport import TPLinkHTTPTransport
 
 
 class TPLinkDeviceClient:
     def __init__(self, host, token, verbose=False, term_id=None,
                  access_key=None, secret_key=None, app_name=None,
-                 cloud_type="kasa"):
+                 cloud_type="kasa", json_codec=None, transport=None):
         self.host = host
         self._verbose = verbose
+        self._json_codec = get_json_codec(json_codec)
+        self._transport = transport or TPLinkHTTPTransport()
         self._term_id = term_id or str(uuid.uuid4())
         self._access_key = access_key or KASA_ACCESS_KEY
         self._secret_key = secret_key or KASA_SECRET_KEY
         self._cloud_type = cloud_type
+        self._signer = get_signer(self._access_key, self._secret_key)
 
         self._params = {
             "appName": app_name or "Kasa_Android_Mix",
@@ -37,71 +39,99 @@ class TPLinkDeviceClient:
             "Content-Type": "application/json;charset=UTF-8",
         }
 
-        # Build SSL context with TP-Link's private CA
-        self._ssl_context = ssl.create_default_context(cafile=get_ca_cert_path())
+        # Serialized passthrough bodies of frequently repeated requests,
+        # keyed by (device_id, template_key)
+        self._request_templates = {}
 
     async def _request_post(self, body, url_path="/"):
-        if self._verbose:
-            print('POST', self.host + url_path, body)
+        body_bytes = self._json_codec.dumps_bytes(body)
+        return await self._post(
+            body_bytes, self._signer.content_md5(body_bytes), url_path
+        )
 
-        body_json = json.dumps(body)
+    async def _post(self, body_bytes, content_md5, url_path="/"):
+        if self._verbose:
+            print('POST', self.host + url_path, body_bytes.decode())
 
-        signing_headers = get_signing_headers(
-            body_json, url_path,
-            access_key=self._access_key,
-            secret_key=self._secret_key,
-        )
-        headers = {**self._headers, **signing_headers}
+        headers = {
+            **self._headers,
+            "Content-MD5": content_md5,
+            "X-Authorization": self._signer.authorization(content_md5, url_path),
+        }
 
         url = self.host if url_path == "/" else f"{self.host}{url_path}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                url,
-                data=body_json,
-                params=self._params,
-                headers=headers,
-                ssl=self._ssl_context,
-                timeout=aiohttp.ClientTimeout(total=600),
-            ) as response:
-                if response.status == 200:
-                    response_json = await response.json(content_type=None)
-                    if self._verbose:
-                        print(json.dumps(response_json, indent=2))
-                    return TPLinkApiResponse(response_json)
-                elif response.content:
-                    raise Exception(str(response.status) + ': ' +
-                                    response.reason + ': ' + str(response.content))
-                else:
-                    raise Exception(str(response.status) + ': ' + response.reason)
-
-    async def pass_through_request(self, device_id, request_data):
+        response = await self._transport.post_async(
+            url,
+            body_bytes,
+            self._params,
+            headers,
+            timeout=600,
+        )
+        if response.status == 200:
+            response_json = response.json(self._json_codec.loads)
+            if self._verbose:
+                print(json.dumps(response_json, indent=2))
+            return TPLinkApiResponse(response_json)
+        elif response.content:
+            raise Exception(str(response.status) + ': ' +
+                            response.reason + ': ' + str(response.content))
+        else:
+            raise Exception(str(response.status) + ': ' + response.reason)
+
+    def _pass_through_body(self, device_id, request_data):
         if self._cloud_type == "tapo":
             # Tapo uses V2-style passthrough endpoint with flat body
             body = {
                 'deviceId': device_id,
-                'requestData': json.dumps(request_data),
+                'requestData': self._json_codec.dumps(request_data),
             }
-            response = await self._request_post(
-                body, url_path="/api/v2/common/passthrough"
-            )
-        else:
-            # Kasa uses V1-style method/params wrapper on root path
-            body = {
-                'method': 'passthrough',
-                'params': {
-                    'deviceId': device_id,
-                    'requestData': json.dumps(request_data)
-                }
+            return body, "/api/v2/common/passthrough"
+
+        # Kasa uses V1-style method/params wrapper on root path
+        body = {
+            'method': 'passthrough',
+            'params': {
+                'deviceId': device_id,
+                'requestData': self._json_codec.dumps(request_data)
             }
-            response = await self._request_post(body)
+        }
+        return body, "/"
+
+    async def pass_through_request(self, device_id, request_data, template_key=None):
+        """Send a request to a device through the cloud.
+
+        Args:
+            device_id: The id of the device (the parent for child outlets).
+            request_data: The request for the device.
+            template_key: Optional hashable key identifying `request_data`
+                          for this device. The serialized body and its
+                          Content-MD5 are cached under it, so later requests
+                          with the same key are only re-signed. Callers must
+                          only reuse a key for identical request data.
+
+        Returns:
+            The device's response, or None if the request failed.
+        """
+        if template_key is None:
+            body, url_path = self._pass_through_body(device_id, request_data)
+            response = await self._request_post(body, url_path=url_path)
+        else:
+            template_key = (device_id, template_key)
+            template = self._request_templates.get(template_key)
+            if template is None:
+                body, url_path = self._pass_through_body(device_id, request_data)
+                body_bytes = self._json_codec.dumps_bytes(body)
+                template = (body_bytes, self._signer.content_md5(body_bytes), url_path)
+                self._request_templates[template_key] = template
+            response = await self._post(*template)
 
         if response.successful:
             response_data = response.result.get('responseData')
             # Some devices (e.g., Archer routers) return responseData as a dict
             # while others return it as a JSON string
             if isinstance(response_data, str):
-                return json.loads(response_data)
+                return self._json_codec.loads(response_data)
             return response_data
 
         return None
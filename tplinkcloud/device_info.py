@@ -1,4 +1,14 @@
-class TPLinkDeviceInfo:
+from .slotted import Slotted
+
+
+class TPLinkDeviceInfo(Slotted):
+
+    __slots__ = (
+        'device_type', 'role', 'fw_ver', 'app_server_url', 'device_region',
+        'device_id', 'device_name', 'device_hw_ver', 'alias', 'device_mac',
+        'oem_id', 'device_model', 'hw_id', 'fw_id', 'is_same_region', 'status',
+        'cloud_type',
+    )
 
     def __init__(self, device_info, cloud_type="kasa"):
         self.device_type = device_info.get('deviceType')
@@ -1,43 +1,74 @@
 import asyncio
+from collections.abc import MutableMapping
 
 from .device_info import TPLinkDeviceInfo
 from .device_client import TPLinkDeviceClient
+from .device_registry import TPLinkDeviceRegistry
+from .device_watcher import TPLinkDeviceWatcher
 from .client import TPLinkApi
 from .exceptions import TPLinkTokenExpiredError
-
-from .hs100 import HS100
-from .hs103 import HS103
-from .hs105 import HS105
-from .hs110 import HS110
-from .hs200 import HS200
-from .hs300 import HS300
-from .kl420l5 import KL420L5
-from .kl430 import KL430
-from .kp115 import KP115
-from .kp125 import KP125
-from .kp200 import KP200
-from .kp303 import KP303
-from .kp400 import KP400
-from .ep40 import EP40
-from .device import TPLinkDevice
-
-DEVICE_MODEL_MAP: dict[str, type[TPLinkDevice]] = {
-    'HS100': HS100,
-    'HS103': HS103,
-    'HS105': HS105,
-    'HS110': HS110,
-    'HS200': HS200,
-    'HS300': HS300,
-    'KL420L5': KL420L5,
-    'KL430': KL430,
-    'KP115': KP115,
-    'KP125': KP125,
-    'KP200': KP200,
-    'KP303': KP303,
-    'KP400': KP400,
-    'EP40': EP40,
+from .json_codec import get_json_codec
+from .transport import TPLinkHTTPTransport
+
+
+# Device classes are imported the first time a device of that model is
+# constructed, so only the model modules present in a fleet are loaded
+_DEVICE_MODEL_CLASSES = {
+    'HS100': '.hs100:HS100',
+    'HS103': '.hs103:HS103',
+    'HS105': '.hs105:HS105',
+    'HS110': '.hs110:HS110',
+    'HS200': '.hs200:HS200',
+    'HS300': '.hs300:HS300',
+    'KL420L5': '.kl420l5:KL420L5',
+    'KL430': '.kl430:KL430',
+    'KP115': '.kp115:KP115',
+    'KP125': '.kp125:KP125',
+    'KP200': '.kp200:KP200',
+    'KP303': '.kp303:KP303',
+    'KP400': '.kp400:KP400',
+    'EP40': '.ep40:EP40',
 }
 
+# Shared by every device manager unless one is given its own registry;
+# register third-party device classes here to have them constructed for
+# matching models
+DEVICE_REGISTRY = TPLinkDeviceRegistry(_DEVICE_MODEL_CLASSES)
+
+
+class _DeviceModelMap(dict):
+    """The legacy model prefix -> class dict, registering changes made to
+    it in `DEVICE_REGISTRY` so they still take effect."""
+
+    def __setitem__(self, prefix, device_cls):
+        DEVICE_REGISTRY.register(prefix, device_cls)
+        super().__setitem__(prefix, device_cls)
+
+    def __delitem__(self, prefix):
+        super().__delitem__(prefix)
+        DEVICE_REGISTRY.unregister(prefix)
+
+    # Built on the two methods above
+    update = MutableMapping.update
+    setdefault = MutableMapping.setdefault
+    pop = MutableMapping.pop
+    popitem = MutableMapping.popitem
+    clear = MutableMapping.clear
+
+
+def __getattr__(name):
+    # DEVICE_MODEL_MAP is kept for backward compatibility; building it
+    # imports every supported model module, so it is built on first use
+    # and then kept as a module global
+    if name == 'DEVICE_MODEL_MAP':
+        device_model_map = _DeviceModelMap({
+            prefix: DEVICE_REGISTRY.resolve(prefix)
+            for prefix in _DEVICE_MODEL_CLASSES
+        })
+        globals()['DEVICE_MODEL_MAP'] = device_model_map
+        return device_model_map
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class TPLinkDeviceManager:
 
@@ -52,6 +83,9 @@ class TPLinkDeviceManager:
         term_id=None,
         mfa_callback=None,
         include_tapo=True,
+        device_registry=None,
+        json_codec=None,
+        transport=None,
     ):
         self._verbose = verbose
         self._cache_devices = cache_devices
@@ -61,11 +95,19 @@ class TPLinkDeviceManager:
         self._password = password
         self._mfa_callback = mfa_callback
         self._include_tapo = include_tapo
+        self._device_registry = DEVICE_REGISTRY if device_registry is None else device_registry
+        self._json_codec = get_json_codec(json_codec)
+        # One transport for the cloud APIs and every device client, so
+        # they share pooled connections to the regional hosts
+        self._owns_transport = transport is None
+        self._transport = transport or TPLinkHTTPTransport()
 
         # Kasa cloud API (always present)
         self._kasa_api = TPLinkApi(
             tplink_cloud_api_host, verbose=self._verbose,
             term_id=self._term_id, cloud_type="kasa",
+            json_codec=self._json_codec,
+            transport=self._transport,
         )
         self._kasa_token = None
         self._kasa_refresh_token = None
@@ -78,6 +120,8 @@ class TPLinkDeviceManager:
             self._tapo_api = TPLinkApi(
                 tplink_cloud_api_host, verbose=self._verbose,
                 term_id=self._term_id, cloud_type="tapo",
+                json_codec=self._json_codec,
+                transport=self._transport,
             )
 
         if username and password:
@@ -116,6 +160,29 @@ class TPLinkDeviceManager:
     def __await__(self):
         return self.async_init().__await__()
 
+    async def __aenter__(self):
+        if self._owns_transport:
+            # Pool connections until the manager is closed
+            await self._transport.__aenter__()
+        try:
+            return await self.async_init()
+        except BaseException:
+            await self.__aexit__(None, None, None)
+            raise
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._owns_transport:
+            await self._transport.__aexit__(exc_type, exc, tb)
+
+    async def close(self):
+        """Close the pooled HTTP connections.
+
+        Transports passed in by the caller are left open for the caller
+        to close.
+        """
+        if self._owns_transport:
+            await self._transport.aclose()
+
     async def get_devices(self):
         if self._cached_devices:
             return self._cached_devices
@@ -150,7 +217,7 @@ class TPLinkDeviceManager:
     async def _get_cloud_devices(self, api, token, refresh_token, cloud_type):
         """Get devices from a specific cloud (Kasa or Tapo)."""
         try:
-            device_info_list = api.get_device_info_list(token)
+            device_info_list = await api.get_device_info_list_async(token)
         except TPLinkTokenExpiredError:
             if refresh_token:
                 result = api.refresh_login(refresh_token)
@@ -163,7 +230,7 @@ class TPLinkDeviceManager:
                         self._tapo_token = result.get('token')
                         self._tapo_refresh_token = result.get('refreshToken')
                         token = self._tapo_token
-                device_info_list = api.get_device_info_list(token)
+                device_info_list = await api.get_device_info_list_async(token)
             else:
                 raise
 
@@ -194,12 +261,10 @@ class TPLinkDeviceManager:
             secret_key=api.secret_key,
             app_name=api._app_name,
             cloud_type=cloud_type,
+            json_codec=self._json_codec,
+            transport=self._transport,
         )
-        model = tplink_device_info.device_model
-        device_cls = next(
-            (cls for prefix, cls in DEVICE_MODEL_MAP.items() if model.startswith(prefix)),
-            TPLinkDevice,
-        )
+        device_cls = self._device_registry.resolve(tplink_device_info.device_model)
         device = device_cls(client, tplink_device_info.device_id, tplink_device_info)
         device.cloud_type = cloud_type
         return device
@@ -254,3 +319,16 @@ class TPLinkDeviceManager:
                 matching_devices.append(device)
 
         return matching_devices
+
+    def watch(self, devices=None, **kwargs):
+        """Watch devices for state changes.
+
+        Args:
+            devices: The devices to watch, or None for all devices.
+            **kwargs: Options of `TPLinkDeviceWatcher`, like `interval`.
+
+        Returns:
+            A `TPLinkDeviceWatcher`; iterate over it with `async for` to
+            get its `DeviceEvent`s.
+        """
+        return TPLinkDeviceWatcher(self, devices, **kwargs)
@@ -1,8 +1,18 @@
 import asyncio
+import time
 from datetime import datetime
+from operator import attrgetter, itemgetter
 
+from .emeter_device import get_power_usage_day_range, get_power_usage_month_range
+from .emeter_poller import TPLinkEMeterPoller
+from .emeter_stats_cache import EMeterStatsCache
+from .power_usage_columns import DayPowerColumns, MonthPowerColumns, RealtimePowerColumns
+from .slotted import Slotted
 
-class DevicePowerUsage:
+
+class DevicePowerUsage(Slotted):
+
+    __slots__ = ('device_id', 'name', 'data', 'child_id')
 
     def __init__(self, device_id, child_id, name, data):
         self.device_id = device_id
@@ -12,6 +22,33 @@ class DevicePowerUsage:
         self.name = name
         self.data = data
 
+
+def _previous_month(today):
+    """Get the month and year of the month before `today`'s."""
+    # Data requested by month needs to account for the past month
+    if today.month > 1:
+        return today.month - 1, today.year
+    return 12, today.year - 1
+
+
+_DAY = attrgetter('day')
+_MONTH = attrgetter('month')
+_DAY_KEY = itemgetter('day')
+_MONTH_KEY = itemgetter('month')
+
+
+def _concat_in_order(earlier, later, key):
+    """Join the stats of two consecutive periods in date order.
+
+    The periods do not overlap, so only the entries within each need
+    ordering, by their day or month number. Devices usually return them
+    in order already, which `sorted` only has to confirm.
+    """
+    usage = sorted(earlier, key=key)
+    usage.extend(sorted(later, key=key))
+    return usage
+
+
 # This builds upon the TPLinkDeviceManager, adding functionality specifically 
 # pertaining to emeter devices. The main benefit of this toolset is that requests 
 # are managed asynchronously across all matching devices, so for a large number of
@@ -20,10 +57,111 @@ class TPLinkDeviceManagerPowerTools:
 
     def __init__(
         self,
-        device_manager
+        device_manager,
+        cache_stats=True,
+        stats_cache=None,
+        realtime_history=None,
+        store=None,
+        energy_history=None,
     ):
         self._device_manager = device_manager
-    
+        # Optional RealtimePowerHistory that every realtime reading is
+        # recorded in
+        self._realtime_history = realtime_history
+        # Optional EMeterStore that every realtime reading and stat is
+        # written to
+        self._store = store
+        # Optional EnergyHistory kept up to date with every stat and
+        # realtime meter reading
+        self._energy_history = energy_history
+        # Daily and monthly stats of closed months and years never change,
+        # so they are only fetched once (see EMeterStatsCache)
+        self._stats_cache = None
+        if cache_stats:
+            self._stats_cache = stats_cache if stats_cache is not None else EMeterStatsCache()
+
+    @property
+    def stats_cache(self):
+        return self._stats_cache
+
+    @property
+    def realtime_history(self):
+        return self._realtime_history
+
+    @property
+    def store(self):
+        return self._store
+
+    @property
+    def energy_history(self):
+        return self._energy_history
+
+    def _record_realtime(self, device, timestamp, reading):
+        if self._realtime_history is not None:
+            self._realtime_history.record(device, timestamp, reading)
+        if self._store is not None:
+            self._store.record(device, timestamp, reading)
+        if self._energy_history is not None:
+            self._energy_history.add_realtime(device, timestamp, reading)
+
+    def _record_days(self, device, days):
+        if self._store is not None:
+            self._store.record_days(device, days)
+        if self._energy_history is not None:
+            self._energy_history.add_days(device, days)
+
+    def _record_months(self, device, months):
+        if self._store is not None:
+            self._store.record_months(device, months)
+        if self._energy_history is not None:
+            self._energy_history.add_months(device, months)
+
+    async def _get_day_stats(self, device, year, month):
+        if self._stats_cache is None:
+            days = await device.get_power_usage_day(year, month)
+        else:
+            days = await self._stats_cache.get_power_usage_day(device, year, month)
+        self._record_days(device, days)
+        return days
+
+    async def _get_month_stats(self, device, year):
+        if self._stats_cache is None:
+            months = await device.get_power_usage_month(year)
+        else:
+            months = await self._stats_cache.get_power_usage_month(device, year)
+        self._record_months(device, months)
+        return months
+
+    async def _get_daystat(self, device, year, month):
+        if self._stats_cache is None:
+            days = await device.get_daystat(year, month)
+        else:
+            days = await self._stats_cache.get_daystat(device, year, month)
+        self._record_days(device, days)
+        return days
+
+    async def _get_monthstat(self, device, year):
+        if self._stats_cache is None:
+            months = await device.get_monthstat(year)
+        else:
+            months = await self._stats_cache.get_monthstat(device, year)
+        self._record_months(device, months)
+        return months
+
+    def poll(self, devices, **kwargs):
+        """Poll the realtime power of devices continuously.
+
+        Args:
+            devices: The emeter devices to poll (see `get_emeter_devices`).
+            **kwargs: Options of `TPLinkEMeterPoller`, e.g. `interval`,
+                      `max_requests_per_second` or `callback`.
+
+        Returns:
+            A `TPLinkEMeterPoller`, which starts polling when iterated
+            with `async for`, entered with `async with` or started.
+        """
+        return TPLinkEMeterPoller(self, devices, **kwargs)
+
     async def get_emeter_devices(self, devices_like=None):
         if devices_like:
             devices = await self._device_manager.find_devices(devices_like)
@@ -32,20 +170,84 @@ class TPLinkDeviceManagerPowerTools:
         emeter_devices = [device for device in devices if device.has_emeter()]
         return emeter_devices
 
-    async def get_devices_power_usage_realtime(self, devices_like):
+    # With columnar=True, these return the readings of all devices as
+    # arrays (see power_usage_columns) instead of DevicePowerUsage objects
+    async def get_devices_power_usage_realtime(self, devices_like, columnar=False):
         devices = await self.get_emeter_devices(devices_like)
+        if columnar:
+            return await self._get_power_usage_realtime_columns(devices)
         return await self._get_power_usage_realtime(devices)
 
-    async def get_devices_power_usage_day(self, devices_like):
+    async def get_devices_power_usage_day(self, devices_like, columnar=False):
         devices = await self.get_emeter_devices(devices_like)
+        if columnar:
+            return await self._get_power_usage_day_columns(devices)
         return await self._get_power_usage_day(devices)
 
-    async def get_devices_power_usage_month(self, devices_like):
+    async def get_devices_power_usage_month(self, devices_like, columnar=False):
         devices = await self.get_emeter_devices(devices_like)
+        if columnar:
+            return await self._get_power_usage_month_columns(devices)
         return await self._get_power_usage_month(devices)
 
-    async def _get_device_power_usage_realtime(self, device):
+    async def get_devices_power_usage_day_range(
+        self, devices_like, start, end=None, max_concurrent_requests=50
+    ):
+        """Get the daily usage of matching devices over a range of dates.
+
+        Only the months in the range are requested, and with the stats
+        cache, closed months only once.
+
+        Args:
+            devices_like: Substring of the device names, or None for all
+                          emeter devices.
+            start: The first date (a `date` or `datetime`).
+            end: The last date, included. Defaults to today.
+            max_concurrent_requests: Maximum number of requests sent at
+                                     once across all devices.
+
+        Returns:
+            A `DevicePowerUsage` per device, with the `DayPowerSummary`
+            list in date order as its data.
+        """
+        devices = await self.get_emeter_devices(devices_like)
+        return await self._get_power_usage_day_range(
+            devices, start, end or datetime.today(), max_concurrent_requests)
+
+    async def get_devices_power_usage_month_range(
+        self, devices_like, start, end=None, max_concurrent_requests=50
+    ):
+        """Get the monthly usage of matching devices over a range of months.
+
+        Args:
+            devices_like: Substring of the device names, or None for all
+                          emeter devices.
+            start: A date in the first month.
+            end: A date in the last month, included. Defaults to today.
+            max_concurrent_requests: Maximum number of requests sent at
+                                     once across all devices.
+
+        Returns:
+            A `DevicePowerUsage` per device, with the `MonthPowerSummary`
+            list in date order as its data.
+        """
+        devices = await self.get_emeter_devices(devices_like)
+        return await self._get_power_usage_month_range(
+            devices, start, end or datetime.today(), max_concurrent_requests)
+
+    async def get_device_power_usage_realtime(self, device):
+        """Get the realtime power of one emeter device.
+
+        Like the fleet methods, the reading is recorded in the
+        `realtime_history`, `store` and `energy_history`, if given. This
+        is what `poll` requests for each device.
+
+        Returns:
+            A `DevicePowerUsage` with a `CurrentPower` (None if the
+            request failed) as its data.
+        """
         usage = await device.get_power_usage_realtime()
+        self._record_realtime(device, time.time(), usage)
 
         return DevicePowerUsage(
             device.device_id,
@@ -57,7 +259,7 @@ class TPLinkDeviceManagerPowerTools:
     async def _get_power_usage_realtime(self, devices):
         device_usage_requests = []
         for device in devices:
-            device_usage_requests.append(self._get_device_power_usage_realtime(
+            device_usage_requests.append(self.get_device_power_usage_realtime(
                 device
             ))
 
@@ -65,11 +267,11 @@ class TPLinkDeviceManagerPowerTools:
         return device_usage
 
     async def _get_device_power_usage_day(self, device, today, previous_month, previous_months_year):
-        usage = await device.get_power_usage_day(today.year, today.month)
-        previous_month_usage = await device.get_power_usage_day(previous_months_year, previous_month)
-        if previous_month_usage:
-            usage.extend(previous_month_usage)
-        usage.sort(key=lambda x: datetime(year=x.year, month=x.month, day=x.day))
+        usage, previous_month_usage = await asyncio.gather(
+            self._get_day_stats(device, today.year, today.month),
+            self._get_day_stats(device, previous_months_year, previous_month),
+        )
+        usage = _concat_in_order(previous_month_usage, usage, _DAY)
 
         return DevicePowerUsage(
             device.device_id,
@@ -80,13 +282,7 @@ class TPLinkDeviceManagerPowerTools:
 
     async def _get_power_usage_day(self, devices):
         today = datetime.today()
-        # Data requested by month needs to account for the past month
-        if today.month > 1:
-            previous_month = today.month - 1
-            previous_months_year = today.year
-        else:
-            previous_month = 12
-            previous_months_year = today.year - 1
+        previous_month, previous_months_year = _previous_month(today)
 
         device_usage_requests = []
         for device in devices:
@@ -101,12 +297,11 @@ class TPLinkDeviceManagerPowerTools:
         return device_usage
 
     async def _get_device_power_usage_month(self, device, today):
-        usage = await device.get_power_usage_month(today.year)
-        previous_year_usage = await device.get_power_usage_month(today.year - 1)
-        if previous_year_usage:
-            usage.extend(previous_year_usage)
-        # Given there is no actual day data, just use the same value for each
-        usage.sort(key=lambda x: datetime(year=x.year, month=x.month, day=1))
+        usage, previous_year_usage = await asyncio.gather(
+            self._get_month_stats(device, today.year),
+            self._get_month_stats(device, today.year - 1),
+        )
+        usage = _concat_in_order(previous_year_usage, usage, _MONTH)
 
         return DevicePowerUsage(
             device.device_id,
@@ -126,3 +321,74 @@ class TPLinkDeviceManagerPowerTools:
 
         device_usage = await asyncio.gather(*device_usage_requests)
         return device_usage
+
+    async def _get_power_usage_day_range(self, devices, start, end, max_concurrent_requests):
+        semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+        async def get_device_usage(device):
+            async def get_month(year, month):
+                async with semaphore:
+                    return await self._get_day_stats(device, year, month)
+
+            usage = await get_power_usage_day_range(get_month, start, end, None)
+            return DevicePowerUsage(device.device_id, device.child_id, device.get_alias(), usage)
+
+        return await asyncio.gather(*(get_device_usage(device) for device in devices))
+
+    async def _get_power_usage_month_range(self, devices, start, end, max_concurrent_requests):
+        semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+        async def get_device_usage(device):
+            async def get_year(year):
+                async with semaphore:
+                    return await self._get_month_stats(device, year)
+
+            usage = await get_power_usage_month_range(get_year, start, end, None)
+            return DevicePowerUsage(device.device_id, device.child_id, device.get_alias(), usage)
+
+        return await asyncio.gather(*(get_device_usage(device) for device in devices))
+
+    async def _get_power_usage_realtime_columns(self, devices):
+        async def get_realtime(device):
+            realtime_data = await device.get_realtime()
+            return realtime_data, time.time()
+
+        responses = await asyncio.gather(*(get_realtime(device) for device in devices))
+        columns = RealtimePowerColumns()
+        for device, (realtime_data, timestamp) in zip(devices, responses):
+            columns.append(columns.add_device(device), timestamp, realtime_data)
+            self._record_realtime(device, timestamp, realtime_data)
+        return columns
+
+    async def _get_power_usage_day_columns(self, devices):
+        today = datetime.today()
+        previous_month, previous_months_year = _previous_month(today)
+
+        async def get_days(device):
+            days, previous_month_days = await asyncio.gather(
+                self._get_daystat(device, today.year, today.month),
+                self._get_daystat(device, previous_months_year, previous_month),
+            )
+            return _concat_in_order(previous_month_days, days, _DAY_KEY)
+
+        device_days = await asyncio.gather(*(get_days(device) for device in devices))
+        columns = DayPowerColumns()
+        for device, days in zip(devices, device_days):
+            columns.extend(columns.add_device(device), days)
+        return columns
+
+    async def _get_power_usage_month_columns(self, devices):
+        today = datetime.today()
+
+        async def get_months(device):
+            months, previous_year_months = await asyncio.gather(
+                self._get_monthstat(device, today.year),
+                self._get_monthstat(device, today.year - 1),
+            )
+            return _concat_in_order(previous_year_months, months, _MONTH_KEY)
+
+        device_months = await asyncio.gather(*(get_months(device) for device in devices))
+        columns = MonthPowerColumns()
+        for device, months in zip(devices, device_months):
+            columns.extend(columns.add_device(device), months)
+        return columns
@@ -1,4 +1,9 @@
-class DeviceNetInfo:
+from .slotted import Slotted
+
+
+class DeviceNetInfo(Slotted):
+
+    __slots__ = ('ssid', 'key_type', 'rssi', 'err_code')
 
     def __init__(self, net_info):
         # This should be the name of your network
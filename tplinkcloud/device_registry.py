@@ -0,0 +1,147 @@
+"""Resolution of TP-Link device models to device classes.
+
+Device models reported by the cloud carry a region suffix
+(e.g. "HS300(US)"), so classes are registered against a model prefix
+("HS300") and resolved by the longest registered prefix of the model.
+Longest-prefix matching makes overlapping prefixes (e.g. "KP125" and
+"KP125M") independent of registration order.
+
+Prefixes are stored in a character trie and the results for exact model
+strings are kept in an LRU cache, so resolving the handful of distinct
+models in a fleet is a dictionary lookup after the first device.
+
+Classes can be registered lazily as a "module:ClassName" string; the
+module is imported the first time a model with that prefix is resolved.
+Relative module names are resolved against the tplinkcloud package.
+"""
+
+from functools import lru_cache
+from importlib import import_module
+
+from .device import TPLinkDevice
+
+
+class _TrieNode:
+    __slots__ = ('children', 'device_cls')
+
+    def __init__(self):
+        self.children = {}
+        self.device_cls = None
+
+
+class TPLinkDeviceRegistry:
+    """Maps device model prefixes to the classes used to construct them.
+
+    Args:
+        device_classes: Optional mapping of model prefix -> device class (or
+                        "module:ClassName" string) to register up front.
+        default_cls: Class returned for models without a registered prefix.
+        cache_size: Number of exact model strings to keep resolved.
+    """
+
+    def __init__(self, device_classes=None, default_cls=TPLinkDevice,
+                 cache_size=256):
+        self._root = _TrieNode()
+        self._prefixes = set()
+        self._default_cls = default_cls
+        self._resolve_cached = lru_cache(maxsize=cache_size)(self._resolve)
+        if device_classes:
+            for prefix, device_cls in device_classes.items():
+                self.register(prefix, device_cls)
+
+    @property
+    def default_cls(self):
+        return self._default_cls
+
+    def register(self, prefix, device_cls):
+        """Register a device class for all models starting with `prefix`.
+
+        Registering an existing prefix replaces its class. `device_cls` may
+        be a "module:ClassName" string to defer importing the class until a
+        matching model is first resolved. Third-party classes must accept
+        `(client, device_id, device_info)`.
+        """
+        if not prefix:
+            raise ValueError("Cannot register a device class without a model prefix")
+
+        node = self._root
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        node.device_cls = device_cls
+        self._prefixes.add(prefix)
+        self._resolve_cached.cache_clear()
+
+    def unregister(self, prefix):
+        """Remove the class registered for `prefix`, if any."""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return
+        node.device_cls = None
+        self._prefixes.discard(prefix)
+        self._resolve_cached.cache_clear()
+
+    def resolve(self, model):
+        """Get the device class for a model string such as "HS300(US)"."""
+        if not model:
+            return self._default_cls
+        return self._resolve_cached(model)
+
+    def _resolve(self, model):
+        node = self._root
+        match = None
+        for char in model:
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.device_cls is not None:
+                match = node
+        if match is None:
+            return self._default_cls
+        if isinstance(match.device_cls, str):
+            match.device_cls = _import_device_cls(match.device_cls)
+        return match.device_cls
+
+    def prefixes(self):
+        """Get a copy of the registered prefix -> class mapping.
+
+        Lazily registered classes are returned as their "module:ClassName"
+        string until they have been resolved.
+        """
+        return {
+            prefix: self._find_node(prefix).device_cls
+            for prefix in self._prefixes
+        }
+
+    def load_all(self):
+        """Import every lazily registered class.
+
+        Returns:
+            The registered prefix -> class mapping.
+        """
+        for prefix in self._prefixes:
+            node = self._find_node(prefix)
+            if isinstance(node.device_cls, str):
+                node.device_cls = _import_device_cls(node.device_cls)
+        return self.prefixes()
+
+    def _find_node(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.children[char]
+        return node
+
+    def __contains__(self, prefix):
+        return prefix in self._prefixes
+
+    def __len__(self):
+        return len(self._prefixes)
+
+
+def _import_device_cls(spec):
+    module_name, _, cls_name = spec.partition(':')
+    if not cls_name:
+        raise ValueError(f"Device class '{spec}' must be given as 'module:ClassName'")
+    module = import_module(module_name, package=__package__)
+    return getattr(module, cls_name)
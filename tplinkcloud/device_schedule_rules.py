@@ -1,12 +1,23 @@
 from enum import Enum
 
+from .slotted import Slotted
+
 class DeviceScheduleRuleStartOption(Enum):
     Time = 0
     Sunrise = 1
     Sunset = 2
 
-class DeviceScheduleRule:
+class DeviceScheduleRule(Slotted):
     
+    __slots__ = (
+        'id', 'name', 'enable', 'wday', 'stime_opt', 'soffset', 'smin', 'sact',
+        'etime_opt', 'eoffset', 'emin', 'eact', 'repeat', 'year', 'month',
+        'day', 'enabled', 'sunday_enabled', 'monday_enabled',
+        'tuesday_enabled', 'wednesday_enabled', 'thursday_enabled',
+        'friday_enabled', 'saturday_enabled', 'start_type', 'turn_on',
+        'turn_off', 'repeated', 'hour', 'minute',
+    )
+
     def __init__(self, rule):
         self.id = rule.get('id')
         self.name = rule.get('name')
@@ -83,8 +94,10 @@ class DeviceScheduleRule:
             'day': self.day,
         }
 
-class DeviceScheduleRules:
+class DeviceScheduleRules(Slotted):
     
+    __slots__ = ('version', 'enable', 'err_code', 'rules')
+
     def __init__(self, rules):
         rule_list = rules.get('rule_list')
         if rule_list:
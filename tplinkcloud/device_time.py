@@ -1,5 +1,10 @@
-class DeviceTime:
+from .slotted import Slotted
+
+
+class DeviceTime(Slotted):
     
+    __slots__ = ('year', 'month', 'mday', 'hour', 'min', 'sec', 'err_code')
+
     def __init__(self, time):
         self.year = time.get('year')
         self.month = time.get('month')
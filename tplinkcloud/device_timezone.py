@@ -1,4 +1,9 @@
-class DeviceTimezone:
+from .slotted import Slotted
+
+
+class DeviceTimezone(Slotted):
+
+    __slots__ = ('index', 'err_code')
 
     def __init__(self, timezone):
         # Truly no idea what list of timezones these index
@@ -0,0 +1,271 @@
+"""Change events for a fleet of devices.
+
+`TPLinkDeviceWatcher` polls the system info of a set of devices and
+emits a `DeviceEvent` only when something changed, instead of callers
+requesting `is_on` for every device and comparing snapshots themselves:
+
+- One `get_sysinfo` request per physical device covers the device and
+  all of its outlets. Strips are requested once, at the parent, and the
+  outlets' states and aliases are read from its `children`. Light
+  strips report their light state in the same response.
+- The serialized request bodies are reused between rounds, and only the
+  watched fields are read from each response and compared with the
+  previous ones, so an unchanged device costs one request and a few
+  comparisons.
+- A device the cloud reports as not answering is reported offline
+  once, and online again when it answers. Requests that fail for other
+  reasons are logged and counted in `request_errors`, and leave the
+  device's state unchanged.
+
+    async for event in device_manager.watch(interval=10):
+        print(event.name, event.kind, event.old, '->', event.new)
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from bisect import bisect_right
+
+from .background_stream import BackgroundStream
+from .exceptions import TPLinkDeviceOfflineError
+from .slotted import Slotted
+
+_logger = logging.getLogger(__name__)
+
+# Event kinds
+RELAY_STATE = 'relay_state'
+ALIAS = 'alias'
+LIGHT_STATE = 'light_state'
+RSSI = 'rssi'
+ONLINE = 'online'
+
+_SYS_INFO_REQUEST = {'system': {'get_sysinfo': None}}
+# The template key `TPLinkDevice._pass_through_request` uses for the same
+# request, so the watcher and the devices share the cached body
+_SYS_INFO_TEMPLATE_KEY = (None, 'system', 'get_sysinfo', None)
+
+class DeviceEvent(Slotted):
+    """A change of one device's state.
+
+    Attributes:
+        device: The device.
+        name: The device's alias.
+        kind: What changed: `RELAY_STATE` (1 or 0), `ALIAS`,
+              `LIGHT_STATE` (the light state dict), `RSSI` (the signal
+              strength in dBm, reported when it crosses a threshold) or
+              `ONLINE` (True or False).
+        old: The previous value (for `RSSI`, the last one reported), or
+             None for the first one.
+        new: The current value.
+        timestamp: When the change was seen, in seconds since the epoch.
+    """
+
+    __slots__ = ('device', 'name', 'kind', 'old', 'new', 'timestamp')
+
+    def __init__(self, device, name, kind, old, new, timestamp):
+        self.device = device
+        self.name = name
+        self.kind = kind
+        self.old = old
+        self.new = new
+        self.timestamp = timestamp
+
+
+class _WatchedDevice:
+
+    __slots__ = ('device', 'online', 'seen', 'relay_state', 'alias', 'light_state', 'rssi')
+
+    def __init__(self, device):
+        self.device = device
+        # None until the device first answers or fails to
+        self.online = None
+        self.seen = False
+        self.relay_state = None
+        self.alias = None
+        self.light_state = None
+        self.rssi = None
+
+
+class _WatchedGroup:
+    """The watched devices answering through one physical device."""
+
+    __slots__ = ('client', 'device_id', 'members')
+
+    def __init__(self, client, device_id):
+        self.client = client
+        self.device_id = device_id
+        self.members = []
+
+
+def _group_devices(devices):
+    groups = {}
+    for device in devices:
+        group = groups.get(device.device_id)
+        if group is None:
+            group = groups[device.device_id] = _WatchedGroup(device._client, device.device_id)
+        group.members.append(_WatchedDevice(device))
+    return list(groups.values())
+
+
+class TPLinkDeviceWatcher(BackgroundStream):
+    """Polls devices and emits their state changes.
+
+    Args:
+        device_manager: The `TPLinkDeviceManager` of the devices.
+        devices: The devices to watch, or None for all of the device
+                 manager's devices.
+        interval: Seconds between the starts of polling rounds.
+        rssi_thresholds: Signal strengths in dBm. An `RSSI` event is
+                         emitted when a device's signal moves to the other
+                         side of one of them.
+        emit_initial: Whether to emit events for the first state seen of
+                      each device, with `old` None.
+        max_concurrent_requests: Cap on requests in flight.
+        callback: Optional function or coroutine function called with
+                  each `DeviceEvent`. Exceptions it raises are logged
+                  and counted in `callback_errors`, and watching goes on.
+        queue_size: Events kept for async iteration. When the consumer
+                    falls behind, the oldest are dropped.
+    """
+
+    def __init__(
+        self,
+        device_manager,
+        devices=None,
+        interval=30,
+        rssi_thresholds=(-75, -65),
+        emit_initial=False,
+        max_concurrent_requests=50,
+        callback=None,
+        queue_size=10000,
+    ):
+        super().__init__(queue_size)
+        self._device_manager = device_manager
+        self._groups = None if devices is None else _group_devices(devices)
+        self._interval = interval
+        self._rssi_thresholds = sorted(rssi_thresholds)
+        self._emit_initial = emit_initial
+        self._max_concurrent_requests = max_concurrent_requests
+        self._callback = callback
+        self.requests = 0
+        self.request_errors = 0
+        self.callback_errors = 0
+        self.rounds = 0
+
+    def _rssi_changed(self, old, new):
+        if old is None or new is None:
+            return old is not new
+        return bisect_right(self._rssi_thresholds, old) != bisect_right(self._rssi_thresholds, new)
+
+    def _diff(self, watched, sys_info, children, timestamp):
+        """Update a device's state from its group's sys info.
+
+        Returns:
+            The device's `DeviceEvent`s.
+        """
+        device = watched.device
+        if device.child_id:
+            child = children.get(device.child_id)
+            if child is None:
+                return []
+            relay_state, alias, light_state = child.get('state'), child.get('alias'), None
+        else:
+            light_state = sys_info.get('light_state')
+            if light_state is not None:
+                relay_state = light_state.get('on_off')
+            else:
+                relay_state = sys_info.get('relay_state')
+            alias = sys_info.get('alias')
+        rssi = sys_info.get('rssi')
+
+        changes = []
+        if not watched.seen:
+            watched.seen = True
+            # The first state seen is only a change if initial events are
+            # wanted
+            if not self._emit_initial:
+                watched.relay_state, watched.alias = relay_state, alias
+                watched.light_state, watched.rssi = light_state, rssi
+                return changes
+        if relay_state != watched.relay_state:
+            changes.append((RELAY_STATE, watched.relay_state, relay_state))
+            watched.relay_state = relay_state
+        if alias != watched.alias:
+            changes.append((ALIAS, watched.alias, alias))
+            watched.alias = alias
+            if alias is not None:
+                # Keep `get_alias` and `find_device` current
+                device.device_info.alias = alias
+        if light_state != watched.light_state:
+            changes.append((LIGHT_STATE, watched.light_state, light_state))
+            watched.light_state = light_state
+        if self._rssi_changed(watched.rssi, rssi):
+            changes.append((RSSI, watched.rssi, rssi))
+            watched.rssi = rssi
+        return [
+            DeviceEvent(device, device.get_alias(), kind, old, new, timestamp)
+            for kind, old, new in changes
+        ]
+
+    def _set_online(self, watched, online, timestamp):
+        previous, watched.online = watched.online, online
+        # Devices offline from the start are always reported
+        if previous == online or (previous is None and online and not self._emit_initial):
+            return []
+        return [DeviceEvent(watched.device, watched.device.get_alias(), ONLINE, previous, online, timestamp)]
+
+    async def _check(self, group):
+        self.requests += 1
+        try:
+            response = await group.client.pass_through_request(
+                group.device_id, _SYS_INFO_REQUEST, template_key=_SYS_INFO_TEMPLATE_KEY)
+        except TPLinkDeviceOfflineError:
+            response = None
+        except Exception:
+            # The cloud request failed, which says nothing about the
+            # device, so its state is left as it was until the next round
+            self.request_errors += 1
+            _logger.warning('System info request failed for device %s', group.device_id, exc_info=True)
+            return
+        sys_info = (response.get('system') or {}).get('get_sysinfo') if response else None
+        if sys_info is not None and sys_info.get('err_code', 0) != 0:
+            sys_info = None
+
+        timestamp = time.time()
+        events = []
+        if sys_info is None:
+            for watched in group.members:
+                events.extend(self._set_online(watched, False, timestamp))
+        else:
+            children = {child.get('id'): child for child in sys_info.get('children') or ()}
+            for watched in group.members:
+                events.extend(self._set_online(watched, True, timestamp))
+                events.extend(self._diff(watched, sys_info, children, timestamp))
+
+        for event in events:
+            self._put(event)
+            if self._callback is not None:
+                try:
+                    result = self._callback(event)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception:
+                    self.callback_errors += 1
+                    _logger.exception('Device event callback failed for %s', event.name)
+
+    async def _run(self):
+        if self._groups is None:
+            self._groups = _group_devices(await self._device_manager.get_devices())
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+
+        async def check(group):
+            async with semaphore:
+                await self._check(group)
+
+        while True:
+            started = loop.time()
+            await asyncio.gather(*(check(group) for group in self._groups))
+            self.rounds += 1
+            await asyncio.sleep(max(0, started + self._interval - loop.time()))
@@ -1,57 +1,154 @@
 import asyncio
+from datetime import date, datetime
+from functools import partial
 
 from .device import TPLinkDevice
 from .device_type import TPLinkDeviceType
+from .slotted import Slotted
 
 
-class CurrentPower:
+def unit_field(data, key, short_key):
+    """Get a field of a decoded emeter response by its unit suffixed key.
 
-    def __init__(self, realtime_data):
-        # The HS110 does not have the unit type suffixes, and others
-        # also may not but have yet to be identified. We attempt to
-        # normalize the results by trying both possible keys
-        self.voltage_mv = realtime_data.get('voltage_mv')
-        if self.voltage_mv is None:
-            self.voltage_mv = realtime_data.get('voltage')
+    The HS110 does not have the unit type suffixes, and others also may
+    not but have yet to be identified, so the key without the suffix is
+    tried too.
+    """
+    value = data.get(key)
+    if value is None:
+        value = data.get(short_key)
+    return value
+
+
+# The unit suffixed and bare keys of the get_realtime fields, in the
+# order of the realtime buffers and columns
+REALTIME_KEYS = (
+    ('power_mw', 'power'),
+    ('voltage_mv', 'voltage'),
+    ('current_ma', 'current'),
+    ('total_wh', 'total'),
+)
+
+
+def device_key(device):
+    """Get the (device_id, child_id) key of a device.
+
+    Args:
+        device: A device, a `DevicePowerUsage` (which only has a
+                `child_id` for child devices), or a key, returned as is.
+    """
+    if isinstance(device, tuple):
+        return device
+    return device.device_id, getattr(device, 'child_id', None)
 
-        self.current_ma = realtime_data.get('current_ma')
-        if self.current_ma is None:
-            self.current_ma = realtime_data.get('current')
 
-        self.power_mw = realtime_data.get('power_mw')
-        if self.power_mw is None:
-            self.power_mw = realtime_data.get('power')
+class CurrentPower(Slotted):
 
-        self.total_wh = realtime_data.get('total_wh')
-        if self.total_wh is None:
-            self.total_wh = realtime_data.get('total')
+    __slots__ = ('voltage_mv', 'current_ma', 'power_mw', 'total_wh')
 
+    def __init__(self, realtime_data):
+        self.voltage_mv = unit_field(realtime_data, 'voltage_mv', 'voltage')
+        self.current_ma = unit_field(realtime_data, 'current_ma', 'current')
+        self.power_mw = unit_field(realtime_data, 'power_mw', 'power')
+        self.total_wh = unit_field(realtime_data, 'total_wh', 'total')
+
+
+class DayPowerSummary(Slotted):
 
-class DayPowerSummary:
+    __slots__ = ('year', 'month', 'day', 'energy_wh')
 
     def __init__(self, day_data):
         self.year = day_data.get('year')
         self.month = day_data.get('month')
         self.day = day_data.get('day')
-        # The HS110 does not have the unit type suffixes, and others
-        # also may not but have yet to be identified. We attempt to
-        # normalize the results by trying both possible keys
-        self.energy_wh = day_data.get('energy_wh')
-        if self.energy_wh is None:
-            self.energy_wh = day_data.get('energy')
+        self.energy_wh = unit_field(day_data, 'energy_wh', 'energy')
 
 
-class MonthPowerSummary:
+class MonthPowerSummary(Slotted):
+
+    __slots__ = ('year', 'month', 'energy_wh')
 
     def __init__(self, day_data):
         self.year = day_data.get('year')
         self.month = day_data.get('month')
-        # The HS110 does not have the unit type suffixes, and others
-        # also may not but have yet to be identified. We attempt to
-        # normalize the results by trying both possible keys
-        self.energy_wh = day_data.get('energy_wh')
-        if self.energy_wh is None:
-            self.energy_wh = day_data.get('energy')
+        self.energy_wh = unit_field(day_data, 'energy_wh', 'energy')
+
+
+def as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _months_between(start, end):
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+async def _gather_limited(requests, max_concurrency):
+    if max_concurrency is None:
+        return await asyncio.gather(*(request() for request in requests))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def limited(request):
+        async with semaphore:
+            return await request()
+
+    return await asyncio.gather(*(limited(request) for request in requests))
+
+
+async def get_power_usage_day_range(get_month, start, end, max_concurrency):
+    """Daily usage from `start` to `end` (inclusive) from per-month stats.
+
+    Args:
+        get_month: Coroutine function taking a year and month and
+                   returning the `DayPowerSummary` list of that month.
+        start: The first date.
+        end: The last date.
+        max_concurrency: Maximum number of months fetched at once, or
+                         None for no limit.
+
+    Returns:
+        The days' `DayPowerSummary` objects in date order.
+    """
+    start, end = as_date(start), as_date(end)
+    months = list(_months_between(start, end))
+    month_usage = await _gather_limited(
+        [lambda year=year, month=month: get_month(year, month) for year, month in months],
+        max_concurrency,
+    )
+    first, last = (start.year, start.month, start.day), (end.year, end.month, end.day)
+    usage = []
+    for days in month_usage:
+        # Each month is sorted on its own; the months are already in order
+        days = sorted(days, key=lambda day: day.day)
+        usage.extend(day for day in days if first <= (day.year, day.month, day.day) <= last)
+    return usage
+
+
+async def get_power_usage_month_range(get_year, start, end, max_concurrency):
+    """Monthly usage from the month of `start` to that of `end` (inclusive).
+
+    Args:
+        get_year: Coroutine function taking a year and returning the
+                  `MonthPowerSummary` list of that year.
+        start: A date in the first month.
+        end: A date in the last month.
+        max_concurrency: Maximum number of years fetched at once, or
+                         None for no limit.
+
+    Returns:
+        The months' `MonthPowerSummary` objects in date order.
+    """
+    years = range(start.year, end.year + 1)
+    year_usage = await _gather_limited(
+        [lambda year=year: get_year(year) for year in years], max_concurrency)
+    first, last = (start.year, start.month), (end.year, end.month)
+    usage = []
+    for months in year_usage:
+        months = sorted(months, key=lambda month: month.month)
+        usage.extend(month for month in months if first <= (month.year, month.month) <= last)
+    return usage
 
 
 class TPLinkEMeterDevice(TPLinkDevice):
@@ -63,17 +160,28 @@ class TPLinkEMeterDevice(TPLinkDevice):
     def has_emeter(self):
         return True
 
-    async def get_power_usage_realtime(self):
+    async def get_realtime(self):
+        """Get the decoded `get_realtime` response, or None if it failed.
+
+        `get_power_usage_realtime` wraps it in a `CurrentPower`; this is
+        for callers that read the fields directly.
+        """
         realtime_data = await self._pass_through_request(
             'emeter',
             'get_realtime',
             None
         )
         if realtime_data is not None and realtime_data.get('err_code') == 0:
-            return CurrentPower(realtime_data)
+            return realtime_data
         return None
 
-    async def get_power_usage_day(self, year, month):
+    async def get_daystat(self, year, month):
+        """Get the `day_list` entries of a month as decoded dicts.
+
+        Returns:
+            The entries, or an empty list if there is no data for the
+            month or the request failed.
+        """
         day_response_data = await self._pass_through_request(
             'emeter',
             'get_daystat',
@@ -84,10 +192,16 @@ class TPLinkEMeterDevice(TPLinkDevice):
         )
         # If there is no data for the requested month, data will be None
         if day_response_data and day_response_data.get('err_code') == 0:
-            return [DayPowerSummary(day_data) for day_data in day_response_data['day_list']]
+            return day_response_data['day_list']
         return []
 
-    async def get_power_usage_month(self, year):
+    async def get_monthstat(self, year):
+        """Get the `month_list` entries of a year as decoded dicts.
+
+        Returns:
+            The entries, or an empty list if there is no data for the
+            year or the request failed.
+        """
         month_response_data = await self._pass_through_request(
             'emeter',
             'get_monthstat',
@@ -97,5 +211,59 @@ class TPLinkEMeterDevice(TPLinkDevice):
         )
         # If there is no data for the requested year, data will be None
         if month_response_data and month_response_data.get('err_code') == 0:
-            return [MonthPowerSummary(month_data) for month_data in month_response_data['month_list']]
+            return month_response_data['month_list']
         return []
+
+    async def get_power_usage_realtime(self):
+        realtime_data = await self.get_realtime()
+        if realtime_data is not None:
+            return CurrentPower(realtime_data)
+        return None
+
+    async def get_power_usage_day(self, year, month):
+        return [DayPowerSummary(day_data) for day_data in await self.get_daystat(year, month)]
+
+    async def get_power_usage_month(self, year):
+        return [MonthPowerSummary(month_data) for month_data in await self.get_monthstat(year)]
+
+    async def get_power_usage_day_range(self, start, end=None, max_concurrency=4, stats_cache=None):
+        """Get daily usage over a range of dates.
+
+        The stats of each month in the range are fetched concurrently.
+        Months the device returns no stats for are left out.
+
+        Args:
+            start: The first date (a `date` or `datetime`).
+            end: The last date, included. Defaults to today.
+            max_concurrency: Maximum number of requests sent at once.
+            stats_cache: Optional `EMeterStatsCache` (such as the power
+                         tools' `stats_cache`) the stats of closed months
+                         are taken from. Without it, every month is
+                         fetched.
+
+        Returns:
+            A list of `DayPowerSummary` in date order.
+        """
+        get_month = self.get_power_usage_day
+        if stats_cache is not None:
+            get_month = partial(stats_cache.get_power_usage_day, self)
+        return await get_power_usage_day_range(get_month, start, end or date.today(), max_concurrency)
+
+    async def get_power_usage_month_range(self, start, end=None, max_concurrency=4, stats_cache=None):
+        """Get monthly usage from the month of `start` to that of `end`.
+
+        Args:
+            start: A date in the first month.
+            end: A date in the last month, included. Defaults to today.
+            max_concurrency: Maximum number of requests sent at once.
+            stats_cache: Optional `EMeterStatsCache` the stats of closed
+                         years are taken from. Without it, every year is
+                         fetched.
+
+        Returns:
+            A list of `MonthPowerSummary` in date order.
+        """
+        get_year = self.get_power_usage_month
+        if stats_cache is not None:
+            get_year = partial(stats_cache.get_power_usage_month, self)
+        return await get_power_usage_month_range(get_year, start, end or date.today(), max_concurrency)
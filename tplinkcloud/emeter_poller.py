@@ -0,0 +1,250 @@
+"""Continuous realtime power polling for many devices.
+
+`TPLinkEMeterPoller` polls `get_realtime` on a set of emeter devices
+forever, rather than bursting every device at once like a loop around
+`get_devices_power_usage_realtime`:
+
+- The first polls are spread evenly across the interval, and every
+  later poll is moved by a random jitter, so requests stay spread out.
+- Each device has its own interval. It halves (down to `min_interval`)
+  when the device's power changed by more than the change threshold
+  since its last reading, and grows by half (up to `max_interval`) when
+  it did not, so switching loads are followed closely and idle ones
+  cost few requests.
+- `max_requests_per_second` caps the request rate of the whole poller,
+  and `max_concurrent_requests` the requests in flight; devices that
+  are due wait their turn.
+
+Readings are delivered as `PowerSample` objects to an optional callback
+and through async iteration:
+
+    poller = power_tools.poll(await power_tools.get_emeter_devices(), interval=30)
+    async for sample in poller:
+        print(sample.name, sample.data.power_mw if sample.data else None)
+
+Readings also go to the power tools' `realtime_history`, `store` and `energy_history`, if they have them.
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import random
+import time
+
+from .background_stream import BackgroundStream
+from .slotted import Slotted
+
+_logger = logging.getLogger(__name__)
+
+
+class PowerSample(Slotted):
+    """One realtime reading of a device.
+
+    Attributes:
+        device: The device.
+        name: The device's alias.
+        timestamp: When the reading arrived, in seconds since the epoch.
+        data: The `CurrentPower` reading, or None if the request failed.
+        interval: Seconds until the device is polled again.
+    """
+
+    __slots__ = ('device', 'name', 'timestamp', 'data', 'interval')
+
+    def __init__(self, device, name, timestamp, data, interval):
+        self.device = device
+        self.name = name
+        self.timestamp = timestamp
+        self.data = data
+        self.interval = interval
+
+
+class _PolledDevice:
+
+    __slots__ = ('device', 'interval', 'power_mw')
+
+    def __init__(self, device, interval):
+        self.device = device
+        self.interval = interval
+        self.power_mw = None
+
+
+class _RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second on average."""
+
+    def __init__(self, rate, burst=1):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class TPLinkEMeterPoller(BackgroundStream):
+    """Polls the realtime power of emeter devices on adaptive intervals.
+
+    Args:
+        power_tools: The `TPLinkDeviceManagerPowerTools` whose devices
+                     are polled.
+        devices: The emeter devices to poll.
+        interval: Seconds between polls of a device to start with.
+        min_interval: The shortest interval a device adapts down to.
+        max_interval: The longest interval a device adapts up to.
+        jitter: Fraction of the interval each poll is randomly moved by,
+                in either direction.
+        change_threshold: Relative power change that counts as the load
+                          changing.
+        min_change_mw: Power change below which the load counts as
+                       unchanged, whatever its relative size, so noise
+                       on near-idle devices does not speed them up.
+        max_requests_per_second: Cap on the poller's request rate, or
+                                 None for no cap.
+        max_concurrent_requests: Cap on requests in flight.
+        callback: Optional function or coroutine function called with
+                  each `PowerSample`. Exceptions it raises are logged
+                  and counted in `callback_errors`, and polling goes on.
+                  Failed requests are likewise logged and counted in
+                  `request_errors`.
+        queue_size: Samples kept for async iteration. When the consumer
+                    falls behind, the oldest are dropped.
+        seed: Seed for the jitter.
+    """
+
+    def __init__(
+        self,
+        power_tools,
+        devices,
+        interval=30,
+        min_interval=5,
+        max_interval=300,
+        jitter=0.1,
+        change_threshold=0.1,
+        min_change_mw=1000,
+        max_requests_per_second=None,
+        max_concurrent_requests=50,
+        callback=None,
+        queue_size=10000,
+        seed=None,
+    ):
+        if not min_interval <= interval <= max_interval:
+            raise ValueError('interval must be between min_interval and max_interval')
+        super().__init__(queue_size)
+        self._power_tools = power_tools
+        self._devices = [_PolledDevice(device, interval) for device in devices]
+        self._interval = interval
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._jitter = jitter
+        self._change_threshold = change_threshold
+        self._min_change_mw = min_change_mw
+        self._rate_limiter = _RateLimiter(max_requests_per_second) if max_requests_per_second else None
+        self._max_concurrent_requests = max_concurrent_requests
+        self._callback = callback
+        self._rng = random.Random(seed)
+        self.requests = 0
+        self.request_errors = 0
+        self.callback_errors = 0
+
+    def _jittered(self, interval):
+        return interval * (1 + self._rng.uniform(-self._jitter, self._jitter))
+
+    def _adapt(self, polled, usage):
+        power_mw = usage.power_mw if usage is not None else None
+        if power_mw is None:
+            return
+        if polled.power_mw is not None:
+            change = abs(power_mw - polled.power_mw)
+            if change >= self._min_change_mw and change > self._change_threshold * abs(polled.power_mw):
+                polled.interval = max(self._min_interval, polled.interval / 2)
+            else:
+                polled.interval = min(self._max_interval, polled.interval * 1.5)
+        polled.power_mw = power_mw
+
+    async def _poll(self, polled):
+        try:
+            usage = (await self._power_tools.get_device_power_usage_realtime(polled.device)).data
+        except Exception:
+            # A failed request is a missing reading, like a device error
+            self.request_errors += 1
+            _logger.warning('Realtime power request failed for %s', polled.device.get_alias(), exc_info=True)
+            usage = None
+        self._adapt(polled, usage)
+        sample = PowerSample(polled.device, polled.device.get_alias(), time.time(), usage, polled.interval)
+
+        self._put(sample)
+        if self._callback is not None:
+            try:
+                result = self._callback(sample)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                # The poll task is not awaited by anyone, so the error
+                # would otherwise be lost; polling carries on
+                self.callback_errors += 1
+                _logger.exception('Power sample callback failed for %s', sample.name)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        count = len(self._devices)
+        order = itertools.count()
+        # (due time, tie breaker, device), with the first polls spread
+        # evenly over one interval
+        schedule = [
+            (start + self._jittered(self._interval * index / count), next(order), polled)
+            for index, polled in enumerate(self._devices)
+        ]
+        heapq.heapify(schedule)
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+        in_flight = set()
+        wakeup = None
+
+        def wake():
+            if wakeup is not None and not wakeup.done():
+                wakeup.set_result(None)
+
+        async def poll(polled):
+            try:
+                await self._poll(polled)
+            finally:
+                semaphore.release()
+                heapq.heappush(
+                    schedule, (loop.time() + self._jittered(polled.interval), next(order), polled))
+                wake()
+
+        try:
+            while True:
+                if schedule and schedule[0][0] <= loop.time():
+                    _, _, polled = heapq.heappop(schedule)
+                    await semaphore.acquire()
+                    if self._rate_limiter is not None:
+                        await self._rate_limiter.acquire()
+                    self.requests += 1
+                    task = loop.create_task(poll(polled))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                    continue
+                # Sleep until the next poll is due, or until a finished
+                # poll schedules its device again, possibly sooner
+                wakeup = loop.create_future()
+                timer = loop.call_at(schedule[0][0], wake) if schedule else None
+                try:
+                    await wakeup
+                finally:
+                    if timer is not None:
+                        timer.cancel()
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
@@ -0,0 +1,103 @@
+"""Cache of emeter statistics for periods that have ended.
+
+A device's `get_daystat` for a past month and `get_monthstat` for a past
+year never change, so they only need to be fetched once. The stats of
+the current month and year are still accruing and are always fetched.
+
+A period counts as closed once it ended `closed_after` ago (a day by
+default). The clock is the host's, and devices count days in their own
+time zone, so the margin keeps the last hours of a period from being
+cached before a device in a time zone behind the host has finished it.
+"""
+
+from datetime import datetime, timedelta
+
+from .emeter_device import DayPowerSummary, MonthPowerSummary
+
+
+class EMeterStatsCache:
+    """Stats of closed periods, keyed by (device_id, child_id, year, month).
+
+    The decoded `day_list` and `month_list` entries are stored, with the
+    monthly stats of a year under a month of None. Empty results are not
+    cached, since a device returns no stats both for periods without data
+    and when the request fails.
+
+    Args:
+        closed_after: How long after a period ends it is treated as
+                      closed.
+        clock: Callable returning the current datetime. Defaults to
+               `datetime.now`.
+    """
+
+    def __init__(self, closed_after=timedelta(days=1), clock=None):
+        self._closed_after = closed_after
+        self._clock = clock
+        self._stats = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._stats)
+
+    def _closed_before(self):
+        now = self._clock() if self._clock is not None else datetime.now()
+        return now - self._closed_after
+
+    def is_closed(self, year, month=None):
+        """Whether a month (or with no month, a year) has closed."""
+        closed_before = self._closed_before()
+        if month is None:
+            return year < closed_before.year
+        return (year, month) < (closed_before.year, closed_before.month)
+
+    async def _get(self, device, year, month, fetch):
+        if not self.is_closed(year, month):
+            return await fetch()
+
+        key = (device.device_id, device.child_id, year, month)
+        stats = self._stats.get(key)
+        if stats is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            stats = await fetch()
+            if not stats:
+                return stats
+            self._stats[key] = stats
+        # Callers own the returned list and may extend or sort it, but
+        # not the entries
+        return list(stats)
+
+    async def get_daystat(self, device, year, month):
+        """`device.get_daystat`, from the cache for closed months."""
+        return await self._get(device, year, month, lambda: device.get_daystat(year, month))
+
+    async def get_monthstat(self, device, year):
+        """`device.get_monthstat`, from the cache for closed years."""
+        return await self._get(device, year, None, lambda: device.get_monthstat(year))
+
+    async def get_power_usage_day(self, device, year, month):
+        """`device.get_power_usage_day`, from the cache for closed months."""
+        return [DayPowerSummary(day_data) for day_data in await self.get_daystat(device, year, month)]
+
+    async def get_power_usage_month(self, device, year):
+        """`device.get_power_usage_month`, from the cache for closed years."""
+        return [MonthPowerSummary(month_data) for month_data in await self.get_monthstat(device, year)]
+
+    def invalidate(self, device_id=None, child_id=None):
+        """Drop cached stats.
+
+        Args:
+            device_id: Only drop the stats of this device (and its
+                       children, unless `child_id` is given).
+            child_id: Only drop the stats of this child.
+        """
+        if device_id is None and child_id is None:
+            self._stats.clear()
+            return
+        self._stats = {
+            key: stats for key, stats in self._stats.items()
+            if not ((device_id is None or key[0] == device_id)
+                    and (child_id is None or key[1] == child_id))
+        }
@@ -0,0 +1,610 @@
+"""Compact on-disk store of emeter history.
+
+Each series (the realtime readings, daily stats or monthly stats of one
+device) is an append-only file of blocks. A block holds up to
+`block_rows` rows column by column. Timestamps are stored as
+milliseconds, encoded as the difference between consecutive differences,
+so regularly spaced readings take a byte each. Every other field is
+stored as the differences between consecutive values, scaled to the
+fewest decimals (up to three) that keep it exact. All of these are
+zigzag varints. A block's values that no such scale keeps exact (more
+decimals, as HS110 floats can have) are stored as float64 instead, so
+nothing is rounded. Missing values take a bit each. A day of 5 second
+readings takes a few bytes per reading, where JSON takes about a hundred.
+
+`EMeterSeriesReader` memory-maps a file and reads only the block headers
+up front, so a time range decodes just the blocks that overlap it.
+Passed to the power tools as `store`, an `EMeterStore` records every
+reading and stat they fetch:
+
+    store = EMeterStore('emeter')
+    power_tools = TPLinkDeviceManagerPowerTools(device_manager, store=store)
+    await power_tools.get_devices_power_usage_realtime(None)
+    store.flush()
+    store.realtime(device, start=time.time() - 3600)
+
+Rows are buffered in memory until a block fills up or `flush` is called.
+A row with the same timestamp as an earlier one replaces it when read,
+which is how the stats of the current day and month are updated.
+"""
+
+import math
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import accumulate
+from urllib.parse import quote, unquote
+
+from .emeter_device import DayPowerSummary, MonthPowerSummary, device_key
+from .power_usage_columns import date_timestamp
+from .realtime_power_buffer import RealtimePowerBuffer, reading_fields
+
+_NAN = float('nan')
+_MAGIC = b'TPES'
+_VERSION = 1
+# Payload length, rows, CRC-32 of the payload, first and last timestamp
+# in milliseconds
+_BLOCK_HEADER = struct.Struct('<IIIqq')
+_MAX_DECIMALS = 3
+# In place of the decimals, for a column stored as float64
+_RAW = 0xFF
+# How a column's missing values are stored
+_ALL_PRESENT = 0
+_BITMAP = 1
+_ALL_MISSING = 2
+
+REALTIME = 'realtime'
+DAY = 'day'
+MONTH = 'month'
+_SERIES_FIELDS = {
+    REALTIME: RealtimePowerBuffer.FIELDS,
+    DAY: ('energy_wh',),
+    MONTH: ('energy_wh',),
+}
+_SUFFIX = '.tpes'
+
+
+def _write_varints(out, values):
+    for value in values:
+        value = value << 1 if value >= 0 else (~value << 1) | 1
+        while value >= 0x80:
+            out.append(value & 0x7F | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def _read_varints(data, offset, count):
+    """Decode `count` zigzag varints from `offset`.
+
+    Returns:
+        The values and the offset after them.
+    """
+    values = []
+    append = values.append
+    for _ in range(count):
+        byte = data[offset]
+        offset += 1
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        append((value >> 1) ^ -(value & 1))
+    return values, offset
+
+
+def _decimals(values):
+    """Get the fewest decimals that represent all values exactly, or
+    `_RAW` if more than `_MAX_DECIMALS` would be needed."""
+    if all(type(value) is int for value in values):
+        return 0
+    if not all(math.isfinite(value) for value in values):
+        return _RAW
+    for decimals in range(_MAX_DECIMALS + 1):
+        scale = 10 ** decimals
+        if all(round(value * scale) / scale == value for value in values):
+            return decimals
+    return _RAW
+
+
+def _encode_block(rows, field_count):
+    """Encode rows of (timestamp in ms, values) sorted by timestamp."""
+    timestamps = [timestamp for timestamp, _ in rows]
+    deltas = [later - earlier for earlier, later in zip(timestamps, timestamps[1:])]
+    payload = bytearray()
+    _write_varints(payload, [later - earlier for earlier, later in zip([0] + deltas, deltas)])
+    for field in range(field_count):
+        values = [row_values[field] for _, row_values in rows]
+        present = [value == value for value in values]
+        if all(present):
+            payload.append(_ALL_PRESENT)
+        elif not any(present):
+            payload.append(_ALL_MISSING)
+            continue
+        else:
+            payload.append(_BITMAP)
+            bitmap = bytearray((len(values) + 7) // 8)
+            for index, is_present in enumerate(present):
+                if is_present:
+                    bitmap[index >> 3] |= 1 << (index & 7)
+            payload += bitmap
+            values = [value for value, is_present in zip(values, present) if is_present]
+        decimals = _decimals(values)
+        payload.append(decimals)
+        if decimals == _RAW:
+            payload += struct.pack(f'<{len(values)}d', *values)
+            continue
+        scale = 10 ** decimals
+        scaled = [round(value * scale) for value in values]
+        _write_varints(payload, [later - earlier for earlier, later in zip([0] + scaled, scaled)])
+    header = _BLOCK_HEADER.pack(len(payload), len(rows), zlib.crc32(payload), timestamps[0], timestamps[-1])
+    return header + payload
+
+
+def _file_header(fields):
+    header = bytearray(_MAGIC)
+    header += bytes((_VERSION, len(fields)))
+    for field in fields:
+        name = field.encode()
+        header.append(len(name))
+        header += name
+    return bytes(header)
+
+
+def _parse_file_header(data):
+    """Get the field names and the offset of the first block."""
+    if len(data) < 6 or data[:4] != _MAGIC:
+        raise ValueError('Not an emeter series file')
+    if data[4] != _VERSION:
+        raise ValueError(f'Unsupported emeter series version {data[4]}')
+    fields = []
+    offset = 6
+    for _ in range(data[5]):
+        length = data[offset]
+        fields.append(bytes(data[offset + 1:offset + 1 + length]).decode())
+        offset += 1 + length
+    return tuple(fields), offset
+
+
+def _scan_blocks(data, offset):
+    """Index the complete blocks from `offset`.
+
+    Returns:
+        (first_ms, last_ms, rows, payload_offset, payload_length, crc) per
+        block, and the offset after the last complete block. A block cut
+        short by an interrupted write is left out.
+    """
+    blocks = []
+    while offset + _BLOCK_HEADER.size <= len(data):
+        length, rows, crc, first, last = _BLOCK_HEADER.unpack_from(data, offset)
+        payload = offset + _BLOCK_HEADER.size
+        if payload + length > len(data):
+            break
+        blocks.append((first, last, rows, payload, length, crc))
+        offset = payload + length
+    return blocks, offset
+
+
+class EMeterSeriesReader:
+    """Memory-mapped reader of one series file.
+
+    Args:
+        path: The file written by `EMeterSeriesWriter`.
+
+    Attributes:
+        fields: The names of the value fields.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = None
+        self._blocks = []
+        self._end = 0
+        try:
+            self.refresh()
+        except BaseException:
+            self.close()
+            raise
+
+    def refresh(self):
+        """Index the blocks appended since the file was opened."""
+        size = os.fstat(self._file.fileno()).st_size
+        if self._map is not None and size == len(self._map):
+            return
+        if self._map is not None:
+            self._map.close()
+        if size == 0:
+            raise ValueError('Not an emeter series file')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if not self._end:
+            self.fields, self._end = _parse_file_header(self._map)
+        blocks, self._end = _scan_blocks(self._map, self._end)
+        self._blocks.extend(blocks)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """The number of rows stored, including replaced ones."""
+        return sum(rows for _, _, rows, _, _, _ in self._blocks)
+
+    def time_range(self):
+        """Get the earliest and latest timestamps, or None if empty."""
+        if not self._blocks:
+            return None
+        first = min(block[0] for block in self._blocks)
+        last = max(block[1] for block in self._blocks)
+        return first / 1000, last / 1000
+
+    def _decode_block(self, block):
+        first, _, rows, offset, length, crc = block
+        data = self._map
+        if zlib.crc32(data[offset:offset + length]) != crc:
+            raise ValueError(f'Corrupt block at offset {offset} of {self.path}')
+        dods, offset = _read_varints(data, offset, rows - 1)
+        timestamps = list(accumulate(accumulate(dods), initial=first))
+        columns = []
+        for _ in self.fields:
+            presence = data[offset]
+            offset += 1
+            if presence == _ALL_MISSING:
+                columns.append([_NAN] * rows)
+                continue
+            if presence == _BITMAP:
+                bitmap = data[offset:offset + (rows + 7) // 8]
+                offset += len(bitmap)
+                indexes = [index for index in range(rows) if bitmap[index >> 3] >> (index & 7) & 1]
+            decimals = data[offset]
+            offset += 1
+            count = rows if presence == _ALL_PRESENT else len(indexes)
+            if decimals == _RAW:
+                values = struct.unpack_from(f'<{count}d', data, offset)
+                offset += 8 * count
+            else:
+                deltas, offset = _read_varints(data, offset, count)
+                scale = 10 ** decimals
+                values = [value / scale for value in accumulate(deltas)]
+            if presence == _BITMAP:
+                column = [_NAN] * rows
+                for index, value in zip(indexes, values):
+                    column[index] = value
+                values = column
+            columns.append(values)
+        return timestamps, columns
+
+    def read(self, start=None, end=None):
+        """Get the rows from `start` up to (not including) `end`.
+
+        Only the blocks overlapping the range are decoded.
+
+        Args:
+            start: The earliest timestamp in seconds, or None for the
+                   first row.
+            end: The timestamp to stop before, or None for the last.
+
+        Returns:
+            A dict of `array.array('d')`, in time order, with the keys
+            "timestamp" (in seconds) and the `fields`. Missing values
+            are NaN.
+        """
+        start_ms = None if start is None else round(start * 1000)
+        end_ms = None if end is None else round(end * 1000)
+        timestamps = []
+        columns = [[] for _ in self.fields]
+        in_order = True
+        for block in self._blocks:
+            first, last = block[0], block[1]
+            if (start_ms is not None and last < start_ms) or (end_ms is not None and first >= end_ms):
+                continue
+            if timestamps and first < timestamps[-1]:
+                in_order = False
+            block_timestamps, block_columns = self._decode_block(block)
+            timestamps += block_timestamps
+            for column, block_column in zip(columns, block_columns):
+                column += block_column
+
+        # Blocks written out of order are merged; the sort is stable, so
+        # of rows with the same timestamp the last written is kept
+        rows = range(len(timestamps))
+        if not in_order:
+            rows = sorted(rows, key=timestamps.__getitem__)
+        kept = [
+            row for row, following in zip(rows, list(rows[1:]) + [None])
+            if following is None or timestamps[row] != timestamps[following]
+        ]
+        timestamps = [timestamps[row] for row in kept]
+        first = 0 if start_ms is None else bisect_left(timestamps, start_ms)
+        last = len(timestamps) if end_ms is None else bisect_left(timestamps, end_ms)
+        kept = kept[first:last]
+
+        result = {'timestamp': array('d', (timestamp / 1000 for timestamp in timestamps[first:last]))}
+        for field, column in zip(self.fields, columns):
+            result[field] = array('d', (column[row] for row in kept))
+        return result
+
+
+class EMeterSeriesWriter:
+    """Appends rows to one series file.
+
+    The file is only opened to write a block, so many series can be
+    written at once without holding a file open for each.
+
+    Args:
+        path: The file to append to; it is created if needed.
+        fields: The names of the value fields. They must match those of
+                an existing file.
+        block_rows: The rows buffered before a block is written.
+    """
+
+    def __init__(self, path, fields, block_rows=4096):
+        if block_rows < 1:
+            raise ValueError('block_rows must be at least 1')
+        self.path = path
+        self.fields = tuple(fields)
+        self.block_rows = block_rows
+        self._pending = []
+        self._checked = False
+
+    def __len__(self):
+        """The number of rows not written yet."""
+        return len(self._pending)
+
+    def append(self, timestamp, values):
+        """Add a row.
+
+        Args:
+            timestamp: Seconds since the epoch.
+            values: A value per field; None or NaN for missing ones.
+        """
+        if len(values) != len(self.fields):
+            raise ValueError(f'Expected {len(self.fields)} values, got {len(values)}')
+        self._pending.append((
+            round(timestamp * 1000),
+            tuple(_NAN if value is None else value for value in values),
+        ))
+        if len(self._pending) >= self.block_rows:
+            self.flush()
+
+    def _check_file(self, file):
+        """Validate an existing file and cut off an interrupted block."""
+        size = os.fstat(file.fileno()).st_size
+        if not size:
+            file.write(_file_header(self.fields))
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            fields, offset = _parse_file_header(data)
+            _, end = _scan_blocks(data, offset)
+        if fields != self.fields:
+            raise ValueError(f'{self.path} has the fields {fields}, not {self.fields}')
+        if end < size:
+            file.truncate(end)
+        file.seek(end)
+
+    def flush(self):
+        """Write the buffered rows."""
+        if not self._pending:
+            return
+        rows = sorted(self._pending, key=lambda row: row[0])
+        self._pending = []
+        with open(self.path, 'r+b' if os.path.exists(self.path) else 'w+b') as file:
+            if not self._checked:
+                self._check_file(file)
+                self._checked = True
+            else:
+                file.seek(0, os.SEEK_END)
+            for offset in range(0, len(rows), self.block_rows):
+                file.write(_encode_block(rows[offset:offset + self.block_rows], len(self.fields)))
+
+
+def _escape_id(value):
+    """Quote a device or child id for a file name, including the "_"
+    that separates them, so `EMeterStore.keys` can split names again."""
+    return quote(value, safe='').replace('_', '%5F')
+
+
+def _day_timestamp(day):
+    return date_timestamp(day.year, day.month, day.day)
+
+
+def _timestamp_date(timestamp):
+    return date(1970, 1, 1) + timedelta(days=int(timestamp // 86400))
+
+
+class EMeterStore:
+    """A directory of series files, one per device and kind of data.
+
+    Args:
+        directory: The directory holding the files; it is created if
+                   needed.
+        block_rows: The rows buffered per series before a block is
+                    written.
+    """
+
+    def __init__(self, directory, block_rows=4096):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.block_rows = block_rows
+        self._writers = {}
+        # The stored stats of each day and month series, so unchanged
+        # stats fetched again are not appended
+        self._stats = {}
+
+    def _path(self, key, kind):
+        device_id, child_id = key
+        name = _escape_id(device_id)
+        if child_id is not None:
+            name = f'{name}_{_escape_id(child_id)}'
+        return os.path.join(self.directory, f'{name}.{kind}{_SUFFIX}')
+
+    def _writer(self, key, kind):
+        writer = self._writers.get((key, kind))
+        if writer is None:
+            writer = self._writers[(key, kind)] = EMeterSeriesWriter(
+                self._path(key, kind), _SERIES_FIELDS[kind], self.block_rows)
+        return writer
+
+    def _read(self, key, kind, start, end):
+        writer = self._writers.get((key, kind))
+        if writer is not None:
+            writer.flush()
+        path = self._path(key, kind)
+        if not os.path.exists(path):
+            return None
+        with EMeterSeriesReader(path) as reader:
+            return reader.read(start, end)
+
+    def keys(self, kind=REALTIME):
+        """Get the (device_id, child_id) keys with a series of a kind."""
+        self.flush()
+        suffix = f'.{kind}{_SUFFIX}'
+        keys = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(suffix):
+                device_id, _, child_id = name[:-len(suffix)].partition('_')
+                keys.append((unquote(device_id), unquote(child_id) if child_id else None))
+        return keys
+
+    def record(self, device, timestamp, reading):
+        """Add a realtime reading of a device.
+
+        Args:
+            device: The device or its (device_id, child_id) key.
+            timestamp: Seconds since the epoch.
+            reading: A `CurrentPower`, a decoded `get_realtime` response,
+                     or None for a failed reading.
+        """
+        self._writer(device_key(device), REALTIME).append(timestamp, reading_fields(reading))
+
+    def _record_stats(self, key, kind, stats):
+        known = self._stats.get((key, kind))
+        if known is None:
+            known = self._stats[(key, kind)] = {}
+            stored = self._read(key, kind, None, None)
+            if stored is not None:
+                known.update(zip(stored['timestamp'], stored['energy_wh']))
+        writer = self._writer(key, kind)
+        for timestamp, energy_wh in stats:
+            if energy_wh is not None and known.get(timestamp) != energy_wh:
+                known[timestamp] = energy_wh
+                writer.append(timestamp, (energy_wh,))
+
+    def record_days(self, device, days):
+        """Add the daily stats of a device.
+
+        Stats that are already stored unchanged are skipped.
+
+        Args:
+            device: The device or its (device_id, child_id) key.
+            days: `DayPowerSummary` objects or decoded `day_list` entries.
+        """
+        days = (DayPowerSummary(day) if isinstance(day, dict) else day for day in days)
+        self._record_stats(device_key(device), DAY, (
+            (date_timestamp(day.year, day.month, day.day), day.energy_wh) for day in days))
+
+    def record_months(self, device, months):
+        """Add the monthly stats of a device (see `record_days`).
+
+        Args:
+            device: The device or its (device_id, child_id) key.
+            months: `MonthPowerSummary` objects or decoded `month_list`
+                    entries.
+        """
+        months = (MonthPowerSummary(month) if isinstance(month, dict) else month for month in months)
+        self._record_stats(device_key(device), MONTH, (
+            (date_timestamp(month.year, month.month, 1), month.energy_wh) for month in months))
+
+    def realtime(self, device, start=None, end=None):
+        """Get the realtime readings of a device from `start` up to (not
+        including) `end`.
+
+        Returns:
+            The readings as returned by `EMeterSeriesReader.read`, with
+            the `RealtimePowerBuffer.FIELDS`, or None if there are none.
+        """
+        return self._read(device_key(device), REALTIME, start, end)
+
+    def days(self, device, start=None, end=None):
+        """Get the daily stats of a device.
+
+        Args:
+            start: The first date, or None for the earliest.
+            end: The last date, included, or None for the latest.
+
+        Returns:
+            A list of `DayPowerSummary` in date order.
+        """
+        stored = self._read(
+            device_key(device), DAY,
+            None if start is None else _day_timestamp(start),
+            None if end is None else _day_timestamp(end) + 1)
+        if stored is None:
+            return []
+        summaries = []
+        for timestamp, energy_wh in zip(stored['timestamp'], stored['energy_wh']):
+            day = _timestamp_date(timestamp)
+            summaries.append(DayPowerSummary(
+                {'year': day.year, 'month': day.month, 'day': day.day, 'energy_wh': energy_wh}))
+        return summaries
+
+    def months(self, device, start=None, end=None):
+        """Get the monthly stats of a device.
+
+        Args:
+            start: A date in the first month, or None for the earliest.
+            end: A date in the last month, included, or None for the
+                 latest.
+
+        Returns:
+            A list of `MonthPowerSummary` in date order.
+        """
+        stored = self._read(
+            device_key(device), MONTH,
+            None if start is None else date_timestamp(start.year, start.month, 1),
+            None if end is None else date_timestamp(end.year, end.month, 1) + 1)
+        if stored is None:
+            return []
+        summaries = []
+        for timestamp, energy_wh in zip(stored['timestamp'], stored['energy_wh']):
+            month = _timestamp_date(timestamp)
+            summaries.append(MonthPowerSummary(
+                {'year': month.year, 'month': month.month, 'energy_wh': energy_wh}))
+        return summaries
+
+    def load_history(self, history, start=None, end=None):
+        """Add the stored realtime readings to a `RealtimePowerHistory`,
+        e.g. to roll them up with `rollup_energy`."""
+        for key in self.keys(REALTIME):
+            readings = self._read(key, REALTIME, start, end)
+            fields = [readings[field] for field in RealtimePowerBuffer.FIELDS]
+            for timestamp, *values in zip(readings['timestamp'], *fields):
+                history.record(key, timestamp, dict(zip(RealtimePowerBuffer.FIELDS, values)))
+
+    def flush(self):
+        """Write the buffered rows of every series."""
+        for writer in self._writers.values():
+            writer.flush()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
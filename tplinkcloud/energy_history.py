@@ -0,0 +1,264 @@
+"""Energy totals over any range of days or months in constant time.
+
+`EnergyHistory` keeps, per device, the energy of each day and month
+together with its running total since the first one. The energy between
+two dates is then the difference of two running totals, whatever the
+length of the range:
+
+    energy = EnergyHistory()
+    for usage in await power_tools.get_devices_power_usage_day_range(None, date(2023, 1, 1)):
+        energy.add_days(usage, usage.data)
+    energy.energy_wh(device, date(2023, 3, 1), date(2023, 11, 30))
+    energy.group_energy_wh({'kitchen': kitchen_devices}, date(2023, 3, 1), date(2023, 3, 31))
+
+Stats can be added in any order and again later. Setting the latest day
+or month, the common case as the current day accrues, takes constant
+time; changing an earlier one updates the running totals after it.
+Days and months without stats count as no energy.
+
+Passed to the power tools as `energy_history`, it is kept up to date
+with every daily and monthly stat they fetch, and with the `total_wh`
+meter of realtime readings, which adds to the current day and month
+between stats.
+"""
+
+from array import array
+from datetime import date
+
+from .emeter_device import DayPowerSummary, MonthPowerSummary, as_date, device_key
+from .emeter_store import DAY, MONTH
+from .realtime_power_buffer import reading_fields
+
+
+def _month_index(value):
+    return value.year * 12 + value.month - 1
+
+
+class _PrefixSums:
+    """Energy of consecutive periods and the running total before each.
+
+    `cumulative[index]` is the energy of the periods before `index`, so
+    it has one more entry than `energy`.
+    """
+
+    __slots__ = ('first', 'energy', 'cumulative')
+
+    def __init__(self, first):
+        self.first = first
+        self.energy = array('d')
+        self.cumulative = array('d', [0.0])
+
+    def _index(self, period):
+        """Get the index of a period, adding empty periods up to it."""
+        index = period - self.first
+        if index < 0:
+            self.energy[0:0] = array('d', bytes(8 * -index))
+            self.cumulative[0:0] = array('d', bytes(8 * -index))
+            self.first = period
+            index = 0
+        elif index >= len(self.energy):
+            missing = index + 1 - len(self.energy)
+            self.energy.extend(array('d', bytes(8 * missing)))
+            self.cumulative.extend(array('d', [self.cumulative[-1]]) * missing)
+        return index
+
+    def set(self, period, energy_wh):
+        index = self._index(period)
+        change = energy_wh - self.energy[index]
+        if change:
+            self.energy[index] = energy_wh
+            cumulative = self.cumulative
+            for later in range(index + 1, len(cumulative)):
+                cumulative[later] += change
+
+    def add(self, period, energy_wh):
+        index = self._index(period)
+        self.set(period, self.energy[index] + energy_wh)
+
+    def total(self, first, last):
+        """Get the energy from period `first` to `last`, included."""
+        low = max(first - self.first, 0)
+        high = min(last - self.first + 1, len(self.energy))
+        if high <= low:
+            return 0.0
+        return self.cumulative[high] - self.cumulative[low]
+
+
+class _DeviceEnergy:
+
+    __slots__ = ('days', 'months', 'meter_wh')
+
+    def __init__(self):
+        self.days = None
+        self.months = None
+        # The last realtime total_wh reading
+        self.meter_wh = None
+
+
+class EnergyHistory:
+    """Daily and monthly energy of many devices, as prefix sums.
+
+    Devices are looked up by the device or by its (device_id, child_id)
+    key, like in `RealtimePowerHistory`.
+    """
+
+    def __init__(self):
+        self._devices = {}
+
+    def _device(self, device):
+        key = device_key(device)
+        energy = self._devices.get(key)
+        if energy is None:
+            energy = self._devices[key] = _DeviceEnergy()
+        return energy
+
+    def __contains__(self, device):
+        return device_key(device) in self._devices
+
+    def __iter__(self):
+        return iter(self._devices)
+
+    def __len__(self):
+        return len(self._devices)
+
+    @classmethod
+    def from_store(cls, store):
+        """Build the history from the daily and monthly stats kept in an
+        `EMeterStore`."""
+        history = cls()
+        for key in store.keys(DAY):
+            history.add_days(key, store.days(key))
+        for key in store.keys(MONTH):
+            history.add_months(key, store.months(key))
+        return history
+
+    def add_days(self, device, days):
+        """Set the energy of days of a device.
+
+        Args:
+            device: The device or its (device_id, child_id) key (a
+                    `DevicePowerUsage` works too).
+            days: `DayPowerSummary` objects or decoded `day_list` entries.
+                  Entries without energy are skipped.
+        """
+        energy = self._device(device)
+        for day in days:
+            if isinstance(day, dict):
+                day = DayPowerSummary(day)
+            if day.energy_wh is None:
+                continue
+            period = date(day.year, day.month, day.day).toordinal()
+            if energy.days is None:
+                energy.days = _PrefixSums(period)
+            energy.days.set(period, day.energy_wh)
+
+    def add_months(self, device, months):
+        """Set the energy of months of a device (see `add_days`).
+
+        Args:
+            device: The device or its (device_id, child_id) key.
+            months: `MonthPowerSummary` objects or decoded `month_list`
+                    entries.
+        """
+        energy = self._device(device)
+        for month in months:
+            if isinstance(month, dict):
+                month = MonthPowerSummary(month)
+            if month.energy_wh is None:
+                continue
+            period = _month_index(month)
+            if energy.months is None:
+                energy.months = _PrefixSums(period)
+            energy.months.set(period, month.energy_wh)
+
+    def add_realtime(self, device, timestamp, reading):
+        """Add the energy metered since a device's previous realtime
+        reading to the day and month of `timestamp`.
+
+        The first reading of a device only sets the meter. A meter that
+        went back (it was reset) also only sets it, so the energy since
+        the reset is counted from the next reading on. The next daily
+        and monthly stats replace the metered energy.
+
+        Args:
+            device: The device or its (device_id, child_id) key.
+            timestamp: Seconds since the epoch; the day is taken in the
+                       host's time zone.
+            reading: A `CurrentPower`, a decoded `get_realtime` response,
+                     or None for a failed reading.
+        """
+        meter_wh = reading_fields(reading)[3]
+        if meter_wh != meter_wh:
+            return
+        energy = self._device(device)
+        previous, energy.meter_wh = energy.meter_wh, meter_wh
+        if previous is None or meter_wh <= previous:
+            return
+        day = date.fromtimestamp(timestamp)
+        for attribute, period in (('days', day.toordinal()), ('months', _month_index(day))):
+            series = getattr(energy, attribute)
+            if series is None:
+                series = _PrefixSums(period)
+                setattr(energy, attribute, series)
+            series.add(period, meter_wh - previous)
+
+    def energy_wh(self, device, start, end, period=DAY):
+        """Get a device's energy over a range.
+
+        Args:
+            device: The device or its (device_id, child_id) key.
+            start: The first date (a `date` or `datetime`).
+            end: The last date, included.
+            period: `DAY` to sum the days from `start` to `end`, or
+                    `MONTH` to sum the months containing them.
+
+        Returns:
+            The energy in Wh, 0 for devices or ranges without stats.
+        """
+        energy = self._devices.get(device_key(device))
+        if energy is None:
+            return 0.0
+        start, end = as_date(start), as_date(end)
+        if period == DAY:
+            series, first, last = energy.days, start.toordinal(), end.toordinal()
+        elif period == MONTH:
+            series, first, last = energy.months, _month_index(start), _month_index(end)
+        else:
+            raise ValueError(f'Unknown period {period!r}')
+        if series is None:
+            return 0.0
+        return series.total(first, last)
+
+    def group_energy_wh(self, groups, start, end, period=DAY):
+        """Get the energy of groups of devices over a range.
+
+        Args:
+            groups: A dict of group names to iterables of devices or
+                    (device_id, child_id) keys.
+            start, end, period: As for `energy_wh`.
+
+        Returns:
+            A dict of group names to their total energy in Wh.
+        """
+        return {
+            name: sum(self.energy_wh(device, start, end, period) for device in devices)
+            for name, devices in groups.items()
+        }
+
+    def date_range(self, device, period=DAY):
+        """Get the first and last date with stats of a device.
+
+        For `MONTH`, the dates are the first days of the months.
+
+        Returns:
+            The two dates, or None if there are no stats.
+        """
+        energy = self._devices.get(device_key(device))
+        series = None if energy is None else getattr(energy, 'days' if period == DAY else 'months')
+        if series is None or not series.energy:
+            return None
+        last = series.first + len(series.energy) - 1
+        if period == DAY:
+            return date.fromordinal(series.first), date.fromordinal(last)
+        return (date(series.first // 12, series.first % 12 + 1, 1),
+                date(last // 12, last % 12 + 1, 1))
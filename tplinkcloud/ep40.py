@@ -2,10 +2,18 @@ import asyncio
 
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
-from .ep40_child import EP40Child, EP40ChildSysInfo
+from .ep40_child import EP40Child, EP40ChildSysInfo, EP40ChildSysInfoView
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class EP40SysInfo:
+class EP40SysInfo(Slotted):
+
+    __slots__ = (
+        'sw_ver', 'hw_ver', 'model', 'device_id', 'oem_id', 'hw_id', 'rssi',
+        'longitude_i', 'latitude_i', 'alias', 'status', 'mic_type', 'feature',
+        'mac', 'updating', 'led_off', 'children', 'child_num', 'err_code',
+    )
 
     def __init__(self, sys_info):
         self.sw_ver = sys_info.get('sw_ver')
@@ -30,6 +38,15 @@ class EP40SysInfo:
         self.err_code = sys_info.get('err_code')
 
 
+EP40SysInfoView = sys_info_view(
+    EP40SysInfo,
+    children=lambda sys_info: [
+        EP40ChildSysInfoView(child_info)
+        for child_info in sys_info.get('children')
+    ],
+)
+
+
 class EP40(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
@@ -50,12 +67,14 @@ class EP40(TPLinkDevice):
     def has_children(self):
         return True
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
         
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
         
+        if view:
+            return EP40SysInfoView(sys_info)
         return EP40SysInfo(sys_info)
 
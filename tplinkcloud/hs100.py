@@ -1,14 +1,25 @@
 from .device import TPLinkDevice
 from .device_type import TPLinkDeviceType
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class HS100Action:
+class HS100Action(Slotted):
+
+    __slots__ = ('type',)
 
     def __init__(self, action):
         self.type = action.get('type')
 
 
-class HS100SysInfo:
+class HS100SysInfo(Slotted):
+
+    __slots__ = (
+        'err_code', 'sw_ver', 'hw_ver', 'type', 'model', 'mac', 'device_id',
+        'hw_id', 'fw_id', 'oem_id', 'alias', 'dev_name', 'icon_hash',
+        'relay_state', 'on_time', 'active_mode', 'feature', 'updating', 'rssi',
+        'led_off', 'latitude', 'longitude',
+    )
 
     def __init__(self, sys_info):
         self.err_code = sys_info.get('err_code')
@@ -35,17 +46,22 @@ class HS100SysInfo:
         self.longitude = sys_info.get('longitude')
 
 
+HS100SysInfoView = sys_info_view(HS100SysInfo)
+
+
 class HS100(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
         super().__init__(client, device_id, device_info)
         self.model_type = TPLinkDeviceType.HS100
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
         
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
         
+        if view:
+            return HS100SysInfoView(sys_info)
         return HS100SysInfo(sys_info)
@@ -1,14 +1,25 @@
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class HS103Action:
+class HS103Action(Slotted):
+
+    __slots__ = ('action',)
 
     def __init__(self, action):
         self.action = action.get('action')
 
 
-class HS103SysInfo:
+class HS103SysInfo(Slotted):
+
+    __slots__ = (
+        'sw_ver', 'hw_ver', 'model', 'device_id', 'oem_id', 'hw_id', 'rssi',
+        'longitude_i', 'latitude_i', 'alias', 'status', 'mic_type', 'feature',
+        'mac', 'updating', 'led_off', 'relay_state', 'on_time', 'active_mode',
+        'icon_hash', 'dev_name', 'next_action', 'err_code',
+    )
 
     def __init__(self, sys_info):
         self.sw_ver = sys_info.get('sw_ver')
@@ -36,17 +47,25 @@ class HS103SysInfo:
         self.err_code = sys_info.get('err_code')
 
 
+HS103SysInfoView = sys_info_view(
+    HS103SysInfo,
+    next_action=lambda sys_info: HS103Action(sys_info.get('next_action')),
+)
+
+
 class HS103(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
         super().__init__(client, device_id, device_info)
         self.model_type = TPLinkDeviceType.HS103
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
         
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
         
+        if view:
+            return HS103SysInfoView(sys_info)
         return HS103SysInfo(sys_info)
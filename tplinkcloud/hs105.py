@@ -1,14 +1,25 @@
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class HS105Action:
+class HS105Action(Slotted):
+
+    __slots__ = ('action',)
 
     def __init__(self, action):
         self.action = action.get('action')
 
 
-class HS105SysInfo:
+class HS105SysInfo(Slotted):
+
+    __slots__ = (
+        'sw_ver', 'hw_ver', 'type', 'model', 'mac', 'dev_name', 'alias',
+        'relay_state', 'on_time', 'active_mode', 'feature', 'updating',
+        'icon_hash', 'rssi', 'led_off', 'longitude_i', 'latitude_i', 'hw_id',
+        'fw_id', 'device_id', 'oem_id', 'err_code', 'next_action',
+    )
 
     def __init__(self, sys_info):
         self.sw_ver = sys_info.get('sw_ver')
@@ -37,17 +48,29 @@ class HS105SysInfo:
         self.err_code = sys_info.get('err_code')
 
 
+def _next_action(sys_info):
+    # Only some firmware versions report a next action
+    if 'next_action' not in sys_info:
+        raise AttributeError('next_action')
+    return HS105Action(sys_info['next_action'])
+
+
+HS105SysInfoView = sys_info_view(HS105SysInfo, next_action=_next_action)
+
+
 class HS105(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
         super().__init__(client, device_id, device_info)
         self.model_type = TPLinkDeviceType.HS105
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
 
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
         
+        if view:
+            return HS105SysInfoView(sys_info)
         return HS105SysInfo(sys_info)
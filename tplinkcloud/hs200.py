@@ -1,14 +1,25 @@
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class HS200Action:
+class HS200Action(Slotted):
+
+    __slots__ = ('type',)
 
     def __init__(self, action):
         self.type = action.get('type')
 
 
-class HS200SysInfo:
+class HS200SysInfo(Slotted):
+
+    __slots__ = (
+        'sw_ver', 'hw_ver', 'model', 'device_id', 'oem_id', 'hw_id', 'rssi',
+        'longitude_i', 'latitude_i', 'alias', 'status', 'mic_type', 'feature',
+        'mac', 'updating', 'led_off', 'relay_state', 'on_time', 'active_mode',
+        'icon_hash', 'dev_name', 'next_action', 'err_code',
+    )
 
     def __init__(self, sys_info):
         self.sw_ver = sys_info.get('sw_ver')
@@ -36,17 +47,25 @@ class HS200SysInfo:
         self.err_code = sys_info.get('err_code')
 
 
+HS200SysInfoView = sys_info_view(
+    HS200SysInfo,
+    next_action=lambda sys_info: HS200Action(sys_info.get('next_action')),
+)
+
+
 class HS200(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
         super().__init__(client, device_id, device_info)
         self.model_type = TPLinkDeviceType.HS200
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
 
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
 
+        if view:
+            return HS200SysInfoView(sys_info)
         return HS200SysInfo(sys_info)
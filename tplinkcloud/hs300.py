@@ -2,10 +2,18 @@ import asyncio
 
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
-from .hs300_child import HS300Child, HS300ChildSysInfo
+from .hs300_child import HS300Child, HS300ChildSysInfo, HS300ChildSysInfoView
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class HS300SysInfo:
+class HS300SysInfo(Slotted):
+
+    __slots__ = (
+        'sw_ver', 'hw_ver', 'model', 'device_id', 'oem_id', 'hw_id', 'rssi',
+        'longitude_i', 'latitude_i', 'alias', 'status', 'mic_type', 'feature',
+        'mac', 'updating', 'led_off', 'children', 'child_num', 'err_code',
+    )
 
     def __init__(self, sys_info):
         self.sw_ver = sys_info.get('sw_ver')
@@ -30,6 +38,15 @@ class HS300SysInfo:
         self.err_code = sys_info.get('err_code')
 
 
+HS300SysInfoView = sys_info_view(
+    HS300SysInfo,
+    children=lambda sys_info: [
+        HS300ChildSysInfoView(child_info)
+        for child_info in sys_info.get('children')
+    ],
+)
+
+
 class HS300(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
@@ -50,11 +67,13 @@ class HS300(TPLinkDevice):
     def has_children(self):
         return True
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
         
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
         
+        if view:
+            return HS300SysInfoView(sys_info)
         return HS300SysInfo(sys_info)
@@ -1,5 +1,7 @@
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 # The KL42x/KL43x light strips do not support the smartbulb lighting
 # service (err_code -2001 'module not support'); they use the
@@ -8,7 +10,11 @@ from .device import TPLinkDevice
 _LIGHTING_SERVICE = 'smartlife.iot.lightStrip'
 
 
-class KL430LightState:
+class KL430LightState(Slotted):
+
+    __slots__ = (
+        'on_off', 'mode', 'hue', 'saturation', 'color_temp', 'brightness',
+    )
 
     def __init__(self, light_state):
         self.on_off = light_state.get('on_off')
@@ -19,7 +25,24 @@ class KL430LightState:
         self.brightness = light_state.get('brightness')
 
 
-class KL430SysInfo:
+# Shared by the sys info class and its view
+def _light_state(sys_info):
+    return KL430LightState(sys_info.get('light_state', {}))
+
+
+def _relay_state(sys_info):
+    # The strips have no relay; their on/off state is the light's
+    return sys_info.get('light_state', {}).get('on_off', 0)
+
+
+class KL430SysInfo(Slotted):
+
+    __slots__ = (
+        'sw_ver', 'hw_ver', 'model', 'device_id', 'oem_id', 'hw_id', 'rssi',
+        'longitude_i', 'latitude_i', 'alias', 'status', 'mic_type', 'feature',
+        'mac', 'updating', 'led_off', 'is_dimmable', 'is_color',
+        'is_variable_color_temp', 'light_state', 'relay_state', 'err_code',
+    )
 
     def __init__(self, sys_info):
         self.sw_ver = sys_info.get('sw_ver')
@@ -41,25 +64,30 @@ class KL430SysInfo:
         self.is_dimmable = sys_info.get('is_dimmable')
         self.is_color = sys_info.get('is_color')
         self.is_variable_color_temp = sys_info.get('is_variable_color_temp')
-        light_state = sys_info.get('light_state', {})
-        self.light_state = KL430LightState(light_state)
-        self.relay_state = light_state.get('on_off', 0)
+        self.light_state = _light_state(sys_info)
+        self.relay_state = _relay_state(sys_info)
         self.err_code = sys_info.get('err_code')
 
 
+KL430SysInfoView = sys_info_view(
+    KL430SysInfo, light_state=_light_state, relay_state=_relay_state)
+
+
 class KL430(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
         super().__init__(client, device_id, device_info)
         self.model_type = TPLinkDeviceType.KL430
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
 
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
 
+        if view:
+            return KL430SysInfoView(sys_info)
         return KL430SysInfo(sys_info)
 
     async def get_light_state(self):
@@ -104,13 +132,13 @@ class KL430(TPLinkDevice):
             on_off=1, color_temp=color_temp, brightness=brightness)
 
     async def is_on(self):
-        sys_info = await self.get_sys_info()
+        sys_info = await self._get_state_sys_info()
         if sys_info is None:
             return None
         return sys_info.light_state.on_off == 1
 
     async def is_off(self):
-        sys_info = await self.get_sys_info()
+        sys_info = await self._get_state_sys_info()
         if sys_info is None:
             return None
         return sys_info.light_state.on_off == 0
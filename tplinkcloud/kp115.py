@@ -1,24 +1,32 @@
 from .device_type import TPLinkDeviceType
 from .hs110 import HS110, HS110SysInfo
+from .sys_info_view import sys_info_view
 
 
 class KP115SysInfo(HS110SysInfo):
 
+    __slots__ = ()
+
     def __init__(self, sys_info):
         super().__init__(sys_info)
 
 
+KP115SysInfoView = sys_info_view(KP115SysInfo)
+
+
 class KP115(HS110):
 
     def __init__(self, client, device_id, device_info):
         super().__init__(client, device_id, device_info)
         self.model_type = TPLinkDeviceType.KP115
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
         
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
         
+        if view:
+            return KP115SysInfoView(sys_info)
         return KP115SysInfo(sys_info)
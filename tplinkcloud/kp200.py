@@ -1,9 +1,17 @@
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
-from .kp200_child import KP200Child, KP200ChildSysInfo
+from .kp200_child import KP200Child, KP200ChildSysInfo, KP200ChildSysInfoView
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class KP200SysInfo:
+class KP200SysInfo(Slotted):
+
+    __slots__ = (
+        'sw_ver', 'hw_ver', 'model', 'device_id', 'oem_id', 'hw_id', 'rssi',
+        'longitude_i', 'latitude_i', 'alias', 'status', 'mic_type', 'feature',
+        'mac', 'updating', 'led_off', 'children', 'child_num', 'err_code',
+    )
 
     def __init__(self, sys_info):
         self.sw_ver = sys_info.get('sw_ver')
@@ -28,6 +36,15 @@ class KP200SysInfo:
         self.err_code = sys_info.get('err_code')
 
 
+KP200SysInfoView = sys_info_view(
+    KP200SysInfo,
+    children=lambda sys_info: [
+        KP200ChildSysInfoView(child_info)
+        for child_info in sys_info.get('children')
+    ],
+)
+
+
 class KP200(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
@@ -47,11 +64,13 @@ class KP200(TPLinkDevice):
     def has_children(self):
         return True
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
 
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
 
+        if view:
+            return KP200SysInfoView(sys_info)
         return KP200SysInfo(sys_info)
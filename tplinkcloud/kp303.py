@@ -2,10 +2,18 @@ import asyncio
 
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
-from .kp303_child import KP303Child, KP303ChildSysInfo
+from .kp303_child import KP303Child, KP303ChildSysInfo, KP303ChildSysInfoView
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class KP303SysInfo:
+class KP303SysInfo(Slotted):
+
+    __slots__ = (
+        'sw_ver', 'hw_ver', 'model', 'device_id', 'oem_id', 'hw_id', 'rssi',
+        'longitude_i', 'latitude_i', 'alias', 'status', 'mic_type', 'feature',
+        'mac', 'updating', 'led_off', 'children', 'child_num', 'err_code',
+    )
 
     def __init__(self, sys_info):
         self.sw_ver = sys_info.get('sw_ver')
@@ -30,6 +38,15 @@ class KP303SysInfo:
         self.err_code = sys_info.get('err_code')
 
 
+KP303SysInfoView = sys_info_view(
+    KP303SysInfo,
+    children=lambda sys_info: [
+        KP303ChildSysInfoView(child_info)
+        for child_info in sys_info.get('children')
+    ],
+)
+
+
 class KP303(TPLinkDevice):
 
     def __init__(self, client, device_id, device_info):
@@ -50,12 +67,14 @@ class KP303(TPLinkDevice):
     def has_children(self):
         return True
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
         
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
         
+        if view:
+            return KP303SysInfoView(sys_info)
         return KP303SysInfo(sys_info)
 
@@ -1,15 +1,21 @@
 from .device_type import TPLinkDeviceType
 from .device import TPLinkDevice
+from .slotted import Slotted
+from .sys_info_view import sys_info_view
 
 
-class KP400ChildAction:
+class KP400ChildAction(Slotted):
+    __slots__ = ('type', 'schd_sec', 'action')
+
     def __init__(self, child_action):
         self.type = child_action.get('type')
         self.schd_sec = child_action.get('schd_sec')
         self.action = child_action.get('action')
 
 
-class KP400ChildSysInfo:
+class KP400ChildSysInfo(Slotted):
+
+    __slots__ = ('id', 'state', 'alias', 'on_time', 'next_action')
 
     def __init__(self, child_info):
         self.id = child_info.get('id')
@@ -19,6 +25,13 @@ class KP400ChildSysInfo:
         self.next_action = KP400ChildAction(child_info.get('next_action'))
 
 
+KP400ChildSysInfoView = sys_info_view(
+    KP400ChildSysInfo,
+    next_action=lambda child_info: KP400ChildAction(
+        child_info.get('next_action')),
+)
+
+
 class KP400Child(TPLinkDevice):
 
     def __init__(self, client, parent_device_id, child_device_id, device_info):
@@ -30,11 +43,13 @@ class KP400Child(TPLinkDevice):
         )
         self.model_type = TPLinkDeviceType.KP400CHILD
 
-    async def get_sys_info(self):
+    async def get_sys_info(self, view=False):
         sys_info = await self._get_sys_info()
 
         if not sys_info:
             print("Something went wrong with your request; please try again")
             return None
 
+        if view:
+            return KP400ChildSysInfoView(sys_info)
         return KP400ChildSysInfo(sys_info)
@@ -0,0 +1,277 @@
+"""Energy per time bucket from realtime power readings.
+
+Devices report energy per day at the finest. `rollup_energy` integrates
+the `power_mw` readings kept in a `RealtimePowerHistory` instead, with the
+trapezoidal rule, into fixed buckets aligned to the clock (one minute,
+15 minutes, an hour, ...), for every device at once:
+
+    rollup = rollup_energy(history, bucket=QUARTER_HOUR, start=time.time() - 86400)
+    rollup.energy_wh(device)          # Wh per bucket
+    rollup.group_energy_wh({'kitchen': kitchen_devices, 'office': office_devices})
+
+The power between two readings is interpolated linearly, and readings
+split across bucket boundaries exactly. With NumPy installed, the readings
+of many devices are integrated together in a few array operations; a day
+of 5 second readings of 3,000 devices rolls up in under a second.
+Without NumPy, the same is done with a loop per device.
+"""
+
+import math
+from array import array
+from itertools import chain
+
+from .emeter_device import device_key
+from .realtime_power_buffer import MWS_PER_WH, get_numpy
+
+MINUTE = 60
+QUARTER_HOUR = 15 * 60
+HOUR = 60 * 60
+
+# Readings integrated together per batch of devices. Batches this small
+# keep the NumPy temporaries in the CPU caches, which measured faster
+# than larger ones
+_BATCH_READINGS = 1 << 15
+
+
+class EnergyRollup:
+    """Energy of many devices per time bucket.
+
+    Attributes:
+        keys: The (device_id, child_id) key of each device.
+        start: The start of the first bucket, in seconds since the epoch.
+        bucket: The bucket length in seconds.
+        bucket_count: The number of buckets.
+    """
+
+    def __init__(self, keys, start, bucket, bucket_count, energy):
+        self.keys = keys
+        self.start = start
+        self.bucket = bucket
+        self.bucket_count = bucket_count
+        # Watt hours, one row of bucket_count per device
+        self._energy = energy
+        self._rows = {key: row for row, key in enumerate(keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _row(self, device):
+        row = self._rows[device_key(device)] * self.bucket_count
+        return self._energy[row:row + self.bucket_count]
+
+    def bucket_starts(self):
+        """Get the start of each bucket, in seconds since the epoch."""
+        return [self.start + index * self.bucket for index in range(self.bucket_count)]
+
+    def energy_wh(self, device):
+        """Get the energy per bucket of a device or (device_id, child_id) key."""
+        return self._row(device)
+
+    def total_wh(self, device):
+        """Get the energy of a device over all buckets."""
+        return float(sum(self._row(device)))
+
+    def group_energy_wh(self, groups):
+        """Get the energy per bucket of groups of devices.
+
+        Args:
+            groups: A dict of group names to iterables of devices or
+                    (device_id, child_id) keys. Devices without readings
+                    are skipped.
+
+        Returns:
+            A dict of group names to the summed energy per bucket.
+        """
+        numpy = get_numpy()
+        totals = {}
+        for name, devices in groups.items():
+            keys = [device_key(device) for device in devices]
+            rows = [self._rows[key] for key in keys if key in self._rows]
+            if numpy is not None:
+                totals[name] = self.to_numpy()[rows].sum(axis=0)
+                continue
+            total = array('d', bytes(8 * self.bucket_count))
+            for row in rows:
+                offset = row * self.bucket_count
+                for index in range(self.bucket_count):
+                    total[index] += self._energy[offset + index]
+            totals[name] = total
+        return totals
+
+    def to_numpy(self):
+        """Get the energy as a NumPy array of devices by buckets, sharing
+        the rollup's memory. Requires NumPy."""
+        import numpy
+
+        return numpy.asarray(memoryview(self._energy)).reshape(len(self.keys), self.bucket_count)
+
+
+def _integrate_numpy(numpy, series, edges, max_gap):
+    """Integrate the power of a batch of devices between bucket edges.
+
+    Args:
+        series: The timestamp memoryviews, power memoryviews and number
+                of readings of each device.
+        edges: The bucket edges, as a NumPy array.
+
+    Returns:
+        The indexes into `series` of the devices with at least two
+        readings, and their energy per bucket in mW s.
+    """
+    lengths = [length for _, _, length in series]
+    timestamps = numpy.concatenate([view for views, _, _ in series for view in views])
+    power = numpy.concatenate([view for _, views, _ in series for view in views], dtype=numpy.float64)
+    missing = numpy.isnan(power)
+    if missing.any():
+        kept = numpy.concatenate(([0], numpy.cumsum(~missing)))
+        ends = numpy.cumsum(lengths)
+        lengths = (kept[ends] - kept[ends - lengths]).tolist()
+        timestamps, power = timestamps[~missing], power[~missing]
+
+    # Twice the energy of each segment between consecutive readings. The
+    # segments joining one device's readings to the next device's are
+    # never summed below
+    duration = numpy.diff(timestamps)
+    segment_energy = power[1:] + power[:-1]
+    segment_energy *= duration
+    if max_gap is not None:
+        segment_energy[duration > max_gap] = 0
+
+    # The segment each edge falls in, clamped to the device's own
+    # segments, so edges outside its readings add nothing
+    rows = []
+    segments = []
+    offset = 0
+    for row, length in enumerate(lengths):
+        if length >= 2:
+            found = numpy.searchsorted(timestamps[offset:offset + length], edges, side='right')
+            found -= 1
+            numpy.clip(found, 0, length - 2, out=found)
+            found += offset
+            rows.append(row)
+            segments.append(found)
+        offset += length
+    if not rows:
+        return rows, numpy.zeros((0, len(edges) - 1))
+    segment = numpy.stack(segments)
+
+    # The whole segments between consecutive edges, plus the part of the
+    # later edge's segment before it, minus that of the earlier edge's
+    sums = numpy.add.reduceat(segment_energy, segment.ravel()).reshape(segment.shape)[:, :-1]
+    sums[segment[:, 1:] == segment[:, :-1]] = 0
+    # (in place where possible, as these arrays are as large as the
+    # rollup)
+    segment_duration = duration.take(segment)
+    elapsed = edges - timestamps.take(segment)
+    numpy.maximum(elapsed, 0, out=elapsed)
+    numpy.minimum(elapsed, segment_duration, out=elapsed)
+    slope = power.take(segment + 1)
+    start_power = power.take(segment)
+    slope -= start_power
+    numpy.divide(slope, segment_duration, out=slope, where=segment_duration > 0)
+    slope *= elapsed
+    partial = start_power
+    partial *= 2
+    partial += slope
+    partial *= elapsed
+    if max_gap is not None:
+        partial[segment_duration > max_gap] = 0
+    sums += numpy.diff(partial, axis=1)
+    sums /= 2
+    return rows, sums
+
+
+def _integrate_python(timestamps, power, edges, max_gap):
+    """Get the energy in mW s at each edge for one device."""
+    readings = [(timestamp, value) for timestamp, value in zip(timestamps, power) if value == value]
+    energy = []
+    cumulative = 0.0
+    index = 0
+    for edge in edges:
+        # Add the segments that end before the edge
+        while index + 1 < len(readings) and readings[index + 1][0] <= edge:
+            (start, start_power), (end, end_power) = readings[index], readings[index + 1]
+            if max_gap is None or end - start <= max_gap:
+                cumulative += (start_power + end_power) * (end - start) / 2
+            index += 1
+        partial = 0.0
+        if index + 1 < len(readings) and readings[index][0] < edge:
+            (start, start_power), (end, end_power) = readings[index], readings[index + 1]
+            if max_gap is None or end - start <= max_gap:
+                elapsed = edge - start
+                slope = (end_power - start_power) / (end - start)
+                partial = elapsed * (start_power + slope * elapsed / 2)
+        energy.append(cumulative + partial)
+    return energy
+
+
+def rollup_energy(history, bucket=HOUR, start=None, end=None, devices=None, max_gap=None):
+    """Integrate realtime power readings into energy per time bucket.
+
+    Args:
+        history: The `RealtimePowerHistory` holding the readings.
+        bucket: The bucket length in seconds, such as `MINUTE`,
+                `QUARTER_HOUR` or `HOUR`. Buckets are aligned to
+                multiples of it since the epoch.
+        start: The earliest time to include, or None for the oldest
+               reading.
+        end: The time to stop at, or None for the latest reading.
+        devices: The devices or (device_id, child_id) keys to include, or
+                 None for every device in the history.
+        max_gap: Seconds between readings beyond which no energy is
+                 counted, for devices that were offline; None always
+                 interpolates.
+
+    Returns:
+        An `EnergyRollup`.
+    """
+    if devices is None:
+        keys = list(history)
+    else:
+        keys = [key for key in map(device_key, devices) if key in history]
+    # The readings of each device to integrate, read in place
+    spans = [history[key].covering_views(start, end) for key in keys]
+
+    if start is None or end is None:
+        known = [
+            [view for view in timestamps if len(view)] for timestamps, _ in spans
+        ]
+        known = [views for views in known if views]
+        if start is None:
+            start = min((views[0][0] for views in known), default=0)
+        if end is None:
+            end = max((views[-1][-1] for views in known), default=start)
+    first_bucket = math.floor(start / bucket) * bucket
+    bucket_count = max(1, math.ceil((end - first_bucket) / bucket))
+    # Buckets are cut to start and end, so readings outside them are
+    # only used to interpolate up to them
+    edges = [max(start, first_bucket + index * bucket) for index in range(bucket_count + 1)]
+    edges[-1] = min(edges[-1], end)
+
+    numpy = get_numpy()
+    if numpy is None:
+        energy = array('d')
+        for timestamps, power in spans:
+            at_edges = _integrate_python(chain(*timestamps), chain(*power), edges, max_gap)
+            energy.extend(
+                (later - earlier) / MWS_PER_WH for earlier, later in zip(at_edges, at_edges[1:]))
+        return EnergyRollup(keys, first_bucket, bucket, bucket_count, energy)
+
+    # The buffers' memory is read in place, in batches of devices
+    energy = numpy.zeros((len(keys), bucket_count))
+    edges = numpy.asarray(edges, dtype=numpy.float64)
+    batch = []
+    first_row = 0
+    batch_readings = 0
+    for row, (timestamps, power) in enumerate(spans):
+        length = sum(len(view) for view in timestamps)
+        batch.append((timestamps, power, length))
+        batch_readings += length
+        if batch_readings >= _BATCH_READINGS or row == len(spans) - 1:
+            rows, batch_energy = _integrate_numpy(numpy, batch, edges, max_gap)
+            energy[[first_row + index for index in rows]] = batch_energy
+            batch = []
+            first_row = row + 1
+            batch_readings = 0
+    energy /= MWS_PER_WH
+    return EnergyRollup(keys, first_bucket, bucket, bucket_count, energy.ravel())
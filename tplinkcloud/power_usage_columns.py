@@ -0,0 +1,145 @@
+"""Fleet power usage as columns instead of per-reading objects.
+
+The power tools return a `DevicePowerUsage` per device holding
+`CurrentPower`, `DayPowerSummary` or `MonthPowerSummary` objects. With
+`columnar=True` they instead return one of the classes below: a row per
+reading, with each field in a contiguous `array.array` filled straight
+from the decoded device responses. Rows point at their device through
+`device_index`, an index into `device_ids`, `child_ids` and `names`.
+
+Fields a device did not report are NaN. `to_numpy` wraps the columns in
+NumPy arrays without copying them, when NumPy is installed:
+
+    columns = await power_tools.get_devices_power_usage_day('plug', columnar=True)
+    arrays = columns.to_numpy()
+    arrays['energy_wh'][arrays['device_index'] == 0].sum()
+
+Timestamps are seconds since the epoch. Daily and monthly rows are
+stamped with midnight UTC at the start of their day or month, since
+devices report calendar dates in their own time zone; NumPy exposes them
+as `datetime64[s]`. Realtime rows keep the fractions of a second, like
+`RealtimePowerBuffer`, and are exposed as `datetime64[us]`, the one
+column that `to_numpy` copies.
+"""
+
+from array import array
+from datetime import date
+
+from .emeter_device import REALTIME_KEYS, unit_field
+
+_NAN = float('nan')
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _field(data, key, short_key):
+    value = unit_field(data, key, short_key)
+    return _NAN if value is None else value
+
+
+def date_timestamp(year, month, day):
+    return (date(year, month, day).toordinal() - _EPOCH_ORDINAL) * 86400
+
+
+class PowerUsageColumns:
+    """Readings of many devices as one array per field.
+
+    Attributes:
+        device_ids: The device id of each device.
+        child_ids: The child id of each device (None for devices that
+                   are not outlets of a strip).
+        names: The alias of each device.
+        device_index: The device of each row, as an index into the
+                      lists above.
+        timestamp: Seconds since the epoch of each row.
+    """
+
+    # The columns besides device_index and timestamp, all float64
+    FIELDS = ()
+    # Whole seconds ('q') or seconds with fractions ('d')
+    TIMESTAMP_TYPECODE = 'q'
+
+    def __init__(self):
+        self.device_ids = []
+        self.child_ids = []
+        self.names = []
+        self.device_index = array('i')
+        self.timestamp = array(self.TIMESTAMP_TYPECODE)
+        for field in self.FIELDS:
+            setattr(self, field, array('d'))
+
+    def __len__(self):
+        return len(self.device_index)
+
+    def add_device(self, device):
+        """Add a device and get its index for `device_index`."""
+        self.device_ids.append(device.device_id)
+        self.child_ids.append(device.child_id)
+        self.names.append(device.get_alias())
+        return len(self.device_ids) - 1
+
+    def columns(self):
+        """Get the row columns by name."""
+        names = ('device_index', 'timestamp') + self.FIELDS
+        return {name: getattr(self, name) for name in names}
+
+    def to_numpy(self):
+        """Get the row columns as NumPy arrays sharing the columns' memory.
+
+        Timestamps are `datetime64[s]`, or a `datetime64[us]` copy for
+        timestamps with fractions of a second. Requires NumPy.
+        """
+        import numpy
+
+        arrays = {name: numpy.asarray(memoryview(column)) for name, column in self.columns().items()}
+        if self.TIMESTAMP_TYPECODE == 'd':
+            microseconds = numpy.round(arrays['timestamp'] * 1e6).astype(numpy.int64)
+            arrays['timestamp'] = microseconds.view('datetime64[us]')
+        else:
+            arrays['timestamp'] = arrays['timestamp'].view('datetime64[s]')
+        return arrays
+
+
+class RealtimePowerColumns(PowerUsageColumns):
+    """Realtime readings, one row per device.
+
+    Devices whose request failed have a row of NaN. `timestamp` is when
+    the response arrived.
+    """
+
+    FIELDS = ('power_mw', 'voltage_mv', 'current_ma', 'total_wh')
+    TIMESTAMP_TYPECODE = 'd'
+
+    def append(self, device_index, timestamp, realtime_data):
+        """Add a row from a decoded `get_realtime` response (or None)."""
+        self.device_index.append(device_index)
+        self.timestamp.append(timestamp)
+        if realtime_data is None:
+            realtime_data = {}
+        for key, short_key in REALTIME_KEYS:
+            getattr(self, key).append(_field(realtime_data, key, short_key))
+
+
+class DayPowerColumns(PowerUsageColumns):
+    """Daily energy, one row per device and day."""
+
+    FIELDS = ('energy_wh',)
+
+    def extend(self, device_index, day_list):
+        """Add rows from the decoded `day_list` entries of `get_daystat`."""
+        self.device_index.extend([device_index] * len(day_list))
+        self.timestamp.extend(
+            date_timestamp(day['year'], day['month'], day['day']) for day in day_list)
+        self.energy_wh.extend(_field(day, 'energy_wh', 'energy') for day in day_list)
+
+
+class MonthPowerColumns(PowerUsageColumns):
+    """Monthly energy, one row per device and month."""
+
+    FIELDS = ('energy_wh',)
+
+    def extend(self, device_index, month_list):
+        """Add rows from the decoded `month_list` entries of `get_monthstat`."""
+        self.device_index.extend([device_index] * len(month_list))
+        self.timestamp.extend(
+            date_timestamp(month['year'], month['month'], 1) for month in month_list)
+        self.energy_wh.extend(_field(month, 'energy_wh', 'energy') for month in month_list)
@@ -0,0 +1,303 @@
+"""Fixed-size history of realtime power readings.
+
+`RealtimePowerBuffer` keeps the latest readings of one device in
+preallocated arrays: timestamps as float64 seconds, the power, voltage
+and current as float32, and the cumulative `total_wh` meter as float64,
+which float32 would round to whole Wh or worse once it passes a few
+thousand kWh. That is 28 bytes per reading. Appending overwrites the
+oldest reading once the buffer is full. Windowed aggregates use NumPy
+when it is installed and plain loops over the arrays otherwise.
+
+`RealtimePowerHistory` holds a buffer per device. Passed to the power
+tools as `realtime_history`, it records every realtime reading they
+fetch:
+
+    history = RealtimePowerHistory(capacity=17280)  # 24 h every 5 s
+    power_tools = TPLinkDeviceManagerPowerTools(device_manager, realtime_history=history)
+    await power_tools.get_devices_power_usage_realtime(None)
+    history[device].energy_wh(start=time.time() - 3600)
+
+Readings are expected in time order; windows are found by binary search
+on the timestamps.
+"""
+
+from array import array
+
+from .emeter_device import REALTIME_KEYS, device_key, unit_field
+
+_NAN = float('nan')
+# Milliwatt seconds per watt hour
+MWS_PER_WH = 1000 * 3600
+
+_numpy = None
+
+
+def get_numpy():
+    """Get the numpy module, or None if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def reading_fields(reading):
+    """Get the buffer fields from a `CurrentPower` or decoded response."""
+    if reading is None:
+        return _NAN, _NAN, _NAN, _NAN
+    if isinstance(reading, dict):
+        values = []
+        for key, short_key in REALTIME_KEYS:
+            value = unit_field(reading, key, short_key)
+            values.append(_NAN if value is None else value)
+        return values
+    return tuple(
+        _NAN if value is None else value
+        for value in (reading.power_mw, reading.voltage_mv, reading.current_ma, reading.total_wh)
+    )
+
+
+class RealtimePowerBuffer:
+    """Ring buffer of one device's realtime readings.
+
+    Args:
+        capacity: The number of readings kept.
+    """
+
+    FIELDS = ('power_mw', 'voltage_mv', 'current_ma', 'total_wh')
+    # The array typecode of each field
+    TYPECODES = {'power_mw': 'f', 'voltage_mv': 'f', 'current_ma': 'f', 'total_wh': 'd'}
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity
+        self._timestamp = array('d', bytes(8 * capacity))
+        self._fields = {field: array(self.TYPECODES[field], [0]) * capacity for field in self.FIELDS}
+        self._columns = (self._timestamp, *self._fields.values())
+        # The physical index of the oldest reading, and how many there are
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, power_mw=_NAN, voltage_mv=_NAN, current_ma=_NAN, total_wh=_NAN):
+        """Add a reading, overwriting the oldest one if the buffer is full."""
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        for column, value in zip(self._columns, (timestamp, power_mw, voltage_mv, current_ma, total_wh)):
+            column[index] = value
+
+    def append_reading(self, timestamp, reading):
+        """Add a `CurrentPower`, a decoded `get_realtime` response, or None
+        (a failed reading, stored as NaN)."""
+        self.append(timestamp, *reading_fields(reading))
+
+    def _timestamp_at(self, position):
+        return self._timestamp[(self._start + position) % self.capacity]
+
+    def _bisect(self, timestamp):
+        """Get the position of the first reading at or after `timestamp`."""
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._timestamp_at(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _slice(self, column, first, last):
+        """Get readings `first` to `last` (positions, end exclusive) of a
+        column, in time order."""
+        begin = self._start + first
+        end = self._start + last
+        if end <= self.capacity:
+            return column[begin:end]
+        if begin >= self.capacity:
+            return column[begin - self.capacity:end - self.capacity]
+        return column[begin:] + column[:end - self.capacity]
+
+    def _views(self, column, first, last):
+        """Like `_slice`, but as memoryviews of the one or two contiguous
+        runs of the column, without copying."""
+        view = memoryview(column)
+        begin = self._start + first
+        end = self._start + last
+        if end <= self.capacity:
+            return [view[begin:end]]
+        if begin >= self.capacity:
+            return [view[begin - self.capacity:end - self.capacity]]
+        return [view[begin:], view[:end - self.capacity]]
+
+    def _positions(self, start, end):
+        first = 0 if start is None else self._bisect(start)
+        last = self._size if end is None else self._bisect(end)
+        return first, max(first, last)
+
+    def _covering_positions(self, start, end):
+        first, last = self._positions(start, end)
+        return max(0, first - 1), min(self._size, last + 1)
+
+    def window(self, start=None, end=None):
+        """Get the readings from `start` up to (not including) `end`.
+
+        Args:
+            start: The earliest timestamp, or None for the oldest reading.
+            end: The timestamp to stop before, or None for the latest.
+
+        Returns:
+            A dict of `array.array` copies, in time order, with the keys
+            "timestamp" and the `FIELDS`.
+        """
+        first, last = self._positions(start, end)
+        readings = {'timestamp': self._slice(self._timestamp, first, last)}
+        for field, column in self._fields.items():
+            readings[field] = self._slice(column, first, last)
+        return readings
+
+    def covering(self, start=None, end=None, field='power_mw'):
+        """Get the readings of one field around a window.
+
+        Unlike `window`, this includes the nearest reading on either side
+        of the window, so values can be interpolated up to its bounds.
+
+        Returns:
+            The timestamps and the field's values, as `array.array`
+            copies in time order.
+        """
+        first, last = self._covering_positions(start, end)
+        return self._slice(self._timestamp, first, last), self._slice(self._fields[field], first, last)
+
+    def covering_views(self, start=None, end=None, field='power_mw'):
+        """Like `covering`, but reading the buffer's memory in place.
+
+        Returns:
+            The timestamps and the field's values, each as a list of one
+            or two memoryviews, in time order. They see later appends, so
+            they should be used before the next one.
+        """
+        first, last = self._covering_positions(start, end)
+        return self._views(self._timestamp, first, last), self._views(self._fields[field], first, last)
+
+    def latest(self):
+        """Get the latest reading as a dict, or None if there is none."""
+        if not self._size:
+            return None
+        index = (self._start + self._size - 1) % self.capacity
+        reading = {'timestamp': self._timestamp[index]}
+        for field, column in self._fields.items():
+            reading[field] = column[index]
+        return reading
+
+    def _values(self, field, start, end):
+        first, last = self._positions(start, end)
+        return self._slice(self._fields[field], first, last)
+
+    def mean(self, field='power_mw', start=None, end=None):
+        """Get the mean of a field over a window, skipping NaN readings.
+
+        Returns:
+            The mean, or NaN if the window has no readings.
+        """
+        values = self._values(field, start, end)
+        numpy = get_numpy()
+        if numpy is not None:
+            values = numpy.asarray(memoryview(values), dtype=numpy.float64)
+            values = values[~numpy.isnan(values)]
+            return float(values.mean()) if len(values) else _NAN
+        values = [value for value in values if value == value]
+        return sum(values) / len(values) if values else _NAN
+
+    def max(self, field='power_mw', start=None, end=None):
+        """Get the maximum of a field over a window, skipping NaN readings.
+
+        Returns:
+            The maximum, or NaN if the window has no readings.
+        """
+        values = self._values(field, start, end)
+        numpy = get_numpy()
+        if numpy is not None:
+            values = numpy.asarray(memoryview(values), dtype=numpy.float64)
+            values = values[~numpy.isnan(values)]
+            return float(values.max()) if len(values) else _NAN
+        return max((value for value in values if value == value), default=_NAN)
+
+    def energy_wh(self, start=None, end=None):
+        """Integrate `power_mw` over a window with the trapezoidal rule.
+
+        Readings without a power value are skipped, so the power is
+        interpolated across them.
+
+        Returns:
+            The energy in watt hours (0 with fewer than two readings).
+        """
+        first, last = self._positions(start, end)
+        timestamps = self._slice(self._timestamp, first, last)
+        power = self._slice(self._fields['power_mw'], first, last)
+        numpy = get_numpy()
+        if numpy is not None:
+            timestamps = numpy.asarray(memoryview(timestamps))
+            power = numpy.asarray(memoryview(power), dtype=numpy.float64)
+            valid = ~numpy.isnan(power)
+            timestamps, power = timestamps[valid], power[valid]
+            if len(power) < 2:
+                return 0.0
+            return float(((power[1:] + power[:-1]) * numpy.diff(timestamps)).sum() / 2 / MWS_PER_WH)
+
+        total = 0.0
+        previous = None
+        for timestamp, value in zip(timestamps, power):
+            if value != value:
+                continue
+            if previous is not None:
+                total += (value + previous[1]) * (timestamp - previous[0])
+            previous = (timestamp, value)
+        return total / 2 / MWS_PER_WH
+
+
+class RealtimePowerHistory:
+    """Realtime power buffers of many devices.
+
+    Buffers are created on a device's first reading and looked up by the
+    device or by its (device_id, child_id) key.
+
+    Args:
+        capacity: The number of readings kept per device.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffers = {}
+
+    def record(self, device, timestamp, reading):
+        """Add a reading of a device (see `RealtimePowerBuffer.append_reading`)."""
+        key = device_key(device)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = RealtimePowerBuffer(self.capacity)
+        buffer.append_reading(timestamp, reading)
+
+    def __getitem__(self, device):
+        return self._buffers[device_key(device)]
+
+    def __contains__(self, device):
+        return device_key(device) in self._buffers
+
+    def __iter__(self):
+        return iter(self._buffers)
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def items(self):
+        """Get the (device_id, child_id) keys and buffers."""
+        return self._buffers.items()
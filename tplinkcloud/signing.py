@@ -18,7 +18,11 @@ The signature is sent via the X-Authorization header:
 import base64
 import hashlib
 import hmac
+import itertools
+import os
+import random
 import uuid
+from functools import lru_cache
 
 
 # App-level keys from Kasa Android APK (identify the app, not the user)
@@ -37,15 +41,109 @@ SECRET_KEY = KASA_SECRET_KEY
 SIGNING_TIMESTAMP = "9999999999"
 
 
-def compute_content_md5(body: str) -> str:
+_AUTHORIZATION_PREFIX = f"Timestamp={SIGNING_TIMESTAMP}, Nonce="
+_SIG_TIMESTAMP = f"\n{SIGNING_TIMESTAMP}\n".encode()
+
+
+class _NonceSource:
+    """UUID-shaped nonces without a urandom call per request.
+
+    Nonces share a random uuid4 prefix and end with a counter, so they
+    keep the uuid4 format and are unique within the process. The prefix
+    is redrawn in forked children so they do not repeat the parent's.
+    """
+
+    def __init__(self):
+        self.reseed()
+
+    def reseed(self):
+        self._prefix = str(uuid.uuid4())[:24]
+        self._counter = itertools.count(random.getrandbits(40))
+
+    def __call__(self) -> str:
+        return f"{self._prefix}{next(self._counter) & 0xFFFFFFFFFFFF:012x}"
+
+
+_next_nonce = _NonceSource()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_next_nonce.reseed)
+
+
+class Signer:
+    """Signs V2 API requests for one AccessKey/SecretKey pair.
+
+    The HMAC is keyed once and copied for each request, and bodies are
+    hashed as bytes, so a signer is cheap to reuse across requests. Use
+    `get_signer` to share signers between clients with the same keys.
+
+    Attributes:
+        access_key: The AccessKey sent in the X-Authorization header.
+    """
+
+    def __init__(self, access_key: str | None = None,
+                 secret_key: str | None = None):
+        self.access_key = access_key or ACCESS_KEY
+        self._hmac = hmac.new(
+            (secret_key or SECRET_KEY).encode(), digestmod=hashlib.sha1
+        )
+        self._authorization_suffix = f", AccessKey={self.access_key}, Signature="
+        self._url_paths = {}
+
+    def content_md5(self, body: str | bytes) -> str:
+        """Compute the Base64-encoded MD5 hash of the request body."""
+        if isinstance(body, str):
+            body = body.encode()
+        return base64.b64encode(hashlib.md5(body).digest()).decode()
+
+    def authorization(self, content_md5: str, url_path: str) -> str:
+        """Build the X-Authorization header for a body's Content-MD5.
+
+        A new nonce is drawn on every call.
+        """
+        path = self._url_paths.get(url_path)
+        if path is None:
+            path = self._url_paths[url_path] = f"\n{url_path}".encode()
+
+        nonce = _next_nonce()
+        mac = self._hmac.copy()
+        mac.update(content_md5.encode())
+        mac.update(_SIG_TIMESTAMP)
+        mac.update(nonce.encode())
+        mac.update(path)
+
+        return (
+            f"{_AUTHORIZATION_PREFIX}{nonce}"
+            f"{self._authorization_suffix}{mac.hexdigest()}"
+        )
+
+    def sign(self, body: str | bytes, url_path: str) -> tuple[str, str]:
+        """Compute the (content_md5, x_authorization_header) for a request."""
+        content_md5 = self.content_md5(body)
+        return content_md5, self.authorization(content_md5, url_path)
+
+    def get_headers(self, body: str | bytes, url_path: str) -> dict[str, str]:
+        """Get the Content-MD5 and X-Authorization headers for a request."""
+        content_md5 = self.content_md5(body)
+        return {
+            "Content-MD5": content_md5,
+            "X-Authorization": self.authorization(content_md5, url_path),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_signer(access_key: str | None = None,
+               secret_key: str | None = None) -> Signer:
+    """Get the shared `Signer` for a key pair (defaults to the Kasa keys)."""
+    return Signer(access_key, secret_key)
+
+
+def compute_content_md5(body: str | bytes) -> str:
     """Compute Base64-encoded MD5 hash of the request body."""
-    return base64.b64encode(
-        hashlib.md5(body.encode()).digest()
-    ).decode()
+    return get_signer().content_md5(body)
 
 
 def compute_signature(
-    body_json: str,
+    body_json: str | bytes,
     url_path: str,
     access_key: str | None = None,
     secret_key: str | None = None,
@@ -62,31 +160,11 @@ def compute_signature(
     Returns:
         A tuple of (content_md5, x_authorization_header).
     """
-    ak = access_key or ACCESS_KEY
-    sk = secret_key or SECRET_KEY
-
-    content_md5 = compute_content_md5(body_json)
-    nonce = str(uuid.uuid4())
-
-    sig_string = f"{content_md5}\n{SIGNING_TIMESTAMP}\n{nonce}\n{url_path}"
-    signature = hmac.new(
-        sk.encode(),
-        sig_string.encode(),
-        hashlib.sha1,
-    ).hexdigest()
-
-    authorization = (
-        f"Timestamp={SIGNING_TIMESTAMP}, "
-        f"Nonce={nonce}, "
-        f"AccessKey={ak}, "
-        f"Signature={signature}"
-    )
-
-    return content_md5, authorization
+    return get_signer(access_key, secret_key).sign(body_json, url_path)
 
 
 def get_signing_headers(
-    body_json: str,
+    body_json: str | bytes,
     url_path: str,
     access_key: str | None = None,
     secret_key: str | None = None,
@@ -102,10 +180,4 @@ def get_signing_headers(
     Returns:
         Dict with Content-MD5 and X-Authorization headers.
     """
-    content_md5, authorization = compute_signature(
-        body_json, url_path, access_key, secret_key
-    )
-    return {
-        "Content-MD5": content_md5,
-        "X-Authorization": authorization,
-    }
+    return get_signer(access_key, secret_key).get_headers(body_json, url_path)
@@ -0,0 +1,39 @@
+"""A fake TP-Link cloud for tests and load tests.
+
+`FakeCloud` answers the account, device list and passthrough requests
+of the library for a fleet of virtual devices of every supported model,
+with configurable latency and error injection. It can be used
+in-process through its transport:
+
+    cloud = FakeCloud(fleet_size=1000, latency=lognormal_latency(0.08))
+    device_manager = await TPLinkDeviceManager(
+        cloud.username, cloud.password, transport=cloud.transport())
+
+or served over HTTP with `FakeCloudServer` or
+`python -m tplinkcloud.simulator`.
+"""
+
+from .cloud import (
+    FakeCloud,
+    FakeCloudTransport,
+    constant_latency,
+    lognormal_latency,
+    uniform_latency,
+)
+from .devices import SimulatedClock, VirtualDevice, make_fleet
+from .models import MODELS, SimulatedModel
+from .server import FakeCloudServer
+
+__all__ = [
+    'FakeCloud',
+    'FakeCloudServer',
+    'FakeCloudTransport',
+    'MODELS',
+    'SimulatedClock',
+    'SimulatedModel',
+    'VirtualDevice',
+    'constant_latency',
+    'lognormal_latency',
+    'make_fleet',
+    'uniform_latency',
+]
@@ -0,0 +1,51 @@
+"""Run a fake TP-Link cloud on a local port.
+
+    python -m tplinkcloud.simulator --fleet-size 1000 --latency-ms 80
+"""
+
+import argparse
+import asyncio
+
+from . import FakeCloud, FakeCloudServer, lognormal_latency
+
+
+async def _serve(cloud, host, port):
+    async with FakeCloudServer(cloud, host, port) as url:
+        print(f'Serving {len(cloud.devices)} devices at {url} '
+              f'(username {cloud.username!r}, password {cloud.password!r})')
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fleet-size', type=int, default=None,
+                        help='number of devices (default: one of each model)')
+    parser.add_argument('--username', default='user@example.com')
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help='median per-request latency (log-normal)')
+    parser.add_argument('--offline-rate', type=float, default=0.0)
+    parser.add_argument('--http-error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    latency = lognormal_latency(args.latency_ms / 1000) if args.latency_ms else None
+    cloud = FakeCloud(
+        fleet_size=args.fleet_size,
+        username=args.username,
+        password=args.password,
+        latency=latency,
+        offline_rate=args.offline_rate,
+        http_error_rate=args.http_error_rate,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(_serve(cloud, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
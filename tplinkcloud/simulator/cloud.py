@@ -0,0 +1,314 @@
+"""An in-process fake of the TP-Link cloud.
+
+`FakeCloud` implements the endpoints used by the library: the V2
+account endpoints (`getAccountStatusAndUrl`, `login`, `refreshToken`),
+`getDeviceList` and the Kasa and Tapo passthroughs. Requests for the
+Kasa and Tapo clouds are told apart by their `appName` query parameter,
+as the real service does by host.
+
+Like the real service, requests must carry valid `Content-MD5` and
+`X-Authorization` headers signed with the app's keys. Requests that are
+not are answered with HTTP 403; the real service's response to a bad
+signature is not documented, so that status is specific to the
+simulator.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import random
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from ..signing import (
+    KASA_ACCESS_KEY,
+    KASA_SECRET_KEY,
+    TAPO_ACCESS_KEY,
+    TAPO_SECRET_KEY,
+    Signer,
+)
+from ..transport import TPLinkHTTPResponse, TPLinkInMemoryTransport, TPLinkRequest
+from .devices import make_fleet
+
+_TAPO_APP_NAME = 'TP-Link_Tapo_Android'
+
+_ERR_DEVICE_OFFLINE = -20571
+_ERR_DEVICE_NOT_FOUND = -20580
+_ERR_WRONG_CREDENTIALS = -20601
+_ERR_TOKEN_EXPIRED = -20651
+_ERR_REFRESH_TOKEN_EXPIRED = -20655
+_ERR_MISSING_PARAMETER = -20104
+
+_SIGNERS = {
+    'kasa': Signer(KASA_ACCESS_KEY, KASA_SECRET_KEY),
+    'tapo': Signer(TAPO_ACCESS_KEY, TAPO_SECRET_KEY),
+}
+_SECRET_KEYS = {'kasa': KASA_SECRET_KEY, 'tapo': TAPO_SECRET_KEY}
+
+
+def constant_latency(seconds):
+    """Latency of the same number of seconds for every request."""
+    return lambda rng: seconds
+
+
+def uniform_latency(low, high):
+    """Latency drawn uniformly between `low` and `high` seconds."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median, sigma=0.5):
+    """Latency drawn from a log-normal distribution.
+
+    Args:
+        median: The median latency in seconds.
+        sigma: The standard deviation of the latency's logarithm; larger
+               values give a longer tail.
+    """
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def _error(error_code, msg):
+    return {'error_code': error_code, 'msg': msg}
+
+
+def _forbidden(reason):
+    return TPLinkHTTPResponse(403, 'Forbidden', reason.encode())
+
+
+class FakeCloud:
+    """A fake TP-Link cloud serving a fleet of virtual devices.
+
+    Args:
+        devices: The `VirtualDevice`s registered to the account. Defaults
+                 to `make_fleet(fleet_size, models, seed, clock)`.
+        fleet_size: The number of devices to create when `devices` is not
+                    given. Defaults to one of each model.
+        models: The models to create devices of when `devices` is not
+                given. Defaults to all models.
+        username: The account's email address.
+        password: The account's password.
+        latency: Delay added to every request: seconds as a number, or a
+                 callable taking a `random.Random` and returning seconds
+                 (see `uniform_latency` and `lognormal_latency`).
+        offline_rate: Probability of a passthrough failing with the
+                      cloud's device offline error.
+        http_error_rate: Probability of any request failing with
+                         HTTP 503.
+        verify_signatures: Whether to reject requests that are not
+                           correctly signed.
+        seed: Seed for the latency and error draws.
+        clock: The clock of the devices created when `devices` is not
+               given (see `VirtualDevice`).
+
+    Attributes:
+        devices: The devices by id.
+        request_counts: Number of requests received per endpoint.
+    """
+
+    def __init__(self, devices=None, fleet_size=None, models=None, username='user@example.com',
+                 password='password', latency=None, offline_rate=0.0,
+                 http_error_rate=0.0, verify_signatures=True, seed=None, clock=None):
+        if devices is None:
+            devices = make_fleet(fleet_size, models, seed=seed or 0, clock=clock)
+        self.devices = {device.device_id: device for device in devices}
+        self.username = username
+        self.password = password
+        if latency is not None and not callable(latency):
+            latency = constant_latency(latency)
+        self.latency = latency
+        self.offline_rate = offline_rate
+        self.http_error_rate = http_error_rate
+        self.verify_signatures = verify_signatures
+        self.request_counts = Counter()
+        self._rng = random.Random(seed)
+        self._tokens = {}
+        self._refresh_tokens = {}
+        self._token_ids = itertools.count(1)
+
+    def __repr__(self):
+        return f'<FakeCloud with {len(self.devices)} devices>'
+
+    def transport(self):
+        """Get a transport that sends requests to this cloud in-process."""
+        return FakeCloudTransport(self)
+
+    def expire_tokens(self):
+        """Expire every issued auth token; refresh tokens stay valid."""
+        self._tokens.clear()
+
+    def expire_refresh_tokens(self):
+        """Expire every issued auth and refresh token."""
+        self._tokens.clear()
+        self._refresh_tokens.clear()
+
+    def handle(self, request):
+        """Answer a `TPLinkRequest`, blocking for the request's latency.
+
+        Returns:
+            The response body as a dict, or a `TPLinkHTTPResponse` for
+            HTTP errors.
+        """
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return self._handle(request)
+
+    async def handle_async(self, request):
+        """Answer a `TPLinkRequest`, sleeping for the request's latency."""
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._handle(request)
+
+    def _delay(self):
+        return self.latency(self._rng) if self.latency is not None else 0
+
+    def _handle(self, request):
+        if self.http_error_rate and self._rng.random() < self.http_error_rate:
+            self.request_counts['http_error'] += 1
+            return TPLinkHTTPResponse(503, 'Service Unavailable', b'')
+
+        params = request.params or {}
+        cloud_type = 'tapo' if params.get('appName') == _TAPO_APP_NAME else 'kasa'
+        if self.verify_signatures:
+            rejection = self._verify_signature(request, cloud_type)
+            if rejection is not None:
+                self.request_counts['rejected'] += 1
+                return rejection
+
+        try:
+            body = request.json()
+        except ValueError:
+            return TPLinkHTTPResponse(400, 'Bad Request', b'Malformed JSON body')
+
+        path = request.path
+        if path == '/':
+            method = body.get('method')
+            self.request_counts[method] += 1
+            if method == 'getDeviceList':
+                return self._get_device_list(request, cloud_type)
+            if method == 'passthrough':
+                return self._passthrough(request, cloud_type, body.get('params') or {})
+            return _error(_ERR_MISSING_PARAMETER, f'Unknown method {method!r}')
+
+        endpoint = path.rsplit('/', 1)[-1]
+        self.request_counts[endpoint] += 1
+        if path == '/api/v2/account/getAccountStatusAndUrl':
+            return {'error_code': 0, 'result': {
+                'accountStatus': 0, 'appServerUrl': _base_url(request.url)}}
+        if path == '/api/v2/account/login':
+            return self._login(body, cloud_type)
+        if path == '/api/v2/account/refreshToken':
+            return self._refresh_token(body, cloud_type)
+        if path == '/api/v2/common/passthrough':
+            return self._passthrough(request, cloud_type, body)
+        return TPLinkHTTPResponse(404, 'Not Found', b'')
+
+    def _verify_signature(self, request, cloud_type):
+        headers = request.headers
+        content_md5 = headers.get('Content-MD5')
+        authorization = headers.get('X-Authorization')
+        if not content_md5 or not authorization:
+            return _forbidden('Missing signature headers')
+        if content_md5 != _SIGNERS[cloud_type].content_md5(request.body):
+            return _forbidden('Content-MD5 does not match the body')
+
+        fields = dict(
+            field.strip().split('=', 1) for field in authorization.split(',')
+            if '=' in field
+        )
+        if fields.get('AccessKey') != _SIGNERS[cloud_type].access_key:
+            return _forbidden('Unknown AccessKey')
+        message = '\n'.join((
+            content_md5, fields.get('Timestamp', ''), fields.get('Nonce', ''), request.path,
+        ))
+        expected = hmac.new(
+            _SECRET_KEYS[cloud_type].encode(), message.encode(), hashlib.sha1
+        ).hexdigest()
+        if not hmac.compare_digest(expected, fields.get('Signature', '')):
+            return _forbidden('Signature does not match')
+        return None
+
+    def _issue_tokens(self, cloud_type):
+        token_id = next(self._token_ids)
+        token = f'{cloud_type}-token-{token_id}'
+        refresh_token = f'{cloud_type}-refresh-{token_id}'
+        self._tokens[token] = cloud_type
+        self._refresh_tokens[refresh_token] = cloud_type
+        return token, refresh_token
+
+    def _login(self, body, cloud_type):
+        if (body.get('cloudUserName') != self.username
+                or body.get('cloudPassword') != self.password):
+            return _error(_ERR_WRONG_CREDENTIALS, 'Incorrect email or password')
+        token, refresh_token = self._issue_tokens(cloud_type)
+        return {'error_code': 0, 'result': {
+            'accountId': '123456',
+            'regTime': '2017-11-27 23:21:40',
+            'countryCode': 'US',
+            'email': self.username,
+            'token': token,
+            'refreshToken': refresh_token,
+        }}
+
+    def _refresh_token(self, body, cloud_type):
+        if self._refresh_tokens.pop(body.get('refreshToken'), None) != cloud_type:
+            return _error(_ERR_REFRESH_TOKEN_EXPIRED, 'Refresh token expired')
+        token, refresh_token = self._issue_tokens(cloud_type)
+        return {'error_code': 0, 'result': {'token': token, 'refreshToken': refresh_token}}
+
+    def _authorized(self, request, cloud_type):
+        return self._tokens.get((request.params or {}).get('token')) == cloud_type
+
+    def _get_device_list(self, request, cloud_type):
+        if not self._authorized(request, cloud_type):
+            return _error(_ERR_TOKEN_EXPIRED, 'Token expired')
+        app_server_url = _base_url(request.url)
+        return {'error_code': 0, 'result': {'deviceList': [
+            device.device_list_entry(app_server_url)
+            for device in self.devices.values()
+            if device.cloud_type == cloud_type
+        ]}}
+
+    def _passthrough(self, request, cloud_type, params):
+        if not self._authorized(request, cloud_type):
+            return _error(_ERR_TOKEN_EXPIRED, 'Token expired')
+        device = self.devices.get(params.get('deviceId'))
+        if device is None or device.cloud_type != cloud_type:
+            return _error(_ERR_DEVICE_NOT_FOUND, 'Device not found')
+        if not device.online or (
+                self.offline_rate and self._rng.random() < self.offline_rate):
+            self.request_counts['offline'] += 1
+            return _error(_ERR_DEVICE_OFFLINE, 'Device is offline')
+        try:
+            request_data = json.loads(params['requestData'])
+        except (KeyError, TypeError, ValueError):
+            return _error(_ERR_MISSING_PARAMETER, 'Parameter requestData is invalid')
+        response_data = device.handle(request_data)
+        return {'error_code': 0, 'result': {'responseData': json.dumps(response_data)}}
+
+
+def _base_url(url):
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+class FakeCloudTransport(TPLinkInMemoryTransport):
+    """Transport that sends requests to a `FakeCloud` in-process.
+
+    Synchronous requests block for the cloud's latency; awaited requests
+    sleep on the event loop.
+    """
+
+    def __init__(self, cloud):
+        super().__init__(cloud.handle)
+        self.cloud = cloud
+
+    async def post_async(self, url, data, params, headers, timeout):
+        response = await self.cloud.handle_async(TPLinkRequest(url, params, headers, data))
+        return self._to_response(response)
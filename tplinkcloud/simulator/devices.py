@@ -0,0 +1,594 @@
+"""Virtual devices answering passthrough requests.
+
+A `VirtualDevice` answers the `requestData` of a passthrough the way the
+device would: with a response for every module and method in the
+request, `err_code` -1 for modules the model does not have and -2 for
+methods it does not support.
+
+Devices keep state. Relays are switched by `set_relay_state` (for the
+whole strip, or the outlets in the request's `context`), outlets with an
+energy meter accrue energy and runtime while switched on, schedule rules
+persist through `add_rule`, `edit_rule` and `delete_rule`, and light
+strips keep their light state. Time is read from a clock that can be
+replaced, e.g. by a `SimulatedClock` to fast-forward soak tests.
+
+Energy and runtime statistics for days before a device was created are
+generated from its id, so a device always reports the same history; from
+its creation onwards they are the energy it accrued.
+"""
+
+import calendar
+import hashlib
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+from .models import MODELS
+
+_LIGHTING_SERVICE = 'smartlife.iot.lightStrip'
+
+_MODULE_NOT_SUPPORTED = {'err_code': -1, 'err_msg': 'module not support'}
+_METHOD_NOT_SUPPORTED = {'err_code': -2, 'err_msg': 'member not support'}
+
+_LIGHT_STATE_KEYS = ('on_off', 'mode', 'hue', 'saturation', 'color_temp', 'brightness')
+
+
+def _hex_id(seed, length=40):
+    digest = hashlib.sha1(seed.encode()).hexdigest().upper()
+    return (digest * (length // len(digest) + 1))[:length]
+
+
+class _DeviceError(Exception):
+
+    def __init__(self, err_code, err_msg):
+        self.err_code = err_code
+        self.err_msg = err_msg
+        super().__init__(err_msg)
+
+
+class SimulatedClock:
+    """A clock that only moves when advanced.
+
+    Pass it as the `clock` of a `FakeCloud` or `make_fleet` to control
+    the time devices accrue energy over.
+
+    Args:
+        start: The initial time, in seconds since the epoch. Defaults to
+               the current time.
+    """
+
+    def __init__(self, start=None):
+        self.now = time.time() if start is None else start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        """Move the clock forward by `seconds`."""
+        self.now += seconds
+
+
+class _Outlet:
+    """A relay: a plug or light, or one outlet of a power strip."""
+
+    __slots__ = (
+        'id', 'alias', 'relay_state', 'switched_at', 'power_mw', 'voltage_mv',
+        'total_wh', 'energy_wh', 'runtime_min', 'updated_at', 'rules',
+    )
+
+    def __init__(self, outlet_id, alias, rng, now, emeter):
+        self.id = outlet_id
+        self.alias = alias
+        self.relay_state = int(rng.random() < 0.5)
+        self.switched_at = now - rng.randrange(1, 86400)
+        self.power_mw = rng.randrange(1000, 1500000) if emeter else 0
+        self.voltage_mv = rng.randrange(118000, 122000)
+        self.total_wh = float(rng.randrange(1000, 1000000))
+        # Accrued energy and runtime by (year, month, day)
+        self.energy_wh = {}
+        self.runtime_min = {}
+        self.updated_at = now
+        self.rules = []
+
+    def accrue(self, now):
+        """Add the energy and runtime since the last update."""
+        start = self.updated_at
+        self.updated_at = max(start, now)
+        if not self.relay_state or now <= start:
+            return
+        while start < now:
+            day = datetime.fromtimestamp(start)
+            midnight = (day + timedelta(days=1)).replace(
+                hour=0, minute=0, second=0, microsecond=0).timestamp()
+            end = min(now, midnight)
+            key = (day.year, day.month, day.day)
+            seconds = end - start
+            energy = self.power_mw * seconds / 3600000
+            self.energy_wh[key] = self.energy_wh.get(key, 0.0) + energy
+            self.runtime_min[key] = self.runtime_min.get(key, 0.0) + seconds / 60
+            self.total_wh += energy
+            start = end
+
+    def switch(self, state, now):
+        self.accrue(now)
+        state = int(bool(state))
+        if state != self.relay_state:
+            self.relay_state = state
+            self.switched_at = now
+
+    def on_time(self, now):
+        return int(now - self.switched_at) if self.relay_state else 0
+
+
+class VirtualDevice:
+    """A device registered to a `FakeCloud` account.
+
+    Args:
+        model: A model in `MODELS` (e.g. "HS300(US)"), with or without the
+               region suffix.
+        device_id: The device id. Derived from `alias` if not given.
+        alias: The device name. Defaults to the model and a number
+               derived from the id.
+        online: Whether the device answers passthrough requests.
+        clock: Callable returning the current time in seconds since the
+               epoch. Defaults to `time.time`.
+
+    Attributes:
+        spec: The `SimulatedModel` of the device.
+        device_id: The device id.
+        alias: The device name.
+        online: Whether the device answers passthrough requests.
+        child_ids: The ids of the outlets of a power strip.
+        light_state: The light state of a light strip (None otherwise).
+        led_off: Whether the status LED is switched off.
+    """
+
+    def __init__(self, model, device_id=None, alias=None, online=True, clock=None):
+        self.spec = _find_model(model)
+        self.device_id = device_id or _hex_id(f'{self.spec.model}:{alias}')
+        self.alias = alias or f'{self.spec.model.split("(")[0]} {self.device_id[-4:]}'
+        self.online = online
+        self.led_off = 0
+        self._clock = clock or time.time
+        now = self._clock()
+        self._created = datetime.fromtimestamp(now).date()
+        self._rule_ids = itertools.count(1)
+        self._history_days = {}
+        self._history_totals = {}
+
+        emeter = self.spec.emeter
+        if self.spec.children:
+            self.child_ids = [
+                f'{self.device_id}{index:02d}' for index in range(self.spec.children)
+            ]
+            self._outlets = [
+                _Outlet(child_id, f'{self.alias} Plug {index + 1}',
+                        self._rng('outlet', child_id), now, emeter)
+                for index, child_id in enumerate(self.child_ids)
+            ]
+        else:
+            self.child_ids = []
+            self._outlets = [_Outlet(None, self.alias, self._rng('outlet'), now, emeter)]
+        self._outlets_by_id = {outlet.id: outlet for outlet in self._outlets}
+
+        self.light_state = None
+        if self.spec.kind == 'light':
+            self.light_state = {
+                'on_off': self._outlets[0].relay_state,
+                'mode': 'normal',
+                'hue': 0,
+                'saturation': 0,
+                'color_temp': 2700,
+                'brightness': 50,
+            }
+        self._methods = self._build_methods()
+
+    @property
+    def cloud_type(self):
+        return self.spec.cloud_type
+
+    def __repr__(self):
+        return f'<VirtualDevice {self.spec.model} {self.alias!r}>'
+
+    def is_on(self, child_id=None):
+        """Get the relay state of the device or one of its outlets."""
+        return bool(self._outlets_by_id[child_id].relay_state)
+
+    def device_list_entry(self, app_server_url):
+        """Get the `getDeviceList` entry of the device."""
+        spec = self.spec
+        return {
+            'deviceType': spec.device_type,
+            'role': 0,
+            'fwVer': spec.sw_ver,
+            'appServerUrl': app_server_url,
+            'deviceRegion': 'us-east-1',
+            'deviceId': self.device_id,
+            'deviceName': spec.device_name,
+            'deviceHwVer': spec.hw_ver,
+            'alias': self.alias,
+            'deviceMac': self._mac().replace(':', ''),
+            'oemId': _hex_id(f'oem:{spec.model}', 32),
+            'deviceModel': spec.model,
+            'hwId': _hex_id(f'hw:{spec.model}', 32),
+            'fwId': '0' * 32,
+            'isSameRegion': True,
+            'status': 1 if self.online else 0,
+        }
+
+    def handle(self, request_data):
+        """Answer the decoded `requestData` of a passthrough.
+
+        Returns:
+            The response data as a dict.
+        """
+        context = request_data.get('context') or {}
+        child_ids = context.get('child_ids')
+        outlets = self._outlets
+        if child_ids:
+            outlets = [self._outlets_by_id.get(child_id) for child_id in child_ids]
+            if None in outlets:
+                outlets = None
+
+        response = {}
+        for module, methods in request_data.items():
+            if module == 'context':
+                continue
+            handlers = self._methods.get(module)
+            if handlers is None or not isinstance(methods, dict):
+                response[module] = dict(_MODULE_NOT_SUPPORTED)
+                continue
+            module_response = response[module] = {}
+            for method, params in methods.items():
+                handler = handlers.get(method)
+                if handler is None:
+                    module_response[method] = dict(_METHOD_NOT_SUPPORTED)
+                    continue
+                try:
+                    if outlets is None:
+                        raise _DeviceError(-14, 'entry not exist')
+                    result = handler(params or {}, outlets)
+                except _DeviceError as e:
+                    result = {'err_code': e.err_code, 'err_msg': e.err_msg}
+                else:
+                    result['err_code'] = 0
+                module_response[method] = result
+        return response
+
+    def _build_methods(self):
+        methods = {
+            'system': {
+                'get_sysinfo': self._get_sysinfo,
+                'set_relay_state': self._set_relay_state,
+                'set_dev_alias': self._set_dev_alias,
+                'set_led_off': self._set_led_off,
+            },
+            'set_led_off': {'off': self._set_led_off},
+            'netif': {'get_stainfo': self._get_stainfo},
+            'time': {
+                'get_time': self._get_time,
+                'get_timezone': self._get_timezone,
+            },
+            'schedule': {
+                'get_rules': self._get_rules,
+                'add_rule': self._add_rule,
+                'edit_rule': self._edit_rule,
+                'delete_rule': self._delete_rule,
+                'delete_all_rules': self._delete_all_rules,
+                'get_daystat': self._get_runtime_daystat,
+                'get_monthstat': self._get_runtime_monthstat,
+            },
+        }
+        if self.spec.emeter:
+            methods['emeter'] = {
+                'get_realtime': self._get_realtime,
+                'get_daystat': self._get_energy_daystat,
+                'get_monthstat': self._get_energy_monthstat,
+            }
+        if self.spec.kind == 'light':
+            del methods['system']['set_relay_state']
+            methods[_LIGHTING_SERVICE] = {
+                'get_light_state': self._get_light_state,
+                'set_light_state': self._set_light_state,
+            }
+        return methods
+
+    def _mac(self):
+        digits = _hex_id(f'mac:{self.device_id}', 12)
+        return ':'.join(digits[index:index + 2] for index in range(0, 12, 2))
+
+    def _rng(self, *key):
+        return random.Random(':'.join(map(str, (self.device_id, *key))))
+
+    def _rssi(self):
+        return -self._rng('rssi').randrange(30, 80)
+
+    def _get_sysinfo(self, params, outlets):
+        spec = self.spec
+        now = self._clock()
+        outlet = self._outlets[0]
+        if spec.kind == 'tapo':
+            return {
+                'sw_ver': spec.sw_ver,
+                'hw_ver': spec.hw_ver,
+                'model': spec.model,
+                'deviceId': self.device_id,
+                'alias': self.alias,
+                'relay_state': outlet.relay_state,
+                'on_time': outlet.on_time(now),
+                'feature': spec.feature,
+                'rssi': self._rssi(),
+            }
+
+        sys_info = {
+            'sw_ver': spec.sw_ver,
+            'hw_ver': spec.hw_ver,
+            'model': spec.model,
+            'deviceId': self.device_id,
+            'oemId': _hex_id(f'oem:{spec.model}', 32),
+            'hwId': _hex_id(f'hw:{spec.model}', 32),
+            'rssi': self._rssi(),
+            'longitude_i': 1140579,
+            'latitude_i': 225431,
+            'alias': self.alias,
+            'status': 'new',
+            'mic_type': spec.mic_type,
+            'feature': spec.feature,
+            'mac': self._mac(),
+            'updating': 0,
+            'led_off': self.led_off,
+        }
+        if spec.kind == 'light':
+            sys_info.update(
+                is_dimmable=1,
+                is_color=1,
+                is_variable_color_temp=1,
+                light_state=dict(self.light_state),
+            )
+        elif spec.kind == 'strip':
+            sys_info.update(
+                children=[{
+                    'id': child.id,
+                    'state': child.relay_state,
+                    'alias': child.alias,
+                    'on_time': child.on_time(now),
+                    'next_action': {'type': -1, 'schd_sec': None, 'action': None},
+                } for child in self._outlets],
+                child_num=spec.children,
+            )
+        else:
+            sys_info.update(
+                relay_state=outlet.relay_state,
+                on_time=outlet.on_time(now),
+                active_mode='none',
+                icon_hash='',
+                dev_name=spec.device_name,
+                next_action={'type': -1},
+            )
+        return sys_info
+
+    def _set_relay_state(self, params, outlets):
+        if 'state' not in params:
+            raise _DeviceError(-3, 'invalid argument')
+        now = self._clock()
+        for outlet in outlets:
+            outlet.switch(params['state'], now)
+        return {}
+
+    def _set_dev_alias(self, params, outlets):
+        alias = params.get('alias')
+        if not isinstance(alias, str):
+            raise _DeviceError(-3, 'invalid argument')
+        if self.child_ids and len(outlets) == 1:
+            outlets[0].alias = alias
+        else:
+            self.alias = self._outlets[0].alias = alias
+        return {}
+
+    def _set_led_off(self, params, outlets):
+        self.led_off = int(bool(params.get('off')))
+        return {}
+
+    def _get_light_state(self, params, outlets):
+        return dict(self.light_state)
+
+    def _set_light_state(self, params, outlets):
+        for key in _LIGHT_STATE_KEYS:
+            if key in params:
+                self.light_state[key] = params[key]
+        if 'on_off' in params:
+            self._outlets[0].switch(params['on_off'], self._clock())
+        return dict(self.light_state)
+
+    def _get_stainfo(self, params, outlets):
+        return {'ssid': 'My WiFi Network', 'key_type': 3, 'rssi': self._rssi()}
+
+    def _get_time(self, params, outlets):
+        now = datetime.fromtimestamp(self._clock())
+        return {'year': now.year, 'month': now.month, 'mday': now.day,
+                'hour': now.hour, 'min': now.minute, 'sec': now.second}
+
+    def _get_timezone(self, params, outlets):
+        return {'index': 6}
+
+    def _get_rules(self, params, outlets):
+        return {'enable': 1, 'rule_list': [dict(rule) for rule in outlets[0].rules]}
+
+    def _add_rule(self, params, outlets):
+        rule_id = _hex_id(f'rule:{self.device_id}:{next(self._rule_ids)}', 32)
+        outlets[0].rules.append({**params, 'id': rule_id})
+        return {'id': rule_id}
+
+    def _find_rule(self, rules, rule_id):
+        for index, rule in enumerate(rules):
+            if rule['id'] == rule_id:
+                return index
+        raise _DeviceError(-14, 'entry not exist')
+
+    def _edit_rule(self, params, outlets):
+        rules = outlets[0].rules
+        rules[self._find_rule(rules, params.get('id'))] = dict(params)
+        return {}
+
+    def _delete_rule(self, params, outlets):
+        rules = outlets[0].rules
+        del rules[self._find_rule(rules, params.get('id'))]
+        return {}
+
+    def _delete_all_rules(self, params, outlets):
+        outlets[0].rules.clear()
+        return {}
+
+    def _get_realtime(self, params, outlets):
+        now = self._clock()
+        power_mw = voltage_mv = 0
+        total_wh = 0.0
+        for outlet in outlets:
+            outlet.accrue(now)
+            power_mw += outlet.power_mw if outlet.relay_state else 0
+            voltage_mv = outlet.voltage_mv
+            total_wh += outlet.total_wh
+        return {
+            'voltage_mv': voltage_mv,
+            'current_ma': power_mw * 1000 // voltage_mv,
+            'power_mw': power_mw,
+            'total_wh': int(total_wh),
+        }
+
+    def _generate_history(self, outlet, kind, year, month):
+        """Generated daily values for days before the device was created.
+
+        The history starts on January 1st of the year before.
+        """
+        created = self._created
+        if not created.year - 1 <= year <= created.year or (
+                year == created.year and month > created.month):
+            return {}
+        days = calendar.monthrange(year, month)[1]
+        if year == created.year and month == created.month:
+            days = created.day - 1
+        rng = random.Random(f'{self.device_id}:{outlet.id}:{kind}:{year}:{month}')
+        scale = outlet.power_mw * 24 // 1000 + 1 if kind == 'energy_wh' else 1441
+        return {day: rng.randrange(scale) for day in range(1, days + 1)}
+
+    def _history(self, outlet, kind, year, month):
+        key = (outlet.id, kind, year, month)
+        values = self._history_days.get(key)
+        if values is None:
+            values = self._history_days[key] = self._generate_history(
+                outlet, kind, year, month)
+        return values
+
+    def _history_total(self, outlet, kind, year, month):
+        # Only the totals are kept for month statistics, so a year of
+        # history costs a few integers per outlet
+        key = (outlet.id, kind, year, month)
+        if key in self._history_totals:
+            return self._history_totals[key]
+        values = self._history_days.get(key)
+        if values is None:
+            values = self._generate_history(outlet, kind, year, month)
+        total = self._history_totals[key] = sum(values.values()) if values else None
+        return total
+
+    def _day_values(self, outlets, kind, year, month):
+        now = self._clock()
+        totals = {}
+        for outlet in outlets:
+            outlet.accrue(now)
+            for day, value in self._history(outlet, kind, year, month).items():
+                totals[day] = totals.get(day, 0) + value
+            accrued = outlet.energy_wh if kind == 'energy_wh' else outlet.runtime_min
+            for (accrued_year, accrued_month, day), value in accrued.items():
+                if accrued_year == year and accrued_month == month:
+                    totals[day] = totals.get(day, 0) + value
+        return [
+            {'year': year, 'month': month, 'day': day, kind: int(totals[day])}
+            for day in sorted(totals)
+        ]
+
+    def _month_values(self, outlets, kind, year):
+        now = self._clock()
+        totals = {}
+        for outlet in outlets:
+            outlet.accrue(now)
+            for month in range(1, 13):
+                total = self._history_total(outlet, kind, year, month)
+                if total is not None:
+                    totals[month] = totals.get(month, 0) + total
+            accrued = outlet.energy_wh if kind == 'energy_wh' else outlet.runtime_min
+            for (accrued_year, month, _), value in accrued.items():
+                if accrued_year == year:
+                    totals[month] = totals.get(month, 0) + value
+        return [
+            {'year': year, 'month': month, kind: int(totals[month])}
+            for month in sorted(totals)
+        ]
+
+    def _year_month(self, params, month=True):
+        try:
+            year = int(params['year'])
+            if not month:
+                return year, None
+            month = int(params['month'])
+        except (KeyError, TypeError, ValueError):
+            raise _DeviceError(-3, 'invalid argument')
+        if not 1 <= month <= 12:
+            raise _DeviceError(-3, 'invalid argument')
+        return year, month
+
+    def _get_energy_daystat(self, params, outlets):
+        year, month = self._year_month(params)
+        return {'day_list': self._day_values(outlets, 'energy_wh', year, month)}
+
+    def _get_energy_monthstat(self, params, outlets):
+        year, _ = self._year_month(params, month=False)
+        return {'month_list': self._month_values(outlets, 'energy_wh', year)}
+
+    def _get_runtime_daystat(self, params, outlets):
+        year, month = self._year_month(params)
+        return {'day_list': self._day_values(outlets, 'time', year, month)}
+
+    def _get_runtime_monthstat(self, params, outlets):
+        year, _ = self._year_month(params, month=False)
+        return {'month_list': self._month_values(outlets, 'time', year)}
+
+
+def _find_model(model):
+    spec = MODELS.get(model)
+    if spec is None:
+        for name, candidate in MODELS.items():
+            if name.split('(')[0] == model:
+                return candidate
+        raise ValueError(
+            f"Unknown model {model!r}, expected one of {', '.join(MODELS)}"
+        )
+    return spec
+
+
+def make_fleet(size=None, models=None, seed=0, clock=None):
+    """Create virtual devices for a `FakeCloud`.
+
+    Args:
+        size: The number of devices. Defaults to one of each model.
+        models: The models to draw devices from. Defaults to all models.
+        seed: Seed for the choice of models and the device ids, so the same
+              arguments create the same fleet.
+        clock: The devices' clock (see `VirtualDevice`).
+
+    Returns:
+        A list of `VirtualDevice`.
+    """
+    models = list(models or MODELS)
+    if size is None:
+        size = len(models)
+    rng = random.Random(seed)
+    fleet = []
+    for index in range(size):
+        model = models[index] if index < len(models) else rng.choice(models)
+        device_id = _hex_id(f'{seed}:{index}:{model}')
+        fleet.append(VirtualDevice(model, device_id=device_id,
+                                   alias=f'{model.split("(")[0]} {index + 1}',
+                                   clock=clock))
+    return fleet
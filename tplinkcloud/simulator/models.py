@@ -0,0 +1,103 @@
+"""Device models known to the simulator.
+
+The fields mirror the `getDeviceList` entries and `get_sysinfo`
+responses recorded under `tests/wiremock/__files`.
+"""
+
+
+class SimulatedModel:
+    """Static description of a device model.
+
+    Attributes:
+        model: The model reported by the device (e.g. "HS300(US)").
+        cloud_type: "kasa" or "tapo".
+        device_type: The `deviceType` of the device list entry.
+        device_name: The `deviceName` of the device list entry.
+        hw_ver: The hardware version.
+        sw_ver: The firmware version.
+        kind: "plug", "strip" (outlets addressed as children), "light"
+              (light strips controlled through the lighting service) or
+              "tapo".
+        children: The number of outlets of a strip.
+        emeter: Whether the device (or each outlet) has an energy meter.
+    """
+
+    __slots__ = (
+        'model',
+        'cloud_type',
+        'device_type',
+        'device_name',
+        'hw_ver',
+        'sw_ver',
+        'kind',
+        'children',
+        'emeter',
+    )
+
+    def __init__(self, model, device_type, device_name, hw_ver, sw_ver,
+                 kind='plug', children=0, emeter=False, cloud_type='kasa'):
+        self.model = model
+        self.cloud_type = cloud_type
+        self.device_type = device_type
+        self.device_name = device_name
+        self.hw_ver = hw_ver
+        self.sw_ver = sw_ver
+        self.kind = kind
+        self.children = children
+        self.emeter = emeter
+
+    @property
+    def mic_type(self):
+        return self.device_type
+
+    @property
+    def feature(self):
+        if self.kind == 'light':
+            return ''
+        return 'TIM:ENE' if self.emeter else 'TIM'
+
+    def __repr__(self):
+        return f'<SimulatedModel {self.model}>'
+
+
+_PLUG = 'IOT.SMARTPLUGSWITCH'
+_BULB = 'IOT.SMARTBULB'
+
+MODELS = {
+    spec.model: spec for spec in (
+        SimulatedModel('HS100(US)', _PLUG, 'Wi-Fi Smart Plug', '1.0',
+                       '1.2.6 Build 200727 Rel.121701'),
+        SimulatedModel('HS103(US)', _PLUG, 'Smart Wi-Fi Plug Lite', '2.1',
+                       '1.1.3 Build 200804 Rel.095135'),
+        SimulatedModel('HS105(US)', _PLUG, 'Smart Wi-Fi Plug Mini', '1.0',
+                       '1.5.6 Build 191114 Rel.104204'),
+        SimulatedModel('HS110(US)', _PLUG, 'Wi-Fi Smart Plug With Energy Monitoring', '1.0',
+                       '1.2.6 Build 200727 Rel.121701', emeter=True),
+        SimulatedModel('HS200(US)', _PLUG, 'Smart Wi-Fi Light Switch', '3.0',
+                       '1.0.10 Build 210121 Rel.084339'),
+        SimulatedModel('HS300(US)', _PLUG, 'Wi-Fi Smart Power Strip', '1.0',
+                       '1.0.19 Build 200224 Rel.090814', kind='strip', children=6, emeter=True),
+        SimulatedModel('KL420L5(US)', _BULB, 'Kasa Smart LED Light Strip', '1.0',
+                       '1.0.11 Build 210929 Rel.084339', kind='light'),
+        SimulatedModel('KL430(US)', _BULB, 'Kasa Smart Light Strip, Multicolor', '2.0',
+                       '1.0.8 Build 210121 Rel.084339', kind='light'),
+        SimulatedModel('KP115(US)', _PLUG, 'Smart Wi-Fi Plug Slim with Energy Monitoring', '1.0',
+                       '1.0.16 Build 210205 Rel.163735', emeter=True),
+        SimulatedModel('KP125(US)', _PLUG, 'Smart Wi-Fi Plug Mini with Energy Monitoring', '1.0',
+                       '1.0.6 Build 210928 Rel.185924', emeter=True),
+        SimulatedModel('KP200(US)', _PLUG, 'Smart Wi-Fi Outdoor Plug', '1.0',
+                       '1.0.3 Build 210121 Rel.084339', kind='strip', children=2),
+        SimulatedModel('KP303(US)', _PLUG, 'Kasa Smart Wi-Fi Power Strip', '1.0',
+                       '1.0.4 Build 210428 Rel.135415', kind='strip', children=3),
+        SimulatedModel('KP400(US)', _PLUG, 'Smart Wi-Fi Outdoor Plug', '1.0',
+                       '1.0.5 Build 210121 Rel.084339', kind='strip', children=2),
+        SimulatedModel('EP40(US)', _PLUG, 'Kasa Smart Wi-Fi Outdoor Plug', '1.0',
+                       '1.0.2 Build 210715 Rel.105347', kind='strip', children=2),
+        SimulatedModel('P100', 'SMART.TAPOPLUG', 'Tapo Mini Smart Wi-Fi Plug', '1.0',
+                       '1.3.0 Build 230425 Rel.163532', kind='tapo', cloud_type='tapo'),
+        SimulatedModel('P110', 'SMART.TAPOPLUG', 'Tapo Mini Smart Wi-Fi Plug with Energy Monitoring',
+                       '1.0', '1.2.1 Build 230425 Rel.163532', kind='tapo', cloud_type='tapo'),
+        SimulatedModel('L530', 'SMART.TAPOBULB', 'Tapo Smart Wi-Fi Light Bulb, Multicolor', '2.0',
+                       '1.1.0 Build 230602 Rel.145203', kind='tapo', cloud_type='tapo'),
+    )
+}
@@ -0,0 +1,117 @@
+"""Serve a `FakeCloud` over HTTP with aiohttp.
+
+For load tests that should include real sockets and HTTP parsing, or
+for clients in other processes. The library logs in with blocking
+requests, so a server used by a device manager in the same process
+runs on its own event loop in a background thread:
+
+    with FakeCloudServer(cloud) as url:
+        device_manager = await TPLinkDeviceManager(
+            username, password, tplink_cloud_api_host=url)
+
+`async with FakeCloudServer(cloud)` serves from the running event loop
+instead, for clients that only make awaited requests.
+"""
+
+import asyncio
+import json
+import threading
+
+from ..transport import TPLinkHTTPResponse, TPLinkRequest
+
+
+class FakeCloudServer:
+    """An HTTP server answering requests with a `FakeCloud`.
+
+    The device list points devices at the URL the server was reached
+    on, so passthroughs are sent to the same server.
+
+    Args:
+        cloud: The `FakeCloud` to serve.
+        host: The address to listen on.
+        port: The port to listen on (0 for any free port).
+
+    Attributes:
+        url: The server's base URL, once started.
+    """
+
+    def __init__(self, cloud, host='127.0.0.1', port=0):
+        self.cloud = cloud
+        self.host = host
+        self.port = port
+        self.url = None
+        self._runner = None
+        self._thread = None
+        self._loop = None
+
+    async def start(self):
+        """Start listening and return the server's base URL."""
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_post('/{path:.*}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f'http://{host}:{port}'
+        return self.url
+
+    async def stop(self):
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def __enter__(self):
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        errors = []
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                self._loop.close()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='FakeCloudServer', daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            self._thread.join()
+            raise errors[0]
+        return self.url
+
+    def __exit__(self, exc_type, exc, tb):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        self._loop = None
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        url = str(request.url.with_query(None))
+        tplink_request = TPLinkRequest(
+            url, dict(request.query), request.headers, await request.read())
+        response = await self.cloud.handle_async(tplink_request)
+        if isinstance(response, TPLinkHTTPResponse):
+            return web.Response(status=response.status, reason=response.reason,
+                                body=response.content)
+        return web.Response(body=json.dumps(response), content_type='application/json')
@@ -0,0 +1,35 @@
+"""Base class for the compact objects built from API responses."""
+
+from functools import lru_cache
+
+
+class Slotted:
+    """Base for response objects that keep their attributes in __slots__.
+
+    Slotted instances carry no per-instance dict, which adds up when
+    holding sys info for a whole fleet or a long history of emeter rows.
+    `__dict__` is provided as a read-only snapshot of the attributes that
+    are set, so `vars(obj)` and `obj.__dict__` based serialization keep
+    working.
+    """
+
+    __slots__ = ()
+
+    @property
+    def __dict__(self):
+        return {
+            name: getattr(self, name)
+            for name in slot_names(type(self))
+            if hasattr(self, name)
+        }
+
+
+@lru_cache(maxsize=None)
+def slot_names(cls):
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(name for name in slots if name not in names)
+    return tuple(names)
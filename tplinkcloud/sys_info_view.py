@@ -0,0 +1,85 @@
+"""Read-only views over raw sys info responses.
+
+A sys info class such as `HS100SysInfo` copies every field out of the
+`get_sysinfo` response when it is constructed (and strips also build an
+object per child). A view exposes the same attributes but reads each one
+from the underlying response dict when it is accessed, so a poll that
+only checks `relay_state` does not pay for the rest of the fields.
+
+Views are returned by `get_sys_info(view=True)`; they keep a reference
+to the response dict rather than a snapshot of it.
+"""
+
+from .slotted import Slotted, slot_names
+
+# Response keys that do not match the attribute name
+_KEY_ALIASES = {
+    'device_id': 'deviceId',
+    'oem_id': 'oemId',
+    'hw_id': 'hwId',
+    'fw_id': 'fwId',
+}
+
+
+class SysInfoView(Slotted):
+    """Base for views created by `sys_info_view`.
+
+    Attributes:
+        sys_info_cls: The sys info class whose attributes the view exposes.
+    """
+
+    __slots__ = ('_sys_info',)
+
+    sys_info_cls = None
+
+    def __init__(self, sys_info):
+        self._sys_info = sys_info
+
+    @property
+    def __dict__(self):
+        return {
+            name: getattr(self, name)
+            for name in slot_names(self.sys_info_cls)
+            if hasattr(self, name)
+        }
+
+    def materialize(self):
+        """Copy the response into an instance of the full sys info class."""
+        return self.sys_info_cls(self._sys_info)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self._sys_info!r}>'
+
+
+def sys_info_view(sys_info_cls, **getters):
+    """Create a view class exposing the attributes of `sys_info_cls`.
+
+    Attributes are read from the response key of the same name (or its
+    camelCase form for ids). Attributes that are nested objects or
+    derived from other fields are given as keyword arguments mapping the
+    attribute name to a callable that receives the response dict.
+    """
+    namespace = {
+        '__slots__': (),
+        '__module__': sys_info_cls.__module__,
+        'sys_info_cls': sys_info_cls,
+    }
+    for name in slot_names(sys_info_cls):
+        getter = getters.get(name)
+        if getter is not None:
+            namespace[name] = property(_computed_field(getter))
+        else:
+            namespace[name] = property(_field(_KEY_ALIASES.get(name, name)))
+    return type(f'{sys_info_cls.__name__}View', (SysInfoView,), namespace)
+
+
+def _field(key):
+    def get(self):
+        return self._sys_info.get(key)
+    return get
+
+
+def _computed_field(getter):
+    def get(self):
+        return getter(self._sys_info)
+    return get
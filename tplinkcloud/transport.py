@@ -0,0 +1,353 @@
+"""Transports that send the signed requests of the cloud API and device clients.
+
+`TPLinkApi` (login, token refresh and `getDeviceList`) and
+`TPLinkDeviceClient` (device passthroughs) build and sign requests and
+hand them to a `TPLinkTransport` to send. `TPLinkDeviceManager` creates
+one transport and hands it to every client it builds, or uses the one
+passed as its `transport` argument.
+
+`TPLinkHTTPTransport` is the default. Inside `async with` (its own or
+the device manager's), or with `pool_connections=True`, it sends awaited
+requests to the same regional hosts over pooled keep-alive connections
+with cached DNS lookups, so the connection opened for `getDeviceList` is
+reused by the passthroughs that follow. Otherwise each awaited request
+gets its own session, so nothing is left open for code that never closes
+the transport. `requests` is used for the synchronous calls made while
+logging in and `aiohttp` for everything awaited; both are imported on
+first use.
+
+`TPLinkInMemoryTransport` hands requests to a Python callable instead,
+for tests and for measuring the library's own overhead without a
+network.
+"""
+
+import asyncio
+import inspect
+import json
+import ssl
+import warnings
+from urllib.parse import urlsplit
+
+from .certs import get_ca_cert_path
+
+
+class TPLinkHTTPResponse:
+    """Status and body of a response from a transport.
+
+    Attributes:
+        status: The HTTP status code.
+        reason: The HTTP reason phrase.
+        content: The response body as bytes.
+        data: The decoded response body, for transports that produce it
+              without JSON (None otherwise).
+    """
+
+    __slots__ = ('status', 'reason', 'content', 'data')
+
+    def __init__(self, status, reason, content, data=None):
+        self.status = status
+        self.reason = reason
+        self.content = content
+        self.data = data
+
+    def json(self, loads):
+        """Decode the body with a JSON `loads` function."""
+        if self.data is not None:
+            return self.data
+        return loads(self.content)
+
+
+class TPLinkTransport:
+    """Interface for sending signed requests to the TP-Link cloud.
+
+    Requests are POSTs with a signed, JSON encoded body. Subclasses
+    implement `post` for the synchronous calls made while logging in and
+    `post_async` for everything else, each returning a
+    `TPLinkHTTPResponse`.
+    """
+
+    def post(self, url, data, params, headers, timeout):
+        """Send a request and wait for the response.
+
+        Args:
+            url: The full URL, without query parameters.
+            data: The request body as bytes.
+            params: The query parameters.
+            headers: The request headers, including the signing headers.
+            timeout: Seconds to wait for the response.
+
+        Returns:
+            TPLinkHTTPResponse
+        """
+        raise NotImplementedError
+
+    async def post_async(self, url, data, params, headers, timeout):
+        """Send a request from the running event loop (see `post`)."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the transport's resources."""
+
+    async def aclose(self):
+        """Release the transport's resources from the event loop."""
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+class TPLinkHTTPTransport(TPLinkTransport):
+    """HTTP connections to the TP-Link cloud.
+
+    Awaited requests are pooled while the transport is used as an async
+    context manager, or always with `pool_connections=True`; the pool
+    must then be closed with `aclose`. The pooled aiohttp session is
+    created on the first awaited request and is bound to that event
+    loop; if requests are later made from a different loop (e.g. a
+    second `asyncio.run`), a new session is created for it.
+
+    Args:
+        ca_cert_path: CA bundle used to verify the cloud's certificates.
+                      Defaults to the bundled TP-Link CA.
+        pool_connections: Whether to keep the connections of awaited
+                          requests open between requests outside of
+                          `async with`.
+        connection_limit: Maximum number of open connections.
+        connection_limit_per_host: Maximum number of open connections to
+                                   a single host (0 for no limit).
+        dns_cache_ttl: Seconds to cache DNS lookups for.
+    """
+
+    def __init__(self, ca_cert_path=None, connection_limit=100,
+                 connection_limit_per_host=0, dns_cache_ttl=300,
+                 pool_connections=False):
+        self._ca_cert_path = ca_cert_path or get_ca_cert_path()
+        self._pool_connections = pool_connections
+        self._pooling = pool_connections
+        self._connection_limit = connection_limit
+        self._connection_limit_per_host = connection_limit_per_host
+        self._dns_cache_ttl = dns_cache_ttl
+        self._ssl_context = None
+        self._session = None
+        self._async_session = None
+        self._async_session_loop = None
+        # Closes of stale sessions scheduled on the running loop
+        self._closing_tasks = set()
+
+    @property
+    def ssl_context(self):
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context(cafile=self._ca_cert_path)
+        return self._ssl_context
+
+    def _get_session(self):
+        if self._session is None:
+            # Deferred so that importing the library does not pull in requests
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _new_async_session(self):
+        # Deferred so that importing the library does not pull in aiohttp
+        import aiohttp
+        connector = aiohttp.TCPConnector(
+            limit=self._connection_limit,
+            limit_per_host=self._connection_limit_per_host,
+            ttl_dns_cache=self._dns_cache_ttl,
+            ssl=self.ssl_context,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    def _get_async_session(self):
+        loop = asyncio.get_running_loop()
+        session = self._async_session
+        if session is not None and (session.closed or self._async_session_loop is not loop):
+            self._discard_async_session()
+            session = None
+        if session is None:
+            session = self._new_async_session()
+            self._async_session = session
+            self._async_session_loop = loop
+        return session
+
+    def _discard_async_session(self):
+        session = self._async_session
+        loop = self._async_session_loop
+        self._async_session = None
+        self._async_session_loop = None
+        if session is None or session.closed:
+            return
+        if not loop.is_closed():
+            # Closed on its own event loop, whenever that runs next
+            loop.call_soon_threadsafe(loop.create_task, session.close())
+            return
+        # aiohttp does not touch the sockets of a closed loop when closing,
+        # so the session can be closed from any loop
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is None:
+            closing_loop = asyncio.new_event_loop()
+            try:
+                closing_loop.run_until_complete(session.close())
+            finally:
+                closing_loop.close()
+        else:
+            task = running_loop.create_task(session.close())
+            self._closing_tasks.add(task)
+            task.add_done_callback(self._closing_tasks.discard)
+
+    def post(self, url, data, params, headers, timeout):
+        """Send a POST request and wait for the response.
+
+        Returns:
+            TPLinkHTTPResponse
+        """
+        # verify is passed on each call, since requests lets the
+        # REQUESTS_CA_BUNDLE and CURL_CA_BUNDLE environment variables
+        # override the session's
+        response = self._get_session().post(
+            url,
+            data=data,
+            params=params,
+            headers=headers,
+            timeout=timeout,
+            verify=self._ca_cert_path,
+        )
+        return TPLinkHTTPResponse(
+            response.status_code, response.reason, response.content
+        )
+
+    async def post_async(self, url, data, params, headers, timeout):
+        """Send a POST request from the running event loop.
+
+        Returns:
+            TPLinkHTTPResponse
+        """
+        if self._pooling:
+            return await self._post_async(self._get_async_session(), url, data, params, headers, timeout)
+        async with self._new_async_session() as session:
+            return await self._post_async(session, url, data, params, headers, timeout)
+
+    @staticmethod
+    async def _post_async(session, url, data, params, headers, timeout):
+        import aiohttp
+
+        async with session.post(
+            url,
+            data=data,
+            params=params,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            content = await response.read()
+            return TPLinkHTTPResponse(response.status, response.reason, content)
+
+    def close(self):
+        """Close the synchronous connection pool.
+
+        The aiohttp session can only be closed from its event loop; use
+        `aclose` there to close both.
+        """
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._async_session_loop is not None and self._async_session_loop.is_closed():
+            self._discard_async_session()
+
+    def __del__(self):
+        # Closing needs the session's event loop, which a finalizer cannot
+        # use safely, so an open pool is only reported
+        session = getattr(self, '_async_session', None)
+        if session is not None and not session.closed:
+            warnings.warn(
+                f'Unclosed {type(self).__name__}; use `async with` or await aclose()',
+                ResourceWarning, source=self)
+
+    async def __aenter__(self):
+        self._pooling = True
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._pooling = self._pool_connections
+        await self.aclose()
+
+    async def aclose(self):
+        """Close all pooled connections."""
+        session = self._async_session
+        if session is not None and self._async_session_loop is asyncio.get_running_loop():
+            self._async_session = None
+            self._async_session_loop = None
+            await session.close()
+        self.close()
+
+
+class TPLinkRequest:
+    """A request handed to a `TPLinkInMemoryTransport` handler.
+
+    Attributes:
+        url: The full URL, without query parameters.
+        path: The URL path (e.g. "/" or "/api/v2/account/login").
+        params: The query parameters.
+        headers: The request headers.
+        body: The request body as bytes.
+    """
+
+    __slots__ = ('url', 'path', 'params', 'headers', 'body')
+
+    def __init__(self, url, params, headers, body):
+        self.url = url
+        self.path = urlsplit(url).path or '/'
+        self.params = params
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        """Decode the request body."""
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f'<TPLinkRequest POST {self.url}>'
+
+
+class TPLinkInMemoryTransport(TPLinkTransport):
+    """Transport that answers requests with a Python callable.
+
+    The handler is called with a `TPLinkRequest` and returns the decoded
+    response body as a dict, or a `TPLinkHTTPResponse` to control the
+    status (e.g. to inject errors). Responses returned as dicts are passed
+    to the client without JSON encoding. Coroutine functions are supported
+    as handlers for awaited requests; `post` needs a regular function.
+
+    Args:
+        handler: Callable taking a `TPLinkRequest`.
+    """
+
+    def __init__(self, handler):
+        self._handler = handler
+
+    def post(self, url, data, params, headers, timeout):
+        response = self._handler(TPLinkRequest(url, params, headers, data))
+        if inspect.isawaitable(response):
+            if inspect.iscoroutine(response):
+                response.close()
+            raise TypeError(
+                'Synchronous requests need a handler that is not a coroutine function'
+            )
+        return self._to_response(response)
+
+    async def post_async(self, url, data, params, headers, timeout):
+        response = self._handler(TPLinkRequest(url, params, headers, data))
+        if inspect.isawaitable(response):
+            response = await response
+        return self._to_response(response)
+
+    @staticmethod
+    def _to_response(response):
+        if isinstance(response, TPLinkHTTPResponse):
+            return response
+        return TPLinkHTTPResponse(200, 'OK', None, data=response)